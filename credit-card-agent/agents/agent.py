@@ -1,83 +1,170 @@
 import os
 import json
-import sys
-import boto3
-from io import StringIO
+import time
+import uuid
+from collections import deque
 from datetime import datetime
+from typing import AsyncIterator
 from dotenv import load_dotenv
 from strands import Agent as StrandsAgent
-from strands.models.bedrock import BedrockModel
-from tools.tools import get_customer_profile, check_credit_limit, issue_card
+from agents.bedrock_pool import get_bedrock_model, prompt_template
+from agents.trace_recorder import TraceRecorder
+from agents.trace_sink import get_trace_sink
+from tools.tools import get_customer_profile, check_credit_limit, issue_card, find_customer
 
 load_dotenv()
 
+TOOL_LINE_PREFIX = 'Tool #'
+
+TOOLS = [get_customer_profile, check_credit_limit, issue_card, find_customer]
+
+# Mensajes del trace que se conservan en memoria por conversación
+TRACE_MEMORY_ENTRIES = int(os.getenv('TRACE_MEMORY_ENTRIES', '20'))
+
+
+class ToolLineFilter:
+    """
+    Filtra las líneas "Tool #..." de un stream de texto a medida que llega.
+    Solo retiene el comienzo de una línea mientras todavía podría ser "Tool #";
+    el resto se deja pasar enseguida.
+    """
+
+    def __init__(self):
+        self._head = ''      # comienzo de línea sin decidir
+        self._mode = 'start'  # 'start' | 'emit' | 'drop'
+
+    def feed(self, text: str) -> str:
+        out = []
+        while text:
+            if self._mode == 'start':
+                self._head += text
+                text = ''
+                stripped = self._head.lstrip()
+                if stripped.startswith(TOOL_LINE_PREFIX):
+                    self._mode = 'drop'
+                elif TOOL_LINE_PREFIX.startswith(stripped) and '\n' not in self._head:
+                    break  # puede ser "Tool #": esperar más texto
+                else:
+                    self._mode = 'emit'
+                text, self._head = self._head, ''
+                continue
+            line, newline, text = text.partition('\n')
+            if self._mode == 'emit':
+                out.append(line + newline)
+            if newline:
+                self._mode = 'start'
+        return ''.join(out)
+
+    def flush(self) -> str:
+        head, self._head = self._head, ''
+        self._mode = 'start'
+        return head
+
 
 class Agent(StrandsAgent):
     """Agente de ventas usando Strands + AWS Bedrock"""
 
-    def __init__(self, customer_id: str, system_prompt: str):
+    def __init__(self, customer_id: str, system_prompt: str, **kwargs):
         self.customer_id = customer_id
-        self.conversation_trace = []  # Guardar trace completo
-
-        boto_session = boto3.Session(
-            region_name=os.getenv('AWS_REGION', 'us-east-1'),
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            aws_session_token=os.getenv('AWS_SESSION_TOKEN'),
-        )
-        model = BedrockModel(
-            model_id=os.getenv('BEDROCK_MODEL_ID', 'us.anthropic.claude-sonnet-4-20250514-v1:0'),
-            boto_session=boto_session,
-            max_tokens=2000,
-        )
+        self.conversation_id = uuid.uuid4().hex
+        # El trace va al sink JSONL a medida que ocurre; en memoria solo los últimos mensajes
+        self.conversation_trace = deque(maxlen=TRACE_MEMORY_ENTRIES)
+        self.total_messages = 0
+        self._sink = get_trace_sink()
+        # Trace por agente vía hooks: varios agentes pueden correr en paralelo
+        self._recorder = TraceRecorder()
+        hooks = [self._recorder, *kwargs.pop('hooks', [])]
+        # Por defecto el recorder reemplaza al handler de Strands que imprime en stdout
+        kwargs.setdefault('callback_handler', self._recorder)
+
+        # Modelo (y pool de conexiones) compartido; el prompt de la persona ya viene armado
+        model = kwargs.pop('model', None) or get_bedrock_model()
 
         # Inicializar el agente de Strands con configuración Bedrock
         super().__init__(
             model=model,
-            system_prompt=system_prompt.format(customer_id=customer_id),
-            tools=[get_customer_profile, check_credit_limit, issue_card],
+            system_prompt=prompt_template(system_prompt).render(customer_id),
+            tools=TOOLS,
+            hooks=hooks,
+            **kwargs,
         )
+        self._emit({"type": "conversation_start", "model_id": model.config.get("model_id")})
 
     def chat(self, user_message: str) -> str:
         """
         Procesa un mensaje del usuario y retorna solo el texto final del agente.
-        Captura toda la ejecución (incluyendo prints) en el trace.
+        Las tools, tokens y tiempos del turno quedan en el trace (ver trace_recorder.py).
         """
-        # Guardar mensaje del usuario en trace
-        self.conversation_trace.append({
+        self._trace_user(user_message)
+        response = self(user_message)
+        return self._trace_assistant(response)
+
+    async def achat(self, user_message: str) -> str:
+        """Versión async de chat, para el modo servidor (server.py)"""
+        self._trace_user(user_message)
+        response = await self.invoke_async(user_message)
+        return self._trace_assistant(response)
+
+    def _emit(self, entry: dict):
+        """Manda una entrada al sink JSONL y la guarda entre las últimas en memoria"""
+        entry = {
             "timestamp": datetime.now().isoformat(),
+            "conversation_id": self.conversation_id,
+            "customer_id": self.customer_id,
+            **entry,
+        }
+        self._sink.write(entry)
+        if "role" in entry:
+            self.conversation_trace.append(entry)
+            self.total_messages += 1
+
+    async def chat_stream(self, user_message: str) -> AsyncIterator[str]:
+        """
+        Como achat, pero va entregando el texto del agente a medida que el modelo lo genera
+        (sin las líneas "Tool #"). Al terminar guarda la respuesta limpia en el trace, con el
+        tiempo al primer token (ttft_ms) y el total del turno.
+        """
+        self._trace_user(user_message)
+        started = time.perf_counter()
+        ttft_ms = None
+        response = None
+        text_filter = ToolLineFilter()
+
+        async for event in self.stream_async(user_message):
+            if "result" in event:
+                response = event["result"]
+                continue
+            text = text_filter.feed(event["data"]) if "data" in event else ''
+            if text:
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                yield text
+
+        tail = text_filter.flush()
+        if tail:
+            yield tail
+        self._trace_assistant(response, timing={
+            "ttft_ms": ttft_ms,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+
+    def _trace_user(self, user_message: str):
+        self._emit({
             "role": "user",
             "content": user_message
         })
 
-        # Capturar stdout para guardar en trace pero no mostrarlo
-        original_stdout = sys.stdout
-        captured_output = StringIO()
-
-        try:
-            # Redirigir stdout temporalmente
-            sys.stdout = captured_output
-
-            # Ejecutar agente
-            response = self(user_message)
-
-        finally:
-            # Restaurar stdout
-            sys.stdout = original_stdout
-
-        # Obtener lo que Strands imprimió
-        raw_output = captured_output.getvalue()
-
+    def _trace_assistant(self, response, timing: dict = None) -> str:
         # Parsear solo el texto final limpio
         clean_response = self._parse_response(response)
 
-        # Guardar respuesta del agente en trace (con raw output completo)
-        self.conversation_trace.append({
-            "timestamp": datetime.now().isoformat(),
+        # Guardar respuesta del agente en trace, con los eventos del turno
+        self._emit({
             "role": "assistant",
             "content": clean_response,
-            "raw_output": raw_output,  # Guardar también el output crudo con tools
-            "response_type": str(type(response))
+            "events": self._recorder.take_turn(),
+            "response_type": str(type(response)),
+            **(timing or {}),
         })
 
         return clean_response
@@ -108,18 +195,21 @@ class Agent(StrandsAgent):
         return clean_response
 
     def save_trace(self, filename: str = None):
-        """Guarda el trace completo de la conversación en JSON"""
+        """
+        Cierra la conversación en el sink y espera a que llegue al disco; devuelve el archivo.
+        Con `filename`, además exporta los últimos mensajes en memoria a un JSON aparte.
+        """
+        self._emit({"type": "conversation_end", "total_messages": self.total_messages})
+        self._sink.flush()
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"traces/conversation_{self.customer_id}_{timestamp}.json"
-
-        # Crear directorio traces si no existe
-        os.makedirs("traces", exist_ok=True)
+            return str(self._sink.path)
 
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
         trace_data = {
             "customer_id": self.customer_id,
-            "conversation": self.conversation_trace,
-            "total_messages": len(self.conversation_trace),
+            "conversation_id": self.conversation_id,
+            "conversation": list(self.conversation_trace),
+            "total_messages": self.total_messages,
             "created_at": datetime.now().isoformat()
         }
 
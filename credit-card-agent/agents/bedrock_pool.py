@@ -0,0 +1,99 @@
+"""Cliente de Bedrock compartido por todos los agentes del proceso.
+
+Antes cada `Agent` armaba su `boto3.Session` y su `BedrockModel`: resolvía
+credenciales, cargaba el modelo de servicio de botocore y abría un pool de
+conexiones nuevo por cliente. Ahora hay un `BedrockModel` por model_id,
+creado la primera vez que se pide. Todas las conversaciones reutilizan su
+pool de conexiones HTTPS (keep-alive) y el modelo no guarda estado de la
+conversación, así que crear un agente ya no toca la red.
+
+Con `sdk_retries=False` el cliente no reintenta en botocore: es para las
+corridas que pasan por `BedrockRateLimiter` (campaign.py), que tiene que
+ver cada throttling para bajar el ritmo; el reintento lo hace Strands.
+
+`PromptTemplate` separa, una sola vez por persona, la parte fija del prompt
+(Sofia, Miguel) del dato por cliente. Con `BEDROCK_PROMPT_CACHE` la parte
+fija va seguida de un cache point: Bedrock la cachea y solo cambia el final.
+"""
+import os
+import threading
+from functools import lru_cache
+from typing import Optional, Union
+
+import boto3
+from botocore.config import Config
+from strands.models.bedrock import BedrockModel
+
+DEFAULT_MODEL_ID = 'us.anthropic.claude-sonnet-4-20250514-v1:0'
+
+# Conexiones HTTPS abiertas a Bedrock; conviene que no sea menor que BEDROCK_MAX_CONCURRENCY
+BEDROCK_MAX_POOL_CONNECTIONS = int(os.getenv('BEDROCK_MAX_POOL_CONNECTIONS', '64'))
+BEDROCK_READ_TIMEOUT = int(os.getenv('BEDROCK_READ_TIMEOUT', '120'))
+BEDROCK_PROMPT_CACHE = os.getenv('BEDROCK_PROMPT_CACHE', 'false').lower() in ('1', 'true', 'yes')
+
+_models: dict[tuple[str, bool], BedrockModel] = {}
+_models_lock = threading.Lock()
+
+
+def client_config(sdk_retries: bool = True) -> Config:
+    # Sin reintentos: un solo intento, el throttling sube tal cual a Strands
+    retries = {'mode': 'adaptive', 'max_attempts': 4} if sdk_retries else {'mode': 'standard', 'total_max_attempts': 1}
+    return Config(
+        max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        read_timeout=BEDROCK_READ_TIMEOUT,
+        retries=retries,
+    )
+
+
+def get_bedrock_model(model_id: Optional[str] = None, *, sdk_retries: bool = True) -> BedrockModel:
+    """`BedrockModel` compartido para `model_id` (por defecto BEDROCK_MODEL_ID)"""
+    model_id = model_id or os.getenv('BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
+    key = (model_id, sdk_retries)
+    model = _models.get(key)
+    if model is not None:
+        return model
+    with _models_lock:
+        if key not in _models:
+            boto_session = boto3.Session(
+                region_name=os.getenv('AWS_REGION', 'us-east-1'),
+                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+                aws_session_token=os.getenv('AWS_SESSION_TOKEN'),
+            )
+            _models[key] = BedrockModel(
+                model_id=model_id,
+                boto_session=boto_session,
+                boto_client_config=client_config(sdk_retries),
+                max_tokens=2000,
+            )
+        return _models[key]
+
+
+class PromptTemplate:
+    """Prompt de una persona con un único `{customer_id}`; la parte fija se arma una vez"""
+
+    PLACEHOLDER = '{customer_id}'
+
+    def __init__(self, template: str):
+        head, placeholder, tail = template.partition(self.PLACEHOLDER)
+        if not placeholder or self.PLACEHOLDER in tail:
+            raise ValueError(f"El prompt debe tener exactamente un {self.PLACEHOLDER}")
+        # La parte fija es todo hasta la última línea que trae el dato del cliente
+        cut = head.rfind('\n') + 1
+        self.static = head[:cut]
+        self._line_head = head[cut:]
+        self._tail = tail
+        self._static_blocks = [{'text': self.static}, {'cachePoint': {'type': 'default'}}]
+
+    def render(self, customer_id: str) -> Union[str, list[dict]]:
+        customer_part = f'{self._line_head}{customer_id}{self._tail}'
+        if BEDROCK_PROMPT_CACHE:
+            return [*self._static_blocks, {'text': customer_part}]
+        return self.static + customer_part
+
+
+@lru_cache(maxsize=None)
+def prompt_template(template: str) -> PromptTemplate:
+    """Template de una persona, armado la primera vez que se usa"""
+    return PromptTemplate(template)
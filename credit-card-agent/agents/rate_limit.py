@@ -0,0 +1,177 @@
+"""Límite compartido de requests y tokens por minuto para Bedrock.
+
+Cuando muchas conversaciones corren a la vez (campañas, modo servidor),
+todas chocan contra la misma cuota de la cuenta. Si cada una reintenta por
+su cuenta al recibir un ThrottlingException, los reintentos se sincronizan
+y el throttling empeora. `BedrockRateLimiter` reparte la cuota antes de
+llamar:
+
+- dos token buckets, uno de requests y otro de tokens por minuto, con una
+  ráfaga de `burst_secs` segundos de cuota;
+- por cada llamada reserva los tokens de entrada estimados más `max_tokens`
+  de salida, como hace Bedrock, y al terminar devuelve lo que no se usó
+  según el `usage` real (todo, si la llamada falló o se cortó sin `usage`);
+- ante un throttling baja el ritmo de todos (AIMD) y pausa un momento; con
+  cada llamada exitosa lo va recuperando.
+
+`RateLimitedModel` envuelve cualquier modelo de Strands y pasa cada llamada
+por el limitador. El modelo de abajo no debería reintentar por su cuenta
+(`get_bedrock_model(sdk_retries=False)`): si botocore reintenta el
+throttling internamente, el limitador nunca se entera y no baja el ritmo.
+"""
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterable, Optional
+
+from strands.models import Model
+from strands.types.exceptions import ModelThrottledException
+
+# Caracteres por token para estimar la entrada antes de llamar
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """Bucket async con cola FIFO; `rate_factor` escala el ritmo sin perder lo acumulado"""
+
+    def __init__(self, per_minute: float, burst_secs: float = 10):
+        self.per_minute = per_minute
+        self.capacity = max(1.0, per_minute / 60 * burst_secs)
+        self.rate_factor = 1.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60 * self.rate_factor
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float):
+        # Un pedido más grande que la ráfaga espera al bucket lleno y lo deja en negativo
+        async with self._lock:
+            while True:
+                self._refill()
+                need = min(amount, self.capacity)
+                if self._tokens >= need:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((need - self._tokens) / self.rate)
+
+    def adjust(self, amount: float):
+        """Devuelve (positivo) o descuenta (negativo) tokens ya reservados"""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+    def drain(self):
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+
+
+class BedrockRateLimiter:
+    """Cuota compartida de Bedrock; ver docstring del módulo"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, *,
+                 burst_secs: float = 10, min_rate_factor: float = 0.2, throttle_pause_secs: float = 2.0):
+        self.requests = TokenBucket(requests_per_minute, burst_secs)
+        self.tokens = TokenBucket(tokens_per_minute, burst_secs)
+        self._min_rate_factor = min_rate_factor
+        self._throttle_pause_secs = throttle_pause_secs
+        self._paused_until = 0.0
+        self.calls = 0
+        self.throttled = 0
+        self.tokens_used = 0
+
+    @property
+    def rate_factor(self) -> float:
+        return self.requests.rate_factor
+
+    def _set_rate_factor(self, factor: float):
+        factor = max(self._min_rate_factor, min(1.0, factor))
+        self.requests.rate_factor = factor
+        self.tokens.rate_factor = factor
+
+    async def acquire(self, estimated_tokens: int):
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+        self.calls += 1
+
+    def settle(self, reserved_tokens: int, usage: Optional[dict], success: bool = True):
+        """Ajusta la reserva al uso real (sin `usage`, nada) y, si salió bien, recupera el ritmo de a poco"""
+        used = (usage or {}).get('totalTokens', 0)
+        self.tokens_used += used
+        self.tokens.adjust(reserved_tokens - used)
+        if success:
+            self._set_rate_factor(self.rate_factor + 0.02)
+
+    def on_throttle(self):
+        self.throttled += 1
+        self._set_rate_factor(self.rate_factor * 0.7)
+        self._paused_until = max(self._paused_until, time.monotonic() + self._throttle_pause_secs)
+        # Lo reservado no se consumió, pero el bucket se vacía: Bedrock ya dijo que no hay cuota
+        self.tokens.drain()
+        self.requests.drain()
+
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'throttled': self.throttled,
+            'tokens_used': self.tokens_used,
+            'rate_factor': round(self.rate_factor, 2),
+        }
+
+
+def estimate_input_tokens(messages, system_prompt: Optional[str], tool_specs) -> int:
+    chars = len(system_prompt or '')
+    chars += sum(len(json.dumps(m['content'], ensure_ascii=False, default=str)) for m in messages)
+    chars += len(json.dumps(tool_specs or [], default=str))
+    return chars // CHARS_PER_TOKEN
+
+
+class RateLimitedModel(Model):
+    """Modelo de Strands cuyas llamadas pasan por un `BedrockRateLimiter`"""
+
+    def __init__(self, model: Model, limiter: BedrockRateLimiter):
+        self.model = model
+        self.limiter = limiter
+
+    @property
+    def config(self):
+        return self.model.config
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncIterable[dict]:
+        max_tokens = self.get_config().get('max_tokens') or 0
+        reserved = estimate_input_tokens(messages, system_prompt, tool_specs) + max_tokens
+        await self.limiter.acquire(reserved)
+        usage = None
+        outcome = 'error'  # también si se cancela o el consumidor deja de iterar
+        try:
+            async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+                if 'metadata' in event:
+                    usage = event['metadata'].get('usage')
+                yield event
+            outcome = 'ok'
+        except ModelThrottledException:
+            outcome = 'throttled'
+            self.limiter.on_throttle()
+            raise
+        finally:
+            # Tras un throttling el bucket ya se vació; si no, se devuelve lo que no se usó
+            if outcome != 'throttled':
+                self.limiter.settle(reserved, usage, success=outcome == 'ok')
@@ -0,0 +1,139 @@
+"""Registro de conversaciones concurrentes para el modo servidor.
+
+Cada sesión tiene su propio `Agent` (el historial de Strands vive en el
+agente) y un lock: los mensajes de una misma sesión se procesan de a uno,
+los de sesiones distintas en paralelo. Un semáforo global limita cuántos
+turnos llaman a Bedrock a la vez; dentro de un turno las llamadas al modelo
+son secuenciales, así que es también el tope de llamadas simultáneas.
+
+Las sesiones sin actividad por más de `idle_secs` se cierran solas (se
+guarda su trace), salvo las fijadas (`pinned`): las de un WebSocket viven
+lo que dure la conexión, aunque el cliente tarde en escribir.
+"""
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Optional
+
+from agents.agent import Agent
+
+
+class RegistryFullError(Exception):
+    """No hay lugar para más sesiones"""
+
+
+@dataclass
+class Session:
+    session_id: str
+    agent: Agent
+    created_at: float = field(default_factory=time.monotonic)
+    last_active: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    pinned: bool = False  # la cierra su dueño (p. ej. la conexión), no el desalojo
+
+
+class SessionRegistry:
+    """Sesiones vivas, con desalojo por inactividad y tope de llamadas a Bedrock"""
+
+    def __init__(self, factory: Callable[[str], Agent], *, max_sessions: int = 500,
+                 idle_secs: float = 900, max_concurrent_calls: int = 16):
+        self._factory = factory
+        self._max_sessions = max_sessions
+        self._idle_secs = idle_secs
+        self._max_concurrent_calls = max_concurrent_calls
+        self._calls = asyncio.Semaphore(max_concurrent_calls)
+        self._sessions: dict[str, Session] = {}
+        self._creating = 0
+        self._evict_task: Optional[asyncio.Task] = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.evicted = 0
+
+    def start(self):
+        if not self._evict_task:
+            self._evict_task = asyncio.create_task(self._evict_loop())
+
+    async def stop(self):
+        if self._evict_task:
+            self._evict_task.cancel()
+            self._evict_task = None
+        for session_id in list(self._sessions):
+            await self.close(session_id)
+
+    async def create(self, customer: str, pinned: bool = False) -> Session:
+        """Crea la sesión para un cliente (ID, teléfono, cédula o CURP)"""
+        if len(self._sessions) + self._creating >= self._max_sessions:
+            raise RegistryFullError(f"Límite de {self._max_sessions} sesiones alcanzado")
+        # El primer agente arma el cliente de Bedrock compartido: fuera del event loop
+        self._creating += 1
+        try:
+            agent = await asyncio.to_thread(self._factory, customer)
+        finally:
+            self._creating -= 1
+        session = Session(session_id=uuid.uuid4().hex, agent=agent, pinned=pinned)
+        self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        return self._sessions.get(session_id)
+
+    async def chat(self, session_id: str, message: str) -> str:
+        return ''.join([text async for text in self.chat_stream(session_id, message)]).strip()
+
+    def chat_stream(self, session_id: str, message: str) -> AsyncIterator[str]:
+        """Texto del agente a medida que se genera; el turno ocupa su lugar en Bedrock hasta terminar.
+
+        La sesión se busca ya (KeyError si no existe), no cuando se empieza a
+        iterar, y cuenta como activa desde ahora: entre este llamado y el
+        primer chunk el desalojo no la cierra.
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        session.last_active = time.monotonic()
+        return self._stream(session, message)
+
+    async def _stream(self, session: Session, message: str) -> AsyncIterator[str]:
+        async with session.lock:
+            session.last_active = time.monotonic()
+            self.waiting += 1
+            try:
+                await self._calls.acquire()
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            try:
+                async for text in session.agent.chat_stream(message):
+                    yield text
+            finally:
+                self.in_flight -= 1
+                self._calls.release()
+                session.last_active = time.monotonic()
+
+    async def close(self, session_id: str) -> Optional[str]:
+        """Cierra la sesión y guarda su trace; devuelve el archivo"""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return None
+        async with session.lock:
+            return await asyncio.to_thread(session.agent.save_trace)
+
+    async def _evict_loop(self):
+        while True:
+            await asyncio.sleep(min(60.0, self._idle_secs / 4))
+            cutoff = time.monotonic() - self._idle_secs
+            for session_id, session in list(self._sessions.items()):
+                if session.last_active < cutoff and not session.pinned and not session.lock.locked():
+                    await self.close(session_id)
+                    self.evicted += 1
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self._max_sessions,
+            "bedrock_in_flight": self.in_flight,
+            "bedrock_waiting": self.waiting,
+            "max_concurrent_calls": self._max_concurrent_calls,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,109 @@
+"""Captura del trace de cada turno con hooks de Strands, sin tocar sys.stdout.
+
+`TraceRecorder` se registra en un solo agente, como hook provider y como
+callback handler, así que cada conversación tiene el suyo. No comparte nada
+global, y varios agentes pueden correr en paralelo en hilos o tasks. Por
+turno guarda eventos estructurados:
+
+- `model_call`: duración, stop_reason, tokens y latencia de Bedrock del paso;
+- `tool_call`: tool, input, status, resultado y duración;
+- `turn`: duración total y tokens acumulados del turno.
+"""
+import time
+from typing import Any, Optional
+
+from strands.hooks import (
+    AfterInvocationEvent,
+    AfterModelCallEvent,
+    AfterToolCallEvent,
+    BeforeInvocationEvent,
+    BeforeModelCallEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+
+def _ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+
+class TraceRecorder(HookProvider):
+    """Eventos estructurados de los turnos de un agente"""
+
+    def __init__(self):
+        self._events: list[dict] = []
+        self._turn_started: Optional[float] = None
+        self._model_started: Optional[float] = None
+        self._tools_started: dict[str, float] = {}
+        self._step_metadata: dict = {}
+        self._step = 0
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._on_turn_start)
+        registry.add_callback(BeforeModelCallEvent, self._on_model_start)
+        registry.add_callback(AfterModelCallEvent, self._on_model_end)
+        registry.add_callback(BeforeToolCallEvent, self._on_tool_start)
+        registry.add_callback(AfterToolCallEvent, self._on_tool_end)
+        registry.add_callback(AfterInvocationEvent, self._on_turn_end)
+
+    def __call__(self, **kwargs: Any) -> None:
+        """Callback handler: de todo el stream solo interesa el metadata (tokens, latencia)"""
+        metadata = kwargs.get("event", {}).get("metadata")
+        if metadata:
+            self._step_metadata = metadata
+
+    def take_turn(self) -> list[dict]:
+        """Devuelve los eventos del último turno y los descarta"""
+        events, self._events = self._events, []
+        return events
+
+    def _on_turn_start(self, event: BeforeInvocationEvent) -> None:
+        self._turn_started = time.perf_counter()
+        self._step = 0
+
+    def _on_model_start(self, event: BeforeModelCallEvent) -> None:
+        self._model_started = time.perf_counter()
+        self._step_metadata = {}
+
+    def _on_model_end(self, event: AfterModelCallEvent) -> None:
+        self._step += 1
+        self._events.append({
+            "type": "model_call",
+            "step": self._step,
+            "duration_ms": _ms(self._model_started) if self._model_started else None,
+            "stop_reason": event.stop_response.stop_reason if event.stop_response else None,
+            "usage": self._step_metadata.get("usage"),
+            "latency_ms": self._step_metadata.get("metrics", {}).get("latencyMs"),
+            "error": str(event.exception) if event.exception else None,
+        })
+
+    def _on_tool_start(self, event: BeforeToolCallEvent) -> None:
+        self._tools_started[event.tool_use["toolUseId"]] = time.perf_counter()
+
+    def _on_tool_end(self, event: AfterToolCallEvent) -> None:
+        started = self._tools_started.pop(event.tool_use["toolUseId"], None)
+        self._events.append({
+            "type": "tool_call",
+            "step": self._step,
+            "tool": event.tool_use["name"],
+            "input": event.tool_use.get("input"),
+            "status": event.result.get("status"),
+            "result": event.result.get("content"),
+            "duration_ms": _ms(started) if started else None,
+            "error": str(event.exception) if event.exception else None,
+        })
+
+    def _on_turn_end(self, event: AfterInvocationEvent) -> None:
+        # accumulated_usage del resultado suma toda la conversación; acá solo este turno
+        usage: dict[str, int] = {}
+        for step in self._events:
+            if step["type"] == "model_call" and step["usage"]:
+                for key, value in step["usage"].items():
+                    usage[key] = usage.get(key, 0) + value
+        self._events.append({
+            "type": "turn",
+            "steps": self._step,
+            "duration_ms": _ms(self._turn_started) if self._turn_started else None,
+            "usage": usage or None,
+        })
@@ -0,0 +1,172 @@
+"""Sink de traces JSONL: append a medida que pasan las cosas, con rotación.
+
+`write()` solo serializa el evento y lo agrega a un buffer en memoria; un
+hilo escritor lo vuelca al archivo cada `flush_secs` o apenas el buffer pasa
+`flush_bytes`. Así ni el CLI ni el event loop del servidor esperan al disco,
+y si el proceso se cae se pierde como mucho el último intervalo.
+
+- Un evento por línea (`traces/trace-<fecha>-<pid>-<n>.jsonl`); cada uno lleva
+  `conversation_id`, así que un archivo mezcla muchas conversaciones.
+- El archivo rota al pasar `max_bytes` o `max_age_secs`; el rotado se
+  comprime a `.jsonl.gz` en el mismo hilo escritor.
+- El buffer tiene tope (`max_buffer_bytes`): si el disco no da abasto se
+  descartan eventos y se cuentan en `dropped`, en lugar de crecer sin límite.
+"""
+import atexit
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+class JsonlTraceSink:
+    """Escritor JSONL con buffer, hilo propio y rotación; ver docstring del módulo"""
+
+    def __init__(self, directory: str = 'traces', *, max_bytes: int = 50 * 1024 * 1024,
+                 max_age_secs: float = 3600, flush_secs: float = 1.0,
+                 flush_bytes: int = 64 * 1024, max_buffer_bytes: int = 8 * 1024 * 1024,
+                 compress: bool = True):
+        self.directory = Path(directory)
+        self._max_bytes = max_bytes
+        self._max_age_secs = max_age_secs
+        self._flush_secs = flush_secs
+        self._flush_bytes = flush_bytes
+        self._max_buffer_bytes = max_buffer_bytes
+        self._compress = compress
+
+        self._buffer: list[str] = []
+        self._buffered_bytes = 0
+        self._enqueued = 0
+        self._persisted = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flushed = threading.Condition()
+        self._closed = False
+
+        self._file = None
+        self._path: Optional[Path] = None
+        self._opened_at = 0.0
+        self._written = 0
+        self._sequence = 0
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._run, name='trace-sink', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self._path
+
+    def write(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False, default=str) + '\n'
+        size = len(line)
+        with self._lock:
+            if self._closed:
+                return
+            if self._buffered_bytes + size > self._max_buffer_bytes:
+                self.dropped += 1
+                return
+            self._buffer.append(line)
+            self._buffered_bytes += size
+            self._enqueued += 1
+            full = self._buffered_bytes >= self._flush_bytes
+        if full:
+            self._wakeup.set()
+
+    def flush(self, timeout: float = 5.0):
+        """Espera a que lo escrito hasta ahora llegue al archivo"""
+        with self._lock:
+            target = self._enqueued
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            while self._persisted < target and self._thread.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._wakeup.set()
+                self._flushed.wait(min(remaining, 0.1))
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=10)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self._flush_secs)
+            self._wakeup.clear()
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                self._buffered_bytes = 0
+                upto = self._enqueued
+                closed = self._closed
+            if lines:
+                self._write_lines(lines)
+            if self._file and self._should_rotate():
+                self._rotate()
+            with self._flushed:
+                self._persisted = upto
+                self._flushed.notify_all()
+            if closed:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write_lines(self, lines: list[str]):
+        if self._file is None:
+            self._open()
+        data = ''.join(lines)
+        self._file.write(data)
+        self._file.flush()
+        self._written += len(data.encode('utf-8'))
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # La secuencia evita pisar un archivo rotado en el mismo segundo
+        self._sequence += 1
+        self._path = self.directory / f'trace-{stamp}-{os.getpid()}-{self._sequence}.jsonl'
+        self._file = open(self._path, 'a', encoding='utf-8')
+        self._opened_at = time.monotonic()
+        self._written = self._path.stat().st_size
+
+    def _should_rotate(self) -> bool:
+        return (self._written >= self._max_bytes
+                or time.monotonic() - self._opened_at >= self._max_age_secs)
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        if self._compress:
+            with open(self._path, 'rb') as src, gzip.open(f'{self._path}.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self._path)
+            self._path = Path(f'{self._path}.gz')
+
+
+_sink: Optional[JsonlTraceSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_trace_sink() -> JsonlTraceSink:
+    """Sink compartido del proceso, configurado por variables de entorno"""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = JsonlTraceSink(
+                os.getenv('TRACE_DIR', 'traces'),
+                max_bytes=int(os.getenv('TRACE_MAX_BYTES', str(50 * 1024 * 1024))),
+                max_age_secs=float(os.getenv('TRACE_MAX_AGE_SECS', '3600')),
+                flush_secs=float(os.getenv('TRACE_FLUSH_SECS', '1')),
+            )
+        return _sink
@@ -0,0 +1,287 @@
+"""Índice SQLite de los traces, para consultarlos sin abrir archivo por archivo.
+
+`TraceStore.ingest()` recorre la carpeta de traces y carga en tablas
+compactas (sin el texto de los mensajes):
+
+- `conversations`: cliente, país, modelo, turnos, turno en que se emitió la
+  tarjeta y tokens;
+- `turns`: duración, tiempo al primer token, pasos y tokens de cada turno;
+- `tool_calls` y `model_calls`: cada llamada con su duración y resultado.
+
+La carga es incremental. De cada archivo JSONL del sink se guarda hasta qué
+byte se leyó, y la próxima vez se sigue desde ahí, aunque el archivo haya
+rotado a `.jsonl.gz`. Los JSON exportados con `save_trace(filename)` y los
+del formato viejo (uno por conversación, con `raw_output`) se leen una vez.
+Un JSON exportado se saltea si su conversación ya vino en los JSONL.
+"""
+import gzip
+import json
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional
+
+from tools.data_store import repository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL,      -- bytes ya leídos; -1 = archivo cerrado y leído entero
+    size INTEGER,
+    mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    conversation_id TEXT PRIMARY KEY,
+    customer_id TEXT,
+    country TEXT,
+    model_id TEXT,
+    started_at TEXT,
+    ended_at TEXT,
+    turns INTEGER NOT NULL DEFAULT 0,
+    card_turn INTEGER,
+    tokens INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS turns (
+    conversation_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    at TEXT,
+    steps INTEGER,
+    duration_ms REAL,
+    ttft_ms REAL,
+    total_ms REAL,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    total_tokens INTEGER,
+    PRIMARY KEY (conversation_id, turn)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tool_calls (
+    conversation_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    step INTEGER,
+    tool TEXT,
+    status TEXT,
+    duration_ms REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS model_calls (
+    conversation_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    step INTEGER,
+    duration_ms REAL,
+    latency_ms REAL,
+    stop_reason TEXT,
+    input_tokens INTEGER,
+    output_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS conversations_country ON conversations (country);
+CREATE INDEX IF NOT EXISTS tool_calls_conversation ON tool_calls (conversation_id);
+CREATE INDEX IF NOT EXISTS tool_calls_tool ON tool_calls (tool);
+CREATE INDEX IF NOT EXISTS model_calls_conversation ON model_calls (conversation_id);
+"""
+
+CONVERSATION_COLUMNS = ('conversation_id', 'customer_id', 'country', 'model_id', 'started_at',
+                        'ended_at', 'turns', 'card_turn', 'tokens')
+
+# Formato viejo: las tools solo aparecen en el stdout capturado de Strands
+_LEGACY_TOOL_LINE = re.compile(r'Tool #\d+: (\w+)')
+
+
+def _customer_country(customer_id: Optional[str]) -> Optional[str]:
+    customer = repository.customer(customer_id) if customer_id else None
+    return customer['country'] if customer else None
+
+
+class _Batch:
+    """Filas de un archivo, que se escriben juntas en una transacción"""
+
+    def __init__(self, store: 'TraceStore'):
+        self.store = store
+        self.conversations: dict[str, dict] = {}
+        self.turns: list[tuple] = []
+        self.tool_calls: list[tuple] = []
+        self.model_calls: list[tuple] = []
+
+    def conversation(self, conversation_id: str, customer_id: Optional[str]) -> dict:
+        row = self.conversations.get(conversation_id)
+        if row is None:
+            row = self.store._load_conversation(conversation_id) or {
+                'conversation_id': conversation_id,
+                'customer_id': customer_id,
+                'country': _customer_country(customer_id),
+                'turns': 0,
+                'tokens': 0,
+            }
+            self.conversations[conversation_id] = row
+        return row
+
+    def add(self, entry: dict):
+        conversation_id = entry.get('conversation_id')
+        if not conversation_id:
+            return
+        row = self.conversation(conversation_id, entry.get('customer_id'))
+        timestamp = entry.get('timestamp')
+        row['started_at'] = row.get('started_at') or timestamp
+
+        kind = entry.get('type')
+        if kind == 'conversation_start':
+            row['model_id'] = entry.get('model_id')
+            row['started_at'] = timestamp
+        elif kind == 'conversation_end':
+            row['ended_at'] = timestamp
+        elif entry.get('role') == 'assistant':
+            self._add_turn(row, entry)
+
+    def _add_turn(self, row: dict, entry: dict):
+        conversation_id = row['conversation_id']
+        row['turns'] += 1
+        turn = row['turns']
+        events = entry.get('events')
+        if events is None:
+            events = [{'type': 'tool_call', 'tool': name}
+                      for name in _LEGACY_TOOL_LINE.findall(entry.get('raw_output') or '')]
+
+        summary = {}
+        for event in events:
+            if event['type'] == 'model_call':
+                usage = event.get('usage') or {}
+                self.model_calls.append((
+                    conversation_id, turn, event.get('step'), event.get('duration_ms'), event.get('latency_ms'),
+                    event.get('stop_reason'), usage.get('inputTokens'), usage.get('outputTokens'),
+                ))
+            elif event['type'] == 'tool_call':
+                self.tool_calls.append((
+                    conversation_id, turn, event.get('step'), event.get('tool'), event.get('status'),
+                    event.get('duration_ms'), event.get('error'),
+                ))
+                # En el formato viejo no hay status: que se haya llamado ya cuenta
+                if event.get('tool') == 'issue_card' and event.get('status', 'success') == 'success':
+                    row['card_turn'] = row.get('card_turn') or turn
+            elif event['type'] == 'turn':
+                summary = event
+
+        usage = summary.get('usage') or {}
+        row['tokens'] += usage.get('totalTokens') or 0
+        self.turns.append((
+            conversation_id, turn, entry.get('timestamp'), summary.get('steps'), summary.get('duration_ms'),
+            entry.get('ttft_ms'), entry.get('total_ms'),
+            usage.get('inputTokens'), usage.get('outputTokens'), usage.get('totalTokens'),
+        ))
+
+    def write(self, db: sqlite3.Connection):
+        placeholders = ', '.join('?' for _ in CONVERSATION_COLUMNS)
+        db.executemany(
+            f"INSERT OR REPLACE INTO conversations ({', '.join(CONVERSATION_COLUMNS)}) VALUES ({placeholders})",
+            [tuple(row.get(column) for column in CONVERSATION_COLUMNS) for row in self.conversations.values()],
+        )
+        db.executemany("INSERT OR REPLACE INTO turns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.turns)
+        db.executemany("INSERT INTO tool_calls VALUES (?, ?, ?, ?, ?, ?, ?)", self.tool_calls)
+        db.executemany("INSERT INTO model_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self.model_calls)
+
+
+class TraceStore:
+    """Índice SQLite de una carpeta de traces; ver docstring del módulo"""
+
+    def __init__(self, db_path: str = 'traces/index.sqlite', trace_dir: str = 'traces'):
+        self.trace_dir = Path(trace_dir)
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(db_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _load_conversation(self, conversation_id: str) -> Optional[dict]:
+        row = self.db.execute("SELECT * FROM conversations WHERE conversation_id = ?", (conversation_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _source(self, name: str) -> Optional[sqlite3.Row]:
+        return self.db.execute("SELECT * FROM sources WHERE name = ?", (name,)).fetchone()
+
+    def _commit(self, batch: _Batch, name: str, offset: int, stat):
+        with self.db:
+            batch.write(self.db)
+            self.db.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                            (name, offset, stat.st_size, stat.st_mtime_ns))
+
+    def ingest(self) -> dict:
+        """Carga lo nuevo de la carpeta; devuelve cuántos archivos y líneas se leyeron"""
+        counts = {'files': 0, 'lines': 0}
+        # En orden de escritura, para que los turnos de una conversación que cruza una rotación queden en orden
+        paths = sorted([*self.trace_dir.rglob('*.jsonl'), *self.trace_dir.rglob('*.jsonl.gz')],
+                       key=lambda path: path.stat().st_mtime_ns)
+        for path in paths:
+            lines = self._ingest_jsonl(path)
+            if lines is not None:
+                counts['files'] += 1
+                counts['lines'] += lines
+        # Los JSON sueltos al final: si su conversación ya vino en un JSONL se saltean
+        for path in sorted(self.trace_dir.rglob('*.json')):
+            if self._ingest_json(path):
+                counts['files'] += 1
+        return counts
+
+    def _ingest_jsonl(self, path: Path) -> Optional[int]:
+        compressed = path.suffix == '.gz'
+        # El .jsonl y su versión rotada .jsonl.gz son el mismo origen
+        name = str(path.relative_to(self.trace_dir))
+        name = name[:-3] if compressed else name
+        stat = path.stat()
+        source = self._source(name)
+        offset = source['offset'] if source else 0
+        if offset < 0 or (not compressed and offset >= stat.st_size):
+            return None
+
+        if compressed:
+            with gzip.open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        else:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+            # Una línea a medio escribir queda para la próxima pasada
+            data = data[:data.rfind(b'\n') + 1]
+            if not data:
+                return None
+
+        batch = _Batch(self)
+        lines = 0
+        for line in data.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            batch.add(entry)
+            lines += 1
+        self._commit(batch, name, -1 if compressed else offset + len(data), stat)
+        return lines
+
+    def _ingest_json(self, path: Path) -> bool:
+        name = str(path.relative_to(self.trace_dir))
+        stat = path.stat()
+        source = self._source(name)
+        if source and source['size'] == stat.st_size and source['mtime_ns'] == stat.st_mtime_ns:
+            return False
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        batch = _Batch(self)
+        entries = data.get('conversation') if isinstance(data, dict) else None
+        conversation_id = data.get('conversation_id') if isinstance(data, dict) else None
+        if entries is not None and not (conversation_id and self._load_conversation(conversation_id)):
+            conversation_id = conversation_id or f'file:{path.stem}'
+            for entry in entries:
+                batch.add({**entry, 'conversation_id': conversation_id, 'customer_id': data.get('customer_id')})
+            if conversation_id in batch.conversations:
+                batch.conversations[conversation_id]['ended_at'] = data.get('created_at')
+        self._commit(batch, name, stat.st_size, stat)
+        return True
+
+    def query(self, sql: str, params: Iterable = ()) -> list[dict]:
+        return [dict(row) for row in self.db.execute(sql, tuple(params))]
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Benchmark de throughput: conversaciones guionadas contra `Agent`, sin Bedrock.
+
+Corre los diálogos de simulation/dialogues.py (acepta, objeta, rechaza; COL
+y MEX) con `StandInModel`, muchas conversaciones a la vez en un event loop,
+igual que el modo servidor. Reporta:
+
+- turnos y conversaciones por segundo;
+- latencia de turno y tiempo al primer token;
+- overhead por turno fuera del modelo: el turno menos lo que el modelo
+  simulado estuvo esperando (Strands, tools, hooks, trace);
+- latencia de cada tool;
+- memoria por conversación (tracemalloc, en una pasada aparte).
+
+Uso:
+    python benchmark.py --conversations 600 --concurrency 100 --latency-ms 300
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import time
+import tracemalloc
+from collections import defaultdict
+
+# Los traces del benchmark van aparte, salvo que se pida otra cosa
+os.environ.setdefault('TRACE_DIR', 'traces/benchmark')
+
+from agents.agent import Agent
+from agents.miguel_prompt import MIGUEL_PROMPT
+from agents.sofia_prompt import SOFIA_PROMPT
+from agents.trace_sink import get_trace_sink
+from simulation.dialogues import DIALOGUES, Dialogue
+from simulation.standin_model import TOOL_MODES, StandInModel
+from tools.data_store import repository
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 2)
+
+
+def summary(values: list[float]) -> dict:
+    return {
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99),
+        'mean': round(sum(values) / len(values), 2) if values else 0.0,
+    }
+
+
+class Stats:
+    def __init__(self):
+        self.turns = 0
+        self.conversations = 0
+        self.failures: list[str] = []
+        self.turn_ms: list[float] = []
+        self.ttft_ms: list[float] = []
+        self.overhead_ms: list[float] = []
+        self.model_calls: list[int] = []
+        self.tool_ms: dict[str, list[float]] = defaultdict(list)
+
+
+async def run_conversation(dialogue: Dialogue, model_options: dict, stats: Stats) -> Agent:
+    model = StandInModel(dialogue, **model_options)
+    country = repository.customer(dialogue.customer_id)['country']
+    prompt = SOFIA_PROMPT if country == 'Colombia' else MIGUEL_PROMPT
+    agent = Agent(dialogue.customer_id, prompt, model=model)
+
+    issued = False
+    for turn in dialogue.turns:
+        model.take_waited_ms()
+        calls_before = model.calls
+        started = time.perf_counter()
+        text = ''.join([chunk async for chunk in agent.chat_stream(turn.user)])
+        turn_ms = (time.perf_counter() - started) * 1000
+
+        entry = agent.conversation_trace[-1]
+        stats.turns += 1
+        stats.turn_ms.append(turn_ms)
+        stats.ttft_ms.append(entry.get('ttft_ms') or turn_ms)
+        stats.overhead_ms.append(turn_ms - model.take_waited_ms())
+        stats.model_calls.append(model.calls - calls_before)
+        for event in entry['events']:
+            if event['type'] == 'tool_call':
+                stats.tool_ms[event['tool']].append(event['duration_ms'] or 0.0)
+                issued = issued or (event['tool'] == 'issue_card' and event['status'] == 'success')
+        if model_options['tools'] != 'none' and text.strip() != turn.reply:
+            stats.failures.append(f"{dialogue.name}: respuesta inesperada en «{turn.user}»")
+
+    if model_options['tools'] != 'none' and issued != dialogue.expects_card:
+        stats.failures.append(f"{dialogue.name}: tarjeta emitida={issued}, esperada={dialogue.expects_card}")
+    stats.conversations += 1
+    # Como en el modo servidor al cerrar la sesión
+    await asyncio.to_thread(agent.save_trace)
+    return agent
+
+
+async def run_batch(count: int, concurrency: int, model_options: dict, stats: Stats) -> list[Agent]:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> Agent:
+        async with slots:
+            return await run_conversation(DIALOGUES[i % len(DIALOGUES)], model_options, stats)
+
+    return await asyncio.gather(*(one(i) for i in range(count)))
+
+
+async def measure_memory(count: int, concurrency: int, model_options: dict) -> float:
+    """Bytes de Python por conversación terminada, con los agentes todavía vivos"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    agents = await run_batch(count, concurrency, {**model_options, 'latency_ms': 0, 'jitter_ms': 0,
+                                                  'chunk_ms': 0}, Stats())
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del agents
+    return used / count
+
+
+async def benchmark(args) -> dict:
+    model_options = {
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'chunk_ms': args.chunk_ms,
+        'tools': args.tools,
+    }
+    # Calentamiento: imports perezosos, registro de tools, primer archivo de trace
+    await run_batch(len(DIALOGUES), len(DIALOGUES), {**model_options, 'latency_ms': 0, 'jitter_ms': 0}, Stats())
+
+    stats = Stats()
+    started = time.perf_counter()
+    await run_batch(args.conversations, args.concurrency, model_options, stats)
+    elapsed = time.perf_counter() - started
+
+    report = {
+        'conversations': stats.conversations,
+        'turns': stats.turns,
+        'concurrency': args.concurrency,
+        'model': model_options,
+        'elapsed_secs': round(elapsed, 2),
+        'turns_per_sec': round(stats.turns / elapsed, 1),
+        'conversations_per_sec': round(stats.conversations / elapsed, 1),
+        'turn_ms': summary(stats.turn_ms),
+        'ttft_ms': summary(stats.ttft_ms),
+        'overhead_ms': summary(stats.overhead_ms),
+        'model_calls_per_turn': round(sum(stats.model_calls) / max(1, len(stats.model_calls)), 2),
+        'tool_ms': {tool: summary(values) for tool, values in sorted(stats.tool_ms.items())},
+        'trace_events_dropped': get_trace_sink().dropped,
+        'failures': stats.failures[:20],
+        'failure_count': len(stats.failures),
+    }
+    if args.memory_sample:
+        report['memory_per_conversation_bytes'] = round(
+            await measure_memory(args.memory_sample, args.concurrency, model_options))
+    return report
+
+
+def print_report(report: dict):
+    print("\n" + "="*60)
+    print("📈 BENCHMARK - Modelo simulado")
+    print("="*60)
+    print(f"💬 {report['conversations']} conversaciones, {report['turns']} turnos "
+          f"en {report['elapsed_secs']}s (concurrencia {report['concurrency']})")
+    print(f"⚡ {report['turns_per_sec']} turnos/s · {report['conversations_per_sec']} conversaciones/s")
+    for key, label in (('turn_ms', 'Turno'), ('ttft_ms', 'Primer token'), ('overhead_ms', 'Overhead fuera del modelo')):
+        s = report[key]
+        print(f"⏱️  {label}: p50 {s['p50']}ms · p95 {s['p95']}ms · p99 {s['p99']}ms · media {s['mean']}ms")
+    print(f"🔁 Llamadas al modelo por turno: {report['model_calls_per_turn']}")
+    for tool, s in report['tool_ms'].items():
+        print(f"🔧 {tool}: p50 {s['p50']}ms · p95 {s['p95']}ms")
+    if 'memory_per_conversation_bytes' in report:
+        print(f"🧠 Memoria por conversación: {report['memory_per_conversation_bytes'] / 1024:.1f} KB")
+    if report['trace_events_dropped']:
+        print(f"⚠️  Eventos de trace descartados: {report['trace_events_dropped']}")
+    if report['failure_count']:
+        print(f"❌ {report['failure_count']} conversaciones no siguieron el guion:")
+        for failure in report['failures']:
+            print(f"   - {failure}")
+    else:
+        print("✅ Todas las conversaciones siguieron el guion")
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Credit card agents — simulated load benchmark")
+    parser.add_argument("--conversations", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=300, help="Espera antes de cada llamada al modelo")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="Variación aleatoria de esa espera")
+    parser.add_argument("--chunk-ms", type=float, default=5, help="Espera entre fragmentos de texto")
+    parser.add_argument("--tools", choices=TOOL_MODES, default='script')
+    parser.add_argument("--memory-sample", type=int, default=60,
+                        help="Conversaciones para medir memoria (0 para no medir)")
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte como JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(benchmark(args))
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_report(result)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Campaña saliente: una conversación por cliente, muchas a la vez.
+
+Toma los clientes del repositorio (o de un archivo con un ID por línea) y
+los reparte entre `--workers` tareas async. Cada tarea arma el agente de
+su país y corre el guion del cliente: por defecto solo la apertura
+("¿Aló?"), o los mensajes de `--script`. Todas las llamadas a Bedrock pasan
+por un mismo `BedrockRateLimiter` (requests y tokens por minuto), así que la
+campaña usa la cuota completa sin tormentas de throttling.
+
+Cada resultado se agrega como una línea a `--output` apenas termina. Ese
+archivo es también el checkpoint: con `--resume` se saltean los clientes
+que ya terminaron bien y la campaña sigue donde quedó; los que dieron error
+se vuelven a intentar (su nuevo resultado se agrega como otra línea).
+
+Uso:
+    python campaign.py --output campaigns/octubre.jsonl --workers 64
+    python campaign.py --output campaigns/octubre.jsonl --resume
+    python campaign.py --dry-run --output /tmp/prueba.jsonl   # modelo simulado, sin Bedrock
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from dotenv import load_dotenv
+
+from agents.agent import Agent
+from agents.bedrock_pool import get_bedrock_model
+from agents.miguel_prompt import MIGUEL_PROMPT
+from agents.rate_limit import BedrockRateLimiter, RateLimitedModel
+from agents.sofia_prompt import SOFIA_PROMPT
+from tools.data_store import repository
+
+load_dotenv()
+
+BEDROCK_REQUESTS_PER_MINUTE = float(os.getenv('BEDROCK_REQUESTS_PER_MINUTE', '200'))
+BEDROCK_TOKENS_PER_MINUTE = float(os.getenv('BEDROCK_TOKENS_PER_MINUTE', '200000'))
+
+DEFAULT_SCRIPT = ["¿Aló?"]
+
+
+def load_customer_ids(path: str = None) -> list[str]:
+    if not path:
+        return list(repository.customers)
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def completed_ids(path: Path) -> set[str]:
+    """Clientes que terminaron bien según el archivo de salida; una última línea cortada se ignora"""
+    done = set()
+    if not path.exists():
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            # Los que dieron error se reintentan en la próxima corrida
+            if result.get('status') == 'ok' and 'customer_id' in result:
+                done.add(result['customer_id'])
+    return done
+
+
+class ResultWriter:
+    """Agrega un resultado por línea y lo baja al archivo enseguida"""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Si la corrida anterior se cortó a mitad de línea, la próxima empieza en una nueva
+        needs_newline = False
+        if path.exists() and path.stat().st_size:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+        self._file = open(path, 'a', encoding='utf-8')
+        if needs_newline:
+            self._file.write('\n')
+
+    def write(self, result: dict):
+        self._file.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class Campaign:
+    def __init__(self, script: list[str], limiter: BedrockRateLimiter, writer: ResultWriter,
+                 dry_run: bool = False):
+        self.script = script
+        self.limiter = limiter
+        self.writer = writer
+        self.dry_run = dry_run
+        self.done = 0
+        self.failed = 0
+        self.cards_issued = 0
+
+    def _model(self, customer_id: str, country: str):
+        if self.dry_run:
+            from simulation.dialogues import DIALOGUES
+            from simulation.standin_model import StandInModel
+            name = 'col_accept' if country == 'Colombia' else 'mex_accept'
+            dialogue = next(d for d in DIALOGUES if d.name == name)
+            model = StandInModel(replace(dialogue, customer_id=customer_id))
+        else:
+            # Sin reintentos de botocore: cada throttling tiene que llegar al limitador
+            model = get_bedrock_model(sdk_retries=False)
+        return RateLimitedModel(model, self.limiter)
+
+    async def run_customer(self, customer_id: str) -> dict:
+        started = time.perf_counter()
+        result = {'customer_id': customer_id, 'started_at': datetime.now().isoformat()}
+        customer = repository.customer(customer_id)
+        if customer is None:
+            return {**result, 'status': 'error', 'error': 'Cliente no encontrado'}
+
+        prompt = SOFIA_PROMPT if customer['country'] == 'Colombia' else MIGUEL_PROMPT
+        agent = Agent(customer_id, prompt, model=self._model(customer_id, customer['country']))
+        result['conversation_id'] = agent.conversation_id
+        replies, tools, tokens = [], [], 0
+        try:
+            for message in self.script:
+                replies.append(await agent.achat(message))
+                for event in agent.conversation_trace[-1]['events']:
+                    if event['type'] == 'tool_call':
+                        tools.append(event['tool'])
+                    elif event['type'] == 'turn' and event['usage']:
+                        tokens += event['usage'].get('totalTokens', 0)
+            result['status'] = 'ok'
+        except Exception as e:
+            result.update(status='error', error=str(e))
+        finally:
+            await asyncio.to_thread(agent.save_trace)
+
+        return {
+            **result,
+            'replies': replies,
+            'tools': tools,
+            'card_issued': 'issue_card' in tools,
+            'tokens': tokens,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    async def worker(self, customers: Iterator[str]):
+        # Todas las tareas comparten el iterador: cada cliente lo toma una sola
+        for customer_id in customers:
+            result = await self.run_customer(customer_id)
+            self.writer.write(result)
+            self.done += 1
+            self.failed += result['status'] != 'ok'
+            self.cards_issued += bool(result.get('card_issued'))
+
+    async def run(self, customer_ids: Iterable[str], workers: int, total: int):
+        customers = iter(customer_ids)
+        tasks = [asyncio.create_task(self.worker(customers)) for _ in range(workers)]
+        progress = asyncio.create_task(self._report_progress(total))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            progress.cancel()
+            for task in tasks:
+                task.cancel()
+
+    async def _report_progress(self, total: int, every_secs: float = 10):
+        started = time.monotonic()
+        while True:
+            await asyncio.sleep(every_secs)
+            elapsed = time.monotonic() - started
+            stats = self.limiter.stats()
+            print(f"📊 {self.done}/{total} · ❌ {self.failed} · 💳 {self.cards_issued} · "
+                  f"{self.done / elapsed * 60:.0f} clientes/min · {stats['calls'] / elapsed * 60:.0f} requests/min · "
+                  f"{stats['tokens_used'] / elapsed * 60:.0f} tokens/min · throttling {stats['throttled']} "
+                  f"(ritmo {stats['rate_factor']:.0%})", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Credit card agents — outbound campaign runner")
+    parser.add_argument("--output", required=True, help="Archivo JSONL de resultados (y checkpoint)")
+    parser.add_argument("--customers", help="Archivo con un customer_id por línea (por defecto, todos)")
+    parser.add_argument("--script", help="JSON con la lista de mensajes del cliente (por defecto, solo la apertura)")
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--rpm", type=float, default=BEDROCK_REQUESTS_PER_MINUTE, help="Requests a Bedrock por minuto")
+    parser.add_argument("--tpm", type=float, default=BEDROCK_TOKENS_PER_MINUTE, help="Tokens de Bedrock por minuto")
+    parser.add_argument("--resume", action="store_true", help="Saltea los clientes que ya terminaron bien")
+    parser.add_argument("--dry-run", action="store_true", help="Usa el modelo simulado en lugar de Bedrock")
+    args = parser.parse_args()
+
+    if not args.dry_run and not os.getenv('AWS_ACCESS_KEY_ID'):
+        print("❌ Error: Configura tus credenciales AWS en el archivo .env")
+        return
+
+    output = Path(args.output)
+    if output.exists() and output.stat().st_size and not args.resume:
+        print(f"❌ {output} ya existe: usa --resume para continuar la campaña")
+        return
+
+    script = DEFAULT_SCRIPT
+    if args.script:
+        with open(args.script, encoding='utf-8') as f:
+            script = json.load(f)
+
+    customer_ids = load_customer_ids(args.customers)
+    done = completed_ids(output) if args.resume else set()
+    pending = [customer_id for customer_id in customer_ids if customer_id not in done]
+
+    print("\n" + "="*60)
+    print("📣 CAMPAÑA SALIENTE")
+    print("="*60)
+    print(f"👥 {len(customer_ids)} clientes · ✅ {len(done)} ya procesados · ⏳ {len(pending)} pendientes")
+    print(f"⚙️  {args.workers} workers · {args.rpm:.0f} requests/min · {args.tpm:.0f} tokens/min\n")
+
+    limiter = BedrockRateLimiter(args.rpm, args.tpm)
+    writer = ResultWriter(output)
+    campaign = Campaign(script, limiter, writer, dry_run=args.dry_run)
+    started = time.monotonic()
+    try:
+        asyncio.run(campaign.run(pending, args.workers, len(pending)))
+    except KeyboardInterrupt:
+        print("\n⏸️  Campaña interrumpida: continúa con --resume")
+    finally:
+        writer.close()
+
+    elapsed = time.monotonic() - started
+    print(f"\n✅ {campaign.done} conversaciones en {elapsed:.0f}s · ❌ {campaign.failed} con error · "
+          f"💳 {campaign.cards_issued} tarjetas · throttling {limiter.throttled}")
+    print(f"💾 Resultados en: {output}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,40 @@
 #!/usr/bin/env python3
+import asyncio
 import os
-import json
 from dotenv import load_dotenv
 from agents.agent import Agent
 from agents.sofia_prompt import SOFIA_PROMPT
 from agents.miguel_prompt import MIGUEL_PROMPT
+from tools.data_store import repository
 
 load_dotenv()
 
-def select_agent(customer_id: str):
-    """Selecciona el agente según el país del cliente"""
-    with open('data/customers.json', 'r') as f:
-        customers = json.load(f)
+def select_agent(customer_id: str, **agent_kwargs):
+    """Selecciona el agente según el país del cliente (agent_kwargs van al Agent de Strands)"""
+    customer = repository.customer(customer_id)
     
-    if customer_id not in customers:
-        raise ValueError(f"Cliente {customer_id} no encontrado")
+    if customer is None:
+        # También se acepta teléfono, cédula o CURP (solo coincidencia exacta)
+        matches = [m for m in repository.customers.lookup(customer_id) if m['match'] == 'exact']
+        if not matches:
+            raise ValueError(f"Cliente {customer_id} no encontrado")
+        customer_id, customer = matches[0]['customer_id'], matches[0]['customer']
     
-    country = customers[customer_id]['country']
+    country = customer['country']
     
     if country == 'Colombia':
-        print(f"🇨🇴 Iniciando Sofia para {customers[customer_id]['name']}")
-        return Agent(customer_id, SOFIA_PROMPT)
+        print(f"🇨🇴 Iniciando Sofia para {customer['name']}")
+        return Agent(customer_id, SOFIA_PROMPT, **agent_kwargs)
     else:
-        print(f"🇲🇽 Iniciando Miguel para {customers[customer_id]['name']}")
-        return Agent(customer_id, MIGUEL_PROMPT)
+        print(f"🇲🇽 Iniciando Miguel para {customer['name']}")
+        return Agent(customer_id, MIGUEL_PROMPT, **agent_kwargs)
+
+async def print_stream(agent, user_message: str):
+    """Imprime la respuesta del agente a medida que se genera"""
+    print("\n🤖 Agente: ", end="", flush=True)
+    async for text in agent.chat_stream(user_message):
+        print(text, end="", flush=True)
+    print("\n")
 
 def main():
     # Verificar credenciales
@@ -36,16 +47,13 @@ def main():
     print("="*60)
     
     # Mostrar clientes disponibles
-    with open('data/customers.json', 'r') as f:
-        customers = json.load(f)
-    
     print("\n📋 Clientes disponibles:\n")
-    for cid, data in customers.items():
+    for cid, data in repository.customers.items():
         flag = "🇨🇴" if data['country'] == 'Colombia' else "🇲🇽"
         print(f"{flag} {cid}: {data['name']} - Viendo: {data['product_viewed']}")
     
     # Seleccionar cliente
-    customer_id = input("\n🎯 ID del cliente: ").strip()
+    customer_id = input("\n🎯 ID, teléfono, cédula o CURP del cliente: ").strip()
     
     try:
         agent = select_agent(customer_id)
@@ -68,8 +76,7 @@ def main():
             if not user_input:
                 continue
             
-            response = agent.chat(user_input)
-            print(f"\n🤖 Agente: {response}\n")
+            asyncio.run(print_stream(agent, user_input))
     
     except Exception as e:
         print(f"\n❌ Error: {e}\n")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Modo servidor: muchas conversaciones de texto concurrentes en un proceso.
+
+HTTP:
+    POST   /sessions                  {"customer": "COL_001"} → {"session_id", "customer_id"}
+    POST   /sessions/{id}/messages    {"message": "..."}      → {"response"}
+    POST   /sessions/{id}/messages/stream                     → texto a medida que se genera
+    DELETE /sessions/{id}                                     → {"trace_file"}
+    GET    /health                                            → estado del registro
+WebSocket:
+    /ws?customer=COL_001              un mensaje de texto por turno, en ambos sentidos;
+                                      la sesión dura lo que la conexión (4404 si se cierra por HTTP)
+
+Uso:
+    python server.py --port 8080
+"""
+import argparse
+import os
+from contextlib import asynccontextmanager
+
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from agents.session_registry import RegistryFullError, SessionRegistry
+from main import select_agent
+
+load_dotenv()
+
+MAX_SESSIONS = int(os.getenv('MAX_SESSIONS', '500'))
+SESSION_IDLE_SECS = float(os.getenv('SESSION_IDLE_SECS', '900'))
+BEDROCK_MAX_CONCURRENCY = int(os.getenv('BEDROCK_MAX_CONCURRENCY', '16'))
+
+
+registry = SessionRegistry(
+    select_agent,
+    max_sessions=MAX_SESSIONS,
+    idle_secs=SESSION_IDLE_SECS,
+    max_concurrent_calls=BEDROCK_MAX_CONCURRENCY,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    registry.start()
+    yield
+    await registry.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class NewSession(BaseModel):
+    customer: str
+
+
+class UserMessage(BaseModel):
+    message: str
+
+
+async def _create_session(customer: str):
+    try:
+        return await registry.create(customer)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RegistryFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@app.post("/sessions")
+async def create_session(body: NewSession):
+    session = await _create_session(body.customer)
+    return {"session_id": session.session_id, "customer_id": session.agent.customer_id}
+
+
+@app.post("/sessions/{session_id}/messages")
+async def send_message(session_id: str, body: UserMessage):
+    try:
+        response = await registry.chat(session_id, body.message)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Sesión no encontrada")
+    return {"response": response}
+
+
+@app.post("/sessions/{session_id}/messages/stream")
+async def stream_message(session_id: str, body: UserMessage):
+    """La respuesta llega en texto plano a medida que el modelo la genera"""
+    try:
+        stream = registry.chat_stream(session_id, body.message)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Sesión no encontrada")
+    return StreamingResponse(stream, media_type="text/plain")
+
+
+@app.delete("/sessions/{session_id}")
+async def close_session(session_id: str):
+    if not registry.get(session_id):
+        raise HTTPException(status_code=404, detail="Sesión no encontrada")
+    return {"trace_file": await registry.close(session_id)}
+
+
+@app.get("/health")
+async def health():
+    return registry.stats()
+
+
+@app.websocket("/ws")
+async def chat_ws(websocket: WebSocket, customer: str):
+    await websocket.accept()
+    try:
+        # La sesión vive lo que la conexión: no se desaloja por inactividad
+        session = await registry.create(customer, pinned=True)
+    except (ValueError, RegistryFullError) as e:
+        await websocket.close(code=1008 if isinstance(e, ValueError) else 1013, reason=str(e))
+        return
+    try:
+        while True:
+            message = (await websocket.receive_text()).strip()
+            if message:
+                await websocket.send_text(await registry.chat(session.session_id, message))
+    except WebSocketDisconnect:
+        pass
+    except KeyError:
+        # Alguien la cerró por HTTP (DELETE /sessions/{id}) con la conexión abierta
+        await websocket.close(code=4404, reason="Sesión cerrada")
+    finally:
+        await registry.close(session.session_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Credit card agents — server mode")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,97 @@
+"""Diálogos guionados para simular conversaciones sin llamar a Bedrock.
+
+Cada `Turn` tiene lo que dice el cliente, las tools que el agente debería
+llamar en ese turno y la respuesta que da el modelo simulado después de las
+tools. Hay tres caminos por país: acepta, objeta y después acepta, y
+rechaza.
+"""
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class Turn:
+    user: str
+    reply: str
+    tools: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Dialogue:
+    name: str
+    customer_id: str
+    path: str  # 'accept' | 'objection' | 'reject'
+    turns: tuple[Turn, ...] = field(default_factory=tuple)
+
+    @property
+    def expects_card(self) -> bool:
+        return any('issue_card' in turn.tools for turn in self.turns)
+
+
+_COL_OPENING = Turn(
+    user="¿Aló? Sí, con él habla",
+    reply="Hola Carlos, soy Sofia del Banco. Vi que estaba mirando la Cámara Sony Alpha. ¿Me regala dos minutos?",
+    tools=('get_customer_profile',),
+)
+_COL_PROPOSAL = Turn(
+    user="Bueno, dígame",
+    reply="Tiene pre-aprobada una Mastercard Premium con millas para vuelos y un cupo de ocho millones de pesos. "
+          "Los primeros 6 meses no paga nada.",
+    tools=('check_credit_limit',),
+)
+_COL_CLOSE = Turn(
+    user="Sí, me interesa, ¿cómo la activo?",
+    reply="¡Listo! Su tarjeta virtual ya está activa y puede usarla hoy mismo para la cámara.",
+    tools=('issue_card',),
+)
+
+_MEX_OPENING = Turn(
+    user="¿Bueno? Sí, soy yo",
+    reply="¡Hola Andrés! Soy Miguel del Banco. Vi que andabas viendo los audífonos Sony. ¿Tienes dos minutos?",
+    tools=('get_customer_profile',),
+)
+_MEX_PROPOSAL = Turn(
+    user="Va, cuéntame",
+    reply="Tienes pre-aprobada una Mastercard Premium con meses sin intereses y 3% de cashback en restaurantes. "
+          "Tu límite es de treinta y cinco mil pesos.",
+    tools=('check_credit_limit',),
+)
+_MEX_CLOSE = Turn(
+    user="Órale, sí la quiero",
+    reply="¡Perfecto! Tu tarjeta virtual ya está activa, puedes comprar los audífonos hoy a meses sin intereses.",
+    tools=('issue_card',),
+)
+
+DIALOGUES = (
+    Dialogue('col_accept', 'COL_001', 'accept', (_COL_OPENING, _COL_PROPOSAL, _COL_CLOSE)),
+    Dialogue('col_objection', 'COL_001', 'objection', (
+        _COL_OPENING,
+        _COL_PROPOSAL,
+        Turn(user="Ya tengo una tarjeta de crédito",
+             reply="Entiendo. ¿La que tiene le da millas para vuelos? Esta sería complementaria y sin costo por 6 meses."),
+        _COL_CLOSE,
+    )),
+    Dialogue('col_reject', 'COL_001', 'reject', (
+        _COL_OPENING,
+        _COL_PROPOSAL,
+        Turn(user="No me interesa, gracias",
+             reply="Lo entiendo. ¿Sabía que con las millas el primer vuelo le puede salir casi gratis?"),
+        Turn(user="No, de verdad no",
+             reply="Perfecto Carlos, gracias por su tiempo. Que tenga un buen día."),
+    )),
+    Dialogue('mex_accept', 'MEX_001', 'accept', (_MEX_OPENING, _MEX_PROPOSAL, _MEX_CLOSE)),
+    Dialogue('mex_objection', 'MEX_001', 'objection', (
+        _MEX_OPENING,
+        _MEX_PROPOSAL,
+        Turn(user="¿Y cuánto cuesta la anualidad?",
+             reply="Los primeros 6 meses no pagas nada, y con el cashback prácticamente se paga sola."),
+        _MEX_CLOSE,
+    )),
+    Dialogue('mex_reject', 'MEX_001', 'reject', (
+        _MEX_OPENING,
+        _MEX_PROPOSAL,
+        Turn(user="No gracias, no quiero más tarjetas",
+             reply="Te entiendo. ¿Y si te digo que los audífonos te quedan a meses sin intereses?"),
+        Turn(user="Que no, gracias",
+             reply="Sin problema Andrés, gracias por tu tiempo. ¡Que tengas buen día!"),
+    )),
+)
@@ -0,0 +1,129 @@
+"""Modelo local que reemplaza a Bedrock en las simulaciones.
+
+`StandInModel` implementa la interfaz de modelos de Strands y sigue un
+`Dialogue`. En cada turno pide las tools que indica el guion y, cuando
+tiene sus resultados, devuelve la respuesta del guion en fragmentos, como
+un stream real. Se configura:
+
+- `latency_ms` y `jitter_ms`: espera antes del primer evento de cada
+  llamada al modelo;
+- `chunk_ms`: espera entre fragmentos de texto;
+- `tools`: 'script' (todas las tools del turno en una llamada), 'sequential'
+  (una por llamada, más idas y vueltas) o 'none' (nunca llama tools).
+
+Usa un modelo por conversación: guarda cuánto tiempo "pasó en el modelo"
+(`waited_ms`) para separar ese tiempo del resto del turno.
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, AsyncIterable, Optional
+
+from strands.models import Model
+
+from simulation.dialogues import Dialogue, Turn
+
+TOOL_MODES = ('script', 'sequential', 'none')
+
+
+class StandInModel(Model):
+    """Modelo guionado con latencia configurable; ver docstring del módulo"""
+
+    def __init__(self, dialogue: Dialogue, *, latency_ms: float = 300, jitter_ms: float = 100,
+                 chunk_ms: float = 5, chunk_chars: int = 12, tools: str = 'script'):
+        if tools not in TOOL_MODES:
+            raise ValueError(f"tools debe ser uno de {TOOL_MODES}")
+        self.dialogue = dialogue
+        self.config = {
+            'model_id': 'standin',
+            'latency_ms': latency_ms,
+            'jitter_ms': jitter_ms,
+            'chunk_ms': chunk_ms,
+            'chunk_chars': chunk_chars,
+            'tools': tools,
+        }
+        self.calls = 0
+        self.waited_ms = 0.0
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> dict:
+        return self.config
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError("StandInModel no genera salida estructurada")
+
+    def take_waited_ms(self) -> float:
+        """Tiempo simulado de modelo desde la última llamada, y lo pone en cero"""
+        waited, self.waited_ms = self.waited_ms, 0.0
+        return waited
+
+    async def _wait(self, ms: float):
+        if ms > 0:
+            started = time.perf_counter()
+            await asyncio.sleep(ms / 1000)
+            self.waited_ms += (time.perf_counter() - started) * 1000
+
+    def _current_turn(self, messages: list) -> tuple[Optional[Turn], list[str]]:
+        """Turno del guion según los mensajes del cliente, y las tools ya llamadas en él"""
+        turn_index = -1
+        called: list[str] = []
+        names: dict[str, str] = {}
+        for message in messages:
+            for block in message['content']:
+                if 'toolUse' in block:
+                    names[block['toolUse']['toolUseId']] = block['toolUse']['name']
+                elif 'toolResult' in block:
+                    called.append(names.get(block['toolResult']['toolUseId'], ''))
+                elif 'text' in block and message['role'] == 'user':
+                    turn_index += 1
+                    called = []
+        turns = self.dialogue.turns
+        return (turns[turn_index] if 0 <= turn_index < len(turns) else None), called
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncIterable[dict]:
+        self.calls += 1
+        config = self.config
+        started = time.perf_counter()
+        await self._wait(config['latency_ms'] + random.uniform(0, config['jitter_ms']))
+
+        turn, called = self._current_turn(messages)
+        pending = [name for name in (turn.tools if turn else ()) if name not in called]
+        if config['tools'] == 'none':
+            pending = []
+        elif config['tools'] == 'sequential':
+            pending = pending[:1]
+
+        yield {'messageStart': {'role': 'assistant'}}
+        if pending:
+            for name in pending:
+                yield {'contentBlockStart': {'start': {'toolUse': {'name': name, 'toolUseId': uuid.uuid4().hex}}}}
+                yield {'contentBlockDelta': {'delta': {'toolUse': {
+                    'input': json.dumps({'customer_id': self.dialogue.customer_id}),
+                }}}}
+                yield {'contentBlockStop': {}}
+            output = json.dumps(pending)
+            stop_reason = 'tool_use'
+        else:
+            output = turn.reply if turn else "Gracias por su tiempo."
+            size = config['chunk_chars']
+            yield {'contentBlockStart': {'start': {}}}
+            for i in range(0, len(output), size):
+                if i:
+                    await self._wait(config['chunk_ms'])
+                yield {'contentBlockDelta': {'delta': {'text': output[i:i + size]}}}
+            yield {'contentBlockStop': {}}
+            stop_reason = 'end_turn'
+        yield {'messageStop': {'stopReason': stop_reason}}
+
+        # Tokens aproximados (4 caracteres por token), para que el trace tenga la misma forma que con Bedrock
+        input_tokens = sum(len(json.dumps(m['content'], ensure_ascii=False)) for m in messages) // 4
+        output_tokens = max(1, len(output) // 4)
+        yield {'metadata': {
+            'usage': {'inputTokens': input_tokens, 'outputTokens': output_tokens,
+                      'totalTokens': input_tokens + output_tokens},
+            'metrics': {'latencyMs': int((time.perf_counter() - started) * 1000)},
+        }}
@@ -0,0 +1,250 @@
+"""Índices secundarios de clientes: teléfono (E.164), cédula y CURP.
+
+Las llamadas entrantes identifican a la persona por teléfono, cédula o CURP,
+no por el ID interno (`COL_001`). `CustomerIndex` normaliza esos campos y
+arma, por campo:
+
+- un dict clave → customer_id para búsqueda exacta, O(1);
+- claves ordenadas en bloques (`_SortedKeys`) para búsqueda por prefijo,
+  O(log n + resultados);
+- búsqueda aproximada (un error de tipeo o de dictado: un carácter de más,
+  de menos, cambiado o dos vecinos invertidos) generando las variantes de la
+  consulta y buscando cada una en el dict. No ocupa memoria extra y su costo
+  depende del largo de la clave, no de la cantidad de clientes.
+
+`upsert` y `remove` actualizan los índices de a un cliente, sin
+reconstruirlos: el dict en O(1) y las claves ordenadas en O(log n) más el
+tamaño de un bloque (acotado), en lugar de mover la lista entera.
+"""
+import bisect
+import re
+import string
+from typing import Iterable, Iterator, Mapping, Optional
+
+# Código de país para completar teléfonos escritos sin él
+COUNTRY_CODES = {'Colombia': '57', 'Mexico': '52'}
+
+FIELDS = ('phone', 'cedula', 'curp')
+
+# Consultas más cortas darían demasiados candidatos por prefijo o aproximación
+MIN_PREFIX_LEN = 4
+MIN_FUZZY_LEN = 6
+
+_ALPHABETS = {
+    'phone': string.digits,
+    'cedula': string.digits,
+    'curp': string.ascii_uppercase + string.digits,
+}
+
+
+def normalize_phone(raw: str, country: Optional[str] = None) -> Optional[str]:
+    """'+57 300 123 4588' → '+573001234588'. Sin '+' se antepone el código del país, si se conoce"""
+    raw = (raw or '').strip()
+    digits = re.sub(r'\D', '', raw)
+    if not digits:
+        return None
+    if raw.startswith('+'):
+        return '+' + digits
+    if raw.startswith('00'):
+        return '+' + digits[2:]
+    code = COUNTRY_CODES.get(country)
+    return f'+{code}{digits}' if code else None
+
+
+def normalize_cedula(raw: str) -> Optional[str]:
+    digits = re.sub(r'\D', '', raw or '')
+    return digits or None
+
+
+def normalize_curp(raw: str) -> Optional[str]:
+    curp = re.sub(r'[\s-]', '', raw or '').upper()
+    return curp or None
+
+
+def _normalize(field: str, raw: str, country: Optional[str] = None) -> Optional[str]:
+    if field == 'phone':
+        return normalize_phone(raw, country)
+    if field == 'cedula':
+        return normalize_cedula(raw)
+    return normalize_curp(raw)
+
+
+class _SortedKeys:
+    """Claves ordenadas en bloques de a lo sumo `2 * load`.
+
+    Se ubica el bloque con `bisect` sobre el máximo de cada bloque y solo ese
+    bloque se modifica, así que agregar o quitar una clave no desplaza todas
+    las demás como en una única lista.
+    """
+
+    def __init__(self, keys: Iterable[str] = (), load: int = 512):
+        self._load = load
+        keys = sorted(keys)
+        self._blocks = [keys[i:i + load] for i in range(0, len(keys), load)]
+        self._maxes = [block[-1] for block in self._blocks]
+
+    def __len__(self) -> int:
+        return sum(len(block) for block in self._blocks)
+
+    def _locate(self, key: str) -> int:
+        return min(bisect.bisect_left(self._maxes, key), len(self._maxes) - 1)
+
+    def add(self, key: str):
+        if not self._blocks:
+            self._blocks, self._maxes = [[key]], [key]
+            return
+        b = self._locate(key)
+        block = self._blocks[b]
+        i = bisect.bisect_left(block, key)
+        if i < len(block) and block[i] == key:
+            return
+        block.insert(i, key)
+        self._maxes[b] = block[-1]
+        if len(block) > 2 * self._load:
+            self._blocks[b:b + 1] = [block[:self._load], block[self._load:]]
+            self._maxes[b:b + 1] = [block[self._load - 1], block[-1]]
+
+    def discard(self, key: str):
+        if not self._blocks:
+            return
+        b = self._locate(key)
+        block = self._blocks[b]
+        i = bisect.bisect_left(block, key)
+        if i == len(block) or block[i] != key:
+            return
+        del block[i]
+        if block:
+            self._maxes[b] = block[-1]
+        else:
+            del self._blocks[b], self._maxes[b]
+
+    def iter_from(self, key: str) -> Iterator[str]:
+        """Claves >= `key`, en orden"""
+        if not self._blocks:
+            return
+        b = self._locate(key)
+        block = self._blocks[b]
+        yield from block[bisect.bisect_left(block, key):]
+        for block in self._blocks[b + 1:]:
+            yield from block
+
+
+def _edits(key: str, alphabet: str, keep: int = 0) -> Iterable[str]:
+    """Variantes a un error de distancia de `key`, sin tocar los primeros `keep` caracteres"""
+    head, body = key[:keep], key[keep:]
+    for i in range(len(body) + 1):
+        left, right = body[:i], body[i:]
+        if right:
+            yield head + left + right[1:]                         # sobra un carácter
+            for c in alphabet:
+                if c != right[0]:
+                    yield head + left + c + right[1:]             # carácter cambiado
+        if len(right) > 1:
+            yield head + left + right[1] + right[0] + right[2:]   # vecinos invertidos
+        for c in alphabet:
+            yield head + left + c + right                         # falta un carácter
+
+
+class CustomerIndex:
+    """Índices exactos, por prefijo y aproximados; ver docstring del módulo"""
+
+    def __init__(self, customers: Mapping[str, Mapping] = None):
+        self._exact: dict[str, dict[str, str]] = {f: {} for f in FIELDS}
+        self._sorted: dict[str, _SortedKeys] = {}
+        self._keys: dict[str, dict[str, str]] = {}  # customer_id → {campo: clave}
+        for customer_id, record in (customers or {}).items():
+            self._add(customer_id, record)
+        for field in FIELDS:
+            self._sorted[field] = _SortedKeys(self._exact[field])
+
+    def _record_keys(self, record: Mapping) -> dict[str, str]:
+        keys = {}
+        for field in FIELDS:
+            if record.get(field):
+                key = _normalize(field, str(record[field]), record.get('country'))
+                if key:
+                    keys[field] = key
+        return keys
+
+    def _add(self, customer_id: str, record: Mapping):
+        keys = self._record_keys(record)
+        self._keys[customer_id] = keys
+        for field, key in keys.items():
+            self._exact[field][key] = customer_id
+
+    def upsert(self, customer_id: str, record: Mapping):
+        """Agrega o actualiza un cliente en los índices"""
+        self.remove(customer_id)
+        self._add(customer_id, record)
+        for field, key in self._keys[customer_id].items():
+            self._sorted[field].add(key)
+
+    def remove(self, customer_id: str):
+        for field, key in self._keys.pop(customer_id, {}).items():
+            if self._exact[field].get(key) != customer_id:
+                continue
+            del self._exact[field][key]
+            self._sorted[field].discard(key)
+
+    def _query_keys(self, field: str, raw: str) -> list[str]:
+        """Claves normalizadas posibles para una consulta (teléfonos sin código: uno por país)"""
+        if field == 'phone' and not raw.strip().startswith(('+', '00')):
+            digits = normalize_cedula(raw)
+            if not digits:
+                return []
+            return [f'+{code}{digits}' for code in COUNTRY_CODES.values()] + [f'+{digits}']
+        key = _normalize(field, raw)
+        return [key] if key else []
+
+    def exact(self, field: str, raw: str) -> Optional[str]:
+        for key in self._query_keys(field, raw):
+            if key in self._exact[field]:
+                return self._exact[field][key]
+        return None
+
+    def prefix(self, field: str, raw: str, limit: int = 10) -> list[str]:
+        found = []
+        for query in self._query_keys(field, raw):
+            for key in self._sorted[field].iter_from(query):
+                if not key.startswith(query) or len(found) >= limit:
+                    break
+                found.append(self._exact[field][key])
+        return list(dict.fromkeys(found))[:limit]
+
+    def fuzzy(self, field: str, raw: str, limit: int = 10) -> list[str]:
+        found = []
+        exact = self._exact[field]
+        for query in self._query_keys(field, raw):
+            # En teléfonos el código de país queda fijo
+            keep = len(query) - len(normalize_cedula(raw) or '') if field == 'phone' else 0
+            for variant in _edits(query, _ALPHABETS[field], keep=max(keep, 0)):
+                if variant in exact:
+                    found.append(exact[variant])
+        return list(dict.fromkeys(found))[:limit]
+
+    def guess_fields(self, raw: str) -> tuple[str, ...]:
+        """Campos en los que tiene sentido buscar `raw`"""
+        if re.search(r'[A-Za-z]', raw):
+            return ('curp',)
+        if raw.strip().startswith(('+', '00')):
+            return ('phone',)
+        return ('cedula', 'phone')
+
+    def lookup(self, raw: str, field: Optional[str] = None, limit: int = 5) -> list[dict]:
+        """Exacta primero; si no hay, por prefijo; si tampoco, aproximada"""
+        fields = (field,) if field else self.guess_fields(raw)
+        for match, search in (('exact', None), ('prefix', self.prefix), ('fuzzy', self.fuzzy)):
+            min_len = {'prefix': MIN_PREFIX_LEN, 'fuzzy': MIN_FUZZY_LEN}.get(match, 0)
+            if len(re.sub(r'[\W_]', '', raw)) < min_len:
+                continue
+            results = []
+            for f in fields:
+                if search is None:
+                    customer_id = self.exact(f, raw)
+                    ids = [customer_id] if customer_id else []
+                else:
+                    ids = search(f, raw, limit)
+                results.extend({'customer_id': cid, 'field': f, 'match': match} for cid in ids)
+            if results:
+                return results[:limit]
+        return []
@@ -0,0 +1,169 @@
+"""Repositorio compartido de los datos de data/ (clientes, productos).
+
+Cada archivo se parsea una sola vez y queda en memoria como una vista de
+solo lectura (dicts → MappingProxyType, listas → tuplas), compartida por
+todas las tools y agentes del proceso. Antes de devolverla se revisa el
+mtime del archivo (como mucho una vez por `check_interval` segundos):
+
+- si cambió, un solo hilo lo vuelve a parsear y reemplaza la vista de una
+  vez; mientras tanto los demás siguen leyendo la versión anterior;
+- si el archivo nuevo está roto (p. ej. a medio escribir) se sigue usando
+  la versión anterior hasta que el archivo vuelva a cambiar.
+
+`customers.json` se carga como `CustomerStore`, que además arma los índices
+por teléfono, cédula y CURP en cada recarga.
+
+Para escribir datos nuevos sin que nadie lea un archivo a medias: escribir
+a un temporal y hacer `os.replace` sobre el original.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+from tools.customer_index import CustomerIndex
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+def freeze(value):
+    """Convierte dicts y listas a vistas inmutables, recursivamente"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Copia mutable (y serializable a JSON) de una vista congelada"""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class CustomerStore(Mapping):
+    """Clientes de solo lectura más sus índices secundarios (ver customer_index.py)"""
+
+    def __init__(self, customers: dict):
+        self._records = {customer_id: freeze(record) for customer_id, record in customers.items()}
+        self.index = CustomerIndex(self._records)
+
+    def __getitem__(self, customer_id: str) -> Mapping:
+        return self._records[customer_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def upsert(self, customer_id: str, record: dict):
+        """Actualización incremental en memoria; una recarga del archivo la reemplaza"""
+        self._records[customer_id] = freeze(record)
+        self.index.upsert(customer_id, self._records[customer_id])
+
+    def remove(self, customer_id: str):
+        self._records.pop(customer_id, None)
+        self.index.remove(customer_id)
+
+    def lookup(self, identifier: str, field: Optional[str] = None, limit: int = 5) -> list[dict]:
+        """Busca por teléfono, cédula o CURP; cada resultado trae el registro"""
+        return [
+            {**match, 'customer': self._records[match['customer_id']]}
+            for match in self.index.lookup(identifier, field, limit)
+        ]
+
+
+# Archivos que se construyen con algo más que `freeze`
+_BUILDERS: dict[str, Callable[[Any], Any]] = {'customers.json': CustomerStore}
+
+
+class JsonFile:
+    """Un archivo JSON cacheado que se recarga cuando cambia su mtime"""
+
+    def __init__(self, path: Path, build: Optional[Callable[[Any], Any]] = None,
+                 check_interval: float = 1.0):
+        self.path = Path(path)
+        self._build = build or freeze
+        self._check_interval = check_interval
+        self._reload_lock = threading.Lock()
+        self._value = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self.loads = 0
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        now = time.monotonic()
+        if self._value is not None and now - self._checked_at < self._check_interval:
+            return self._value
+
+        # Solo un hilo recarga; el resto usa la versión que ya hay
+        if not self._reload_lock.acquire(blocking=self._value is None):
+            return self._value
+        try:
+            self._checked_at = now
+            stamp = None
+            try:
+                stamp = self._file_stamp()
+                if stamp != self._stamp:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        value = self._build(json.load(f))
+                    # Asignar la referencia es atómico: nadie ve una versión a medias
+                    self._value = value
+                    self._stamp = stamp
+                    self.loads += 1
+            except (OSError, ValueError) as e:
+                # Sin versión anterior no se guarda el stamp: la próxima llamada lo vuelve a intentar
+                if self._value is None:
+                    raise
+                # Con una versión anterior, un archivo roto no se vuelve a parsear hasta que cambie otra vez
+                if stamp is not None:
+                    self._stamp = stamp
+                print(f"⚠️ No se pudo recargar {self.path.name} ({e}), se sigue usando la versión anterior")
+            return self._value
+        finally:
+            self._reload_lock.release()
+
+
+class DataRepository:
+    """Acceso a los archivos de data/ compartido por tools y agentes"""
+
+    def __init__(self, data_dir: Path = DATA_DIR, check_interval: float = 1.0):
+        self.data_dir = Path(data_dir)
+        self._check_interval = check_interval
+        self._files: dict[str, JsonFile] = {}
+        self._lock = threading.Lock()
+
+    def file(self, filename: str) -> JsonFile:
+        with self._lock:
+            if filename not in self._files:
+                self._files[filename] = JsonFile(self.data_dir / filename, _BUILDERS.get(filename),
+                                                 self._check_interval)
+            return self._files[filename]
+
+    def get(self, filename: str):
+        return self.file(filename).get()
+
+    @property
+    def customers(self) -> CustomerStore:
+        return self.get('customers.json')
+
+    @property
+    def products(self) -> Mapping[str, Mapping]:
+        return self.get('products.json')
+
+    def customer(self, customer_id: str) -> Optional[Mapping]:
+        return self.customers.get(customer_id)
+
+
+repository = DataRepository()
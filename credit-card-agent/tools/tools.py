@@ -1,10 +1,9 @@
-import json
 from strands.tools import tool
+from tools.data_store import repository, thaw
 
 def load_data(filename):
-    """Carga archivos JSON de data/"""
-    with open(f'data/{filename}', 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Vista de solo lectura de un archivo JSON de data/ (cacheada, ver data_store.py)"""
+    return repository.get(filename)
 
 
 @tool
@@ -19,12 +18,12 @@ def get_customer_profile(customer_id: str) -> dict:
     Returns:
         Diccionario con success=True y data con el perfil completo del cliente
     """
-    customers = load_data('customers.json')
+    customer = repository.customer(customer_id)
     
-    if customer_id in customers:
+    if customer is not None:
         return {
             "success": True,
-            "data": customers[customer_id]
+            "data": thaw(customer)
         }
     return {"success": False, "error": "Cliente no encontrado"}
 
@@ -41,12 +40,10 @@ def check_credit_limit(customer_id: str) -> dict:
     Returns:
         Diccionario con success=True, limit (monto) y currency (COP o MXN)
     """
-    customers = load_data('customers.json')
+    customer = repository.customer(customer_id)
     
-    if customer_id in customers:
-        customer = customers[customer_id]
-        products = load_data('products.json')
-        currency = products[customer['country']]['currency']
+    if customer is not None:
+        currency = repository.products[customer['country']]['currency']
         
         return {
             "success": True,
@@ -69,9 +66,7 @@ def issue_card(customer_id: str) -> dict:
     Returns:
         Diccionario con success=True, card_number, status y mensaje de confirmación
     """
-    customers = load_data('customers.json')
-    
-    if customer_id in customers:
+    if repository.customer(customer_id) is not None:
         return {
             "success": True,
             "card_number": "**** **** **** 1234",
@@ -79,3 +74,36 @@ def issue_card(customer_id: str) -> dict:
             "message": "Tarjeta virtual emitida"
         }
     return {"success": False, "error": "Cliente no encontrado"}
+
+
+@tool
+def find_customer(identifier: str) -> dict:
+    """
+    Identifica al cliente por teléfono, cédula (Colombia) o CURP (México).
+    Úsalo cuando el cliente se identifique con alguno de esos datos en lugar del ID.
+    Tolera espacios, guiones, el teléfono sin código de país y un dígito o letra mal dictado.
+    
+    Args:
+        identifier: Teléfono, cédula o CURP tal como lo dijo el cliente
+    
+    Returns:
+        Diccionario con success=True y matches: lista de customer_id, name, country y
+        match ("exact", "prefix" o "fuzzy"). Si el match no es exacto, confirma los datos con el cliente.
+    """
+    matches = repository.customers.lookup(identifier)
+    
+    if matches:
+        return {
+            "success": True,
+            "matches": [
+                {
+                    "customer_id": m['customer_id'],
+                    "name": m['customer']['name'],
+                    "country": m['customer']['country'],
+                    "field": m['field'],
+                    "match": m['match'],
+                }
+                for m in matches
+            ]
+        }
+    return {"success": False, "error": "Cliente no encontrado"}
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Consultas sobre el índice de traces (agents/trace_store.py).
+
+Cada consulta primero carga lo nuevo de la carpeta de traces (incremental,
+solo lo que se agregó desde la última vez) y después agrega en SQLite.
+
+Uso:
+    python trace_query.py ingest
+    python trace_query.py summary                      # conversaciones, turnos, conversión por país
+    python trace_query.py turns-to-card                # turnos promedio hasta issue_card, por país
+    python trace_query.py tools --country Colombia     # latencia y errores por tool
+    python trace_query.py latency --since 2026-10-01   # primer token y duración de turno, por país
+    python trace_query.py sql "SELECT tool, count(*) FROM tool_calls GROUP BY tool"
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+
+from agents.trace_store import TraceStore
+
+TRACE_DIR = os.getenv('TRACE_DIR', 'traces')
+TRACE_INDEX = os.getenv('TRACE_INDEX', os.path.join(TRACE_DIR, 'index.sqlite'))
+
+
+def _filters(args) -> tuple[str, list]:
+    clauses, params = [], []
+    if args.since:
+        clauses.append("c.started_at >= ?")
+        params.append(args.since)
+    if args.country:
+        clauses.append("c.country = ?")
+        params.append(args.country)
+    return (' AND '.join(clauses) or '1'), params
+
+
+def _percentile(values: list[float], q: float):
+    return round(values[min(len(values) - 1, int(q * len(values)))], 1) if values else None
+
+
+def summary(store: TraceStore, args) -> list[dict]:
+    where, params = _filters(args)
+    return store.query(f"""
+        SELECT coalesce(c.country, '?') AS country,
+               count(*) AS conversations,
+               sum(c.turns) AS turns,
+               round(avg(c.turns), 2) AS avg_turns,
+               sum(c.card_turn IS NOT NULL) AS cards,
+               round(100.0 * avg(c.card_turn IS NOT NULL), 1) AS conversion_pct,
+               sum(c.tokens) AS tokens
+        FROM conversations c WHERE {where}
+        GROUP BY 1 ORDER BY 1
+    """, params)
+
+
+def turns_to_card(store: TraceStore, args) -> list[dict]:
+    where, params = _filters(args)
+    return store.query(f"""
+        SELECT coalesce(c.country, '?') AS country,
+               count(*) AS cards,
+               round(avg(c.card_turn), 2) AS avg_turns_to_card,
+               min(c.card_turn) AS min_turns,
+               max(c.card_turn) AS max_turns
+        FROM conversations c WHERE c.card_turn IS NOT NULL AND {where}
+        GROUP BY 1 ORDER BY 1
+    """, params)
+
+
+def tools(store: TraceStore, args) -> list[dict]:
+    where, params = _filters(args)
+    calls = defaultdict(lambda: {'calls': 0, 'errors': 0, 'durations': []})
+    for row in store.db.execute(f"""
+        SELECT t.tool, t.status, t.duration_ms
+        FROM tool_calls t JOIN conversations c USING (conversation_id) WHERE {where}
+        ORDER BY t.tool, t.duration_ms
+    """, params):
+        tool = calls[row['tool']]
+        tool['calls'] += 1
+        tool['errors'] += row['status'] == 'error'
+        if row['duration_ms'] is not None:
+            tool['durations'].append(row['duration_ms'])
+    return [{
+        'tool': name,
+        'calls': tool['calls'],
+        'errors': tool['errors'],
+        'avg_ms': round(sum(tool['durations']) / len(tool['durations']), 1) if tool['durations'] else None,
+        'p50_ms': _percentile(tool['durations'], 0.50),
+        'p95_ms': _percentile(tool['durations'], 0.95),
+    } for name, tool in calls.items()]
+
+
+def latency(store: TraceStore, args) -> list[dict]:
+    where, params = _filters(args)
+    groups = defaultdict(lambda: {'ttft': [], 'turn': []})
+    for row in store.db.execute(f"""
+        SELECT coalesce(c.country, '?') AS country, t.ttft_ms, coalesce(t.total_ms, t.duration_ms) AS turn_ms
+        FROM turns t JOIN conversations c USING (conversation_id) WHERE {where}
+    """, params):
+        group = groups[row['country']]
+        if row['ttft_ms'] is not None:
+            group['ttft'].append(row['ttft_ms'])
+        if row['turn_ms'] is not None:
+            group['turn'].append(row['turn_ms'])
+    result = []
+    for country, group in sorted(groups.items()):
+        ttft, turn = sorted(group['ttft']), sorted(group['turn'])
+        result.append({
+            'country': country,
+            'turns': len(turn),
+            'ttft_p50_ms': _percentile(ttft, 0.50),
+            'ttft_p95_ms': _percentile(ttft, 0.95),
+            'turn_p50_ms': _percentile(turn, 0.50),
+            'turn_p95_ms': _percentile(turn, 0.95),
+        })
+    return result
+
+
+REPORTS = {
+    'summary': summary,
+    'turns-to-card': turns_to_card,
+    'tools': tools,
+    'latency': latency,
+}
+
+
+def print_table(rows: list[dict]):
+    if not rows:
+        print("(sin resultados)")
+        return
+    columns = list(rows[0])
+    cells = [[('' if row[c] is None else str(row[c])) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(line[i]) for line in cells)) for i, c in enumerate(columns)]
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths)))
+    print('  '.join('─' * w for w in widths))
+    for line in cells:
+        print('  '.join(value.ljust(w) for value, w in zip(line, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Credit card agents — trace index and queries")
+    parser.add_argument("report", choices=['ingest', 'sql', *REPORTS])
+    parser.add_argument("sql", nargs='?', help="Consulta SQL (solo con 'sql')")
+    parser.add_argument("--dir", default=TRACE_DIR, help="Carpeta de traces")
+    parser.add_argument("--db", default=TRACE_INDEX, help="Archivo SQLite del índice")
+    parser.add_argument("--since", help="Solo conversaciones desde esta fecha (ISO, p. ej. 2026-10-01)")
+    parser.add_argument("--country", help="Solo conversaciones de este país (Colombia, Mexico)")
+    parser.add_argument("--no-ingest", action="store_true", help="Consulta el índice sin cargar lo nuevo")
+    parser.add_argument("--json", action="store_true", help="Imprime el resultado como JSON")
+    args = parser.parse_args()
+
+    store = TraceStore(args.db, args.dir)
+    try:
+        if not args.no_ingest:
+            started = time.perf_counter()
+            counts = store.ingest()
+            if args.report == 'ingest' or (counts['files'] and not args.json):
+                print(f"📥 {counts['files']} archivos, {counts['lines']} líneas nuevas "
+                      f"en {time.perf_counter() - started:.1f}s")
+        if args.report == 'ingest':
+            return
+        if args.report == 'sql':
+            if not args.sql:
+                parser.error("'sql' necesita una consulta")
+            store.db.execute("PRAGMA query_only = ON")
+            rows = store.query(args.sql)
+        else:
+            rows = REPORTS[args.report](store, args)
+    finally:
+        store.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+    else:
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
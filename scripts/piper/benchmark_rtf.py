@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Real-time factor benchmark for Piper at 1..32 concurrent sessions (CPU).
+
+Runs N simulated sessions at once; each one synthesizes the same few agent
+replies one after another, like a conversation. Measures, per concurrency
+level:
+
+- RTF (synthesis wall time / audio duration) per reply — below 1.0 means
+  the session gets audio faster than it plays;
+- time to first audio frame;
+- aggregate throughput (seconds of audio produced per wall second).
+
+Two targets:
+    --mode local   in-process PiperLocalTTS (shared voice + thread pool)
+    --mode http    PiperServerTTS against a running server
+                   (piper.http_server or piper_pool_server.py)
+
+Usage:
+    python benchmark_rtf.py --mode local --model ../../voice/es_AR-daniela-high.onnx
+    python benchmark_rtf.py --mode http --url http://localhost:5002 --sessions 1,4,16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+# ── path setup ────────────────────────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src"))
+
+from helpers.piper_custom_integration import PiperLocalTTS, PiperServerTTS
+from pipecat.frames.frames import ErrorFrame, TTSAudioRawFrame
+
+# ── default parameters ────────────────────────────────────────────────────────
+DEFAULT_SESSIONS = "1,2,4,8,16,32"
+REPLIES = [
+    "¡Hola! Soy Nova, de Strata Sportiva. ¿En qué te puedo ayudar hoy?",
+    "Tenemos las Velox Runner a ciento cincuenta pesos. ¿Qué talla usás?",
+    "Listo, agregué el producto al carrito. ¿Querés confirmar el pedido con la tarjeta terminada en cuatro dos cuatro dos?",
+]
+
+
+def _pct(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run_session(tts, replies, results):
+    for i, text in enumerate(replies):
+        t0 = time.perf_counter()
+        ttfa = None
+        audio_secs = 0.0
+        async for frame in tts.run_tts(text, f"bench-{id(tts)}-{i}"):
+            if isinstance(frame, ErrorFrame):
+                raise RuntimeError(frame.error)
+            if isinstance(frame, TTSAudioRawFrame):
+                if ttfa is None:
+                    ttfa = time.perf_counter() - t0
+                audio_secs += len(frame.audio) / (frame.sample_rate * frame.num_channels * 2)
+        elapsed = time.perf_counter() - t0
+        results.append({"rtf": elapsed / audio_secs, "ttfa": ttfa, "audio": audio_secs})
+
+
+async def run_level(make_tts, sessions: int, replies) -> dict:
+    results = []
+    services = [make_tts() for _ in range(sessions)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(run_session(tts, replies, results) for tts in services))
+    wall = time.perf_counter() - t0
+    rtfs = [r["rtf"] for r in results]
+    ttfas = [r["ttfa"] for r in results]
+    return {
+        "sessions": sessions,
+        "rtf_mean": statistics.mean(rtfs),
+        "rtf_p90": _pct(rtfs, 0.9),
+        "ttfa_p50_ms": _pct(ttfas, 0.5) * 1000,
+        "ttfa_p90_ms": _pct(ttfas, 0.9) * 1000,
+        "throughput": sum(r["audio"] for r in results) / wall,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Piper RTF benchmark")
+    parser.add_argument("--mode", choices=["local", "http"], required=True)
+    parser.add_argument("--model", help="Path to the .onnx voice (local mode)")
+    parser.add_argument("--url", default="http://localhost:5002", help="Piper server (http mode)")
+    parser.add_argument("--sessions", default=DEFAULT_SESSIONS,
+                        help="Comma-separated concurrency levels")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1,
+                        help="Executor threads (local mode)")
+    parser.add_argument("--intra-op-threads", type=int, default=1,
+                        help="onnxruntime threads per inference (local mode)")
+    args = parser.parse_args()
+
+    levels = [int(n) for n in args.sessions.split(",")]
+    async with aiohttp.ClientSession() as session:
+        if args.mode == "local":
+            if not args.model:
+                parser.error("--model is required in local mode")
+
+            def make_tts():
+                return PiperLocalTTS(
+                    model_path=args.model,
+                    executor_threads=args.threads,
+                    intra_op_threads=args.intra_op_threads,
+                )
+            target = f"in-process, {args.threads} threads x {args.intra_op_threads} intra-op"
+        else:
+            def make_tts():
+                return PiperServerTTS(aiohttp_session=session, base_url=args.url)
+            target = args.url
+
+        # Warm-up: model load and first inference are not part of the numbers
+        await run_level(make_tts, 1, REPLIES[:1])
+
+        print(f"Piper RTF benchmark — {target}, {len(REPLIES)} replies per session")
+        print(f"{'sessions':>8}  {'RTF mean':>8}  {'RTF p90':>8}  {'TTFA p50':>9}  {'TTFA p90':>9}  {'audio s/s':>9}")
+        for n in levels:
+            r = await run_level(make_tts, n, REPLIES)
+            print(
+                f"{r['sessions']:>8}  {r['rtf_mean']:>8.3f}  {r['rtf_p90']:>8.3f}  "
+                f"{r['ttfa_p50_ms']:>7.0f}ms  {r['ttfa_p90_ms']:>7.0f}ms  {r['throughput']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
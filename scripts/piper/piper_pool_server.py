@@ -0,0 +1,192 @@
+"""Servidor HTTP de Piper con un pool de workers.
+
+`piper.http_server` sintetiza en un único proceso y responde recién cuando
+terminó todo el texto: con varias sesiones concurrentes, todas esperan en
+fila sobre un solo núcleo. Este servidor:
+
+- levanta `--workers` procesos; cada uno carga el modelo ONNX una vez (el
+  archivo lo comparte el page cache del sistema) con `--threads` hilos
+  intra-op de onnxruntime;
+- parte el texto en oraciones y las reparte entre los workers, así las
+  oraciones de una misma respuesta se sintetizan en paralelo;
+- devuelve un WAV en streaming: la cabecera sale enseguida y el audio de
+  cada oración se envía, en orden, apenas está listo.
+
+Es compatible con el cliente de Pipecat (`PiperHttpTTSService`): acepta
+`POST /` y `POST /synthesize` con `{"text": "..."}`.
+
+La config de la voz se busca como en `PiperLocalTTS` (`<modelo>.json` al
+lado del modelo), salvo que se pase `--config` (`run_piper.py` pasa ahí
+`CURRENT_VOICE_CONFIG`).
+
+Uso:
+    python piper_pool_server.py --model voice/es_AR-daniela-high.onnx --workers 4
+    python piper_pool_server.py --model voice/es_AR-daniela-high.onnx --config voice/es_AR-daniela-high
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import onnxruntime
+from aiohttp import web
+from piper import PiperVoice, SynthesisConfig
+from piper.config import PiperConfig
+
+# Corte de oraciones: después de . ! ? … seguido de espacio
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+")
+
+_voice: PiperVoice = None
+
+
+def resolve_config(model_path, config=None) -> Path:
+    """Archivo de config de la voz.
+
+    `config` puede ser el archivo, una carpeta con `<modelo>.json` o un nombre
+    sin extensión (como `CURRENT_VOICE_CONFIG`); sin él, `<modelo>.json`.
+    """
+    model_path = Path(model_path)
+    candidates = []
+    if config:
+        config = Path(config)
+        if config.is_dir():
+            candidates.append(config / f"{model_path.name}.json")
+        else:
+            candidates += [config, Path(f"{config}.json"), Path(f"{config}.onnx.json")]
+    candidates.append(Path(f"{model_path}.json"))
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    raise FileNotFoundError(
+        f"No se encontró la config de la voz {model_path.name}; se buscó en: "
+        + ", ".join(str(c) for c in dict.fromkeys(candidates))
+        + ". Pasá --config (CURRENT_VOICE_CONFIG) o dejá <modelo>.json al lado del modelo."
+    )
+
+
+def load_config(config_path) -> PiperConfig:
+    with open(config_path, "r", encoding="utf-8") as f:
+        return PiperConfig.from_dict(json.load(f))
+
+
+def load_voice(model_path, config_path, intra_op_threads: int = 1) -> PiperVoice:
+    """Carga la voz con una sesión ONNX de `intra_op_threads` hilos."""
+    config = load_config(config_path)
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = 1
+    session = onnxruntime.InferenceSession(
+        str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+    )
+    return PiperVoice(config=config, session=session)
+
+
+def _init_worker(model_path: str, config_path: str, intra_op_threads: int):
+    global _voice
+    _voice = load_voice(model_path, config_path, intra_op_threads)
+    # Primera inferencia fuera del camino crítico
+    for _ in _voice.synthesize("Hola."):
+        pass
+
+
+def _synthesize(text: str, length_scale=None) -> bytes:
+    config = SynthesisConfig(length_scale=length_scale) if length_scale else None
+    return b"".join(chunk.audio_int16_bytes for chunk in _voice.synthesize(text, config))
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s for s in _SENTENCE_RE.split(text.strip()) if s]
+
+
+def wav_stream_header(sample_rate: int, num_channels: int = 1) -> bytes:
+    """Cabecera WAV con tamaños "desconocidos" (0xFFFFFFFF) para streaming."""
+    byte_rate = sample_rate * num_channels * 2
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, num_channels, sample_rate, byte_rate, num_channels * 2, 16)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def make_app(model_path: Path, config_path: Path, workers: int, intra_op_threads: int) -> web.Application:
+    sample_rate = load_config(config_path).sample_rate
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(model_path), str(config_path), intra_op_threads),
+    )
+    stats = {"requests": 0, "inflight": 0, "sentences": 0, "audio_secs": 0.0, "synth_secs": 0.0}
+
+    async def synthesize(request: web.Request) -> web.StreamResponse:
+        data = await request.json()
+        sentences = split_sentences(data.get("text", ""))
+        if not sentences:
+            raise web.HTTPBadRequest(text="No text provided")
+
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+        # Todas las oraciones entran al pool ya; se envían en orden
+        futures = [
+            loop.run_in_executor(pool, _synthesize, s, data.get("length_scale"))
+            for s in sentences
+        ]
+        stats["requests"] += 1
+        stats["inflight"] += 1
+        response = web.StreamResponse(headers={"Content-Type": "audio/wav"})
+        try:
+            await response.prepare(request)
+            await response.write(wav_stream_header(sample_rate))
+            for future in futures:
+                audio = await future
+                stats["audio_secs"] += len(audio) / (sample_rate * 2)
+                await response.write(audio)
+            await response.write_eof()
+        finally:
+            for future in futures:
+                future.cancel()
+            stats["inflight"] -= 1
+            stats["sentences"] += len(sentences)
+            stats["synth_secs"] += time.perf_counter() - t0
+        return response
+
+    async def health(_):
+        return web.json_response({"workers": workers, "intra_op_threads": intra_op_threads, **stats})
+
+    async def on_cleanup(_):
+        pool.shutdown(cancel_futures=True)
+
+    app = web.Application()
+    app.router.add_post("/", synthesize)
+    app.router.add_post("/synthesize", synthesize)
+    app.router.add_get("/health", health)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Piper TTS pooled HTTP server")
+    parser.add_argument("--model", required=True, help="Path to the .onnx voice")
+    parser.add_argument("--config", help="Voice config: file, folder or name without extension "
+                                         "(default: <model>.json next to the model)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5002)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: one per core)")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="onnxruntime intra-op threads per worker")
+    args = parser.parse_args()
+
+    config_path = resolve_config(args.model, args.config)
+    print(f"🚀 Piper pool: {args.workers} workers x {args.threads} threads, model {args.model}, config {config_path}")
+    web.run_app(
+        make_app(Path(args.model), config_path, args.workers, args.threads), host=args.host, port=args.port
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,28 @@ def main():
     print("Usando modelo de voz:", voice_model)
     print("Usando config de voz:", voice_config)
 
+    # Con PIPER_WORKERS se usa el servidor con pool de workers (ver piper_pool_server.py)
+    workers = os.getenv("PIPER_WORKERS")
+    if workers:
+        cmd = [
+            "python3",
+            str(Path(__file__).resolve().parent / "piper_pool_server.py"),
+            "--model",
+            str(voice_model),
+            "--config",
+            str(voice_config),
+            "--port",
+            str(port),
+            "--workers",
+            workers,
+            "--threads",
+            os.getenv("PIPER_THREADS", "1"),
+        ]
+        print("🚀 Levantando Piper TTS (pool)")
+        print("▶", " ".join(cmd))
+        subprocess.run(cmd, check=True)
+        return
+
     cmd = [
         "uv",
         "run",
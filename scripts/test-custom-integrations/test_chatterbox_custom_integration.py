@@ -50,6 +50,7 @@ DEFAULT_CFG_WEIGHT  = 0.5
 DEFAULT_SPEED       = 1.0
 DEFAULT_SEED        = 2024
 DEFAULT_CHUNK_SIZE  = None  # set to e.g. 100 to enable server-side split_text
+DEFAULT_SAMPLE_RATE = 24000  # requested from the server; frames carry the rate it actually sent
 
 DEFAULT_TEXT = (
     "Hola, soy Nova, tu asistente de Strata Sportiva. "
@@ -181,7 +182,8 @@ async def main() -> None:
             cfg_weight=args.cfg,
             speed_factor=args.speed,
             seed=args.seed,
-            chunk_size=args.chunk_size
+            chunk_size=args.chunk_size,
+            sample_rate=DEFAULT_SAMPLE_RATE,
         )
         # Pipecat stores the constructor sample_rate in _init_sample_rate but only
         # populates _sample_rate (what .sample_rate returns) from StartFrame during
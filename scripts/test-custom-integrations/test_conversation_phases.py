@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Checks that ConversationPhaseTracker never hides a tool the caller still needs.
+
+Walks the tracker through call sequences that used to get stuck (checking
+an order before buying, buying again after an order or the survey) and
+asserts the needed tools are offered at every step.
+
+Usage:
+    python test_conversation_phases.py
+"""
+
+import sys
+from pathlib import Path
+
+# ── path setup ────────────────────────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src"))
+
+from helpers.conversation_state import ConversationPhaseTracker, Phase
+
+
+def _offered(tracker: ConversationPhaseTracker) -> set:
+    return {tool.name for tool in tracker.tools_schema.standard_tools}
+
+
+# (tools the LLM calls, tools that must be offered afterwards)
+SCENARIOS = {
+    "identify → order status → add_to_cart": [
+        (["identify_user"], {"get_order_status"}),
+        (["get_order_status"], {"add_to_cart", "check_for_size", "search_products"}),
+        (["add_to_cart"], {"order_cart"}),
+    ],
+    "order status first → browse → buy": [
+        (["get_order_status"], {"identify_user", "search_products"}),
+        (["search_products"], {"add_to_cart"}),
+        (["add_to_cart"], {"order_cart"}),
+    ],
+    "second purchase after an order": [
+        (["identify_user", "add_to_cart"], {"order_cart"}),
+        (["order_cart"], {"get_order_status", "final_survey", "add_to_cart"}),
+        (["add_to_cart"], {"order_cart"}),
+        (["order_cart"], {"final_survey"}),
+    ],
+    "buying again after the survey": [
+        (["identify_user", "add_to_cart", "order_cart"], {"final_survey"}),
+        (["final_survey"], {"search_products", "add_to_cart"}),
+        (["search_products"], {"check_for_size", "add_to_cart"}),
+        (["add_to_cart"], {"order_cart"}),
+    ],
+}
+
+
+def main() -> int:
+    failures = 0
+    for name, steps in SCENARIOS.items():
+        tracker = ConversationPhaseTracker()
+        path = [tracker.phase.value]
+        for called, needed in steps:
+            tracker.advance(called)
+            path.append(tracker.phase.value)
+            missing = needed - _offered(tracker)
+            if missing:
+                failures += 1
+                print(f"FAIL  {name}: after {called} in phase {tracker.phase.value}, missing {sorted(missing)}")
+                break
+        else:
+            print(f"ok    {name}: {' → '.join(path)}")
+
+    # Phases still move forward in a normal purchase
+    tracker = ConversationPhaseTracker()
+    for called, expected in ((["identify_user"], Phase.BROWSE), (["add_to_cart"], Phase.CART),
+                             (["order_cart"], Phase.ORDER), (["final_survey"], Phase.SURVEY)):
+        tracker.advance(called)
+        if tracker.phase != expected:
+            failures += 1
+            print(f"FAIL  forward path: after {called} expected {expected.value}, got {tracker.phase.value}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Loopback test for the compressed (Ogg/Opus) STT uplink and TTS downlink.
+
+Starts local stand-ins for the two remote hosts and runs the real plugin code
+against them, so codec changes can be checked without the GPU servers:
+
+- a Chatterbox-like HTTP server whose /tts streams a test tone either as WAV
+  or as Ogg/Opus, in small chunks with a delay between them;
+- a WhisperLiveKit-like WebSocket server that decodes whatever it receives
+  and reports how many bytes and how much audio arrived.
+
+For each direction it prints bytes on the wire, decoded audio duration and
+(for TTS) time to first audio, for PCM/WAV vs Opus.
+
+Usage:
+    python test_opus_transport_loopback.py
+    python test_opus_transport_loopback.py --seconds 10 --chunk-delay 0.02
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+import time
+import wave
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+import websockets
+from aiohttp import web
+
+# ── path setup ────────────────────────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src"))
+
+from helpers.chatterbox_custom_integration import ChatterboxServerTTS
+from helpers.ogg_opus import OggOpusDecoder, OggOpusEncoder
+from helpers.whisper_livekit_custom_integration import WhisperLiveKitSTT
+from pipecat.frames.frames import ErrorFrame, TTSAudioRawFrame
+
+# ── default parameters ────────────────────────────────────────────────────────
+DEFAULT_SECONDS     = 5.0
+DEFAULT_CHUNK_BYTES = 4096
+DEFAULT_CHUNK_DELAY = 0.01
+TTS_RATE            = 24000
+STT_RATE            = 16000
+HTTP_PORT           = 18004
+WS_PORT             = 18000
+
+
+def _tone(rate: int, seconds: float) -> bytes:
+    t = np.arange(int(rate * seconds)) / rate
+    sweep = np.sin(2 * np.pi * (200 + 300 * t / seconds) * t)
+    return (sweep * 8000).astype(np.int16).tobytes()
+
+
+def _wav(pcm: bytes, rate: int) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+
+def _opus(pcm: bytes, rate: int) -> bytes:
+    enc = OggOpusEncoder(rate)
+    return enc.encode(pcm) + enc.close()
+
+
+# ── stand-in servers ──────────────────────────────────────────────────────────
+
+def make_tts_app(seconds: float, chunk_bytes: int, chunk_delay: float) -> web.Application:
+    pcm = _tone(TTS_RATE, seconds)
+    bodies = {"wav": _wav(pcm, TTS_RATE), "opus": _opus(pcm, TTS_RATE)}
+
+    async def voices(_):
+        return web.json_response([{"filename": "Elena.wav"}])
+
+    async def tts(request):
+        payload = await request.json()
+        body = bodies[payload["output_format"]]
+        resp = web.StreamResponse()
+        await resp.prepare(request)
+        for i in range(0, len(body), chunk_bytes):
+            await resp.write(body[i:i + chunk_bytes])
+            await asyncio.sleep(chunk_delay)
+        await resp.write_eof()
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/get_predefined_voices", voices)
+    app.router.add_post("/tts", tts)
+    return app
+
+
+async def stt_handler(ws):
+    received = 0
+    pcm_bytes = 0
+    decoder = None
+    async for msg in ws:
+        if msg == b"":
+            break
+        received += len(msg)
+        if decoder is None and msg[:4] == b"OggS":
+            decoder = OggOpusDecoder(STT_RATE)
+        pcm_bytes += len(decoder.decode(msg)) if decoder else len(msg)
+    if decoder:
+        pcm_bytes += len(decoder.flush())
+    await ws.send(json.dumps({"type": "stats", "received": received, "pcm_bytes": pcm_bytes}))
+
+
+# ── runs ──────────────────────────────────────────────────────────────────────
+
+async def run_tts(session: aiohttp.ClientSession, audio_format: str) -> None:
+    tts = ChatterboxServerTTS(
+        aiohttp_session=session,
+        base_url=f"http://localhost:{HTTP_PORT}",
+        sample_rate=TTS_RATE,
+        audio_format=audio_format,
+    )
+    tts._sample_rate = tts._init_sample_rate
+    wire = 0
+
+    async def count_bytes(resp_iter):
+        nonlocal wire
+        async for chunk in resp_iter:
+            wire += len(chunk)
+            yield chunk
+
+    # Wrap the response iterator to count wire bytes without changing the plugin
+    stream = tts._stream_decoded_opus if audio_format == "opus" else tts._stream_reframed_wav
+    t0 = time.perf_counter()
+    ttfa = None
+    audio = 0
+    sizes = set()
+    async with session.post(
+        f"http://localhost:{HTTP_PORT}/tts", json={"output_format": audio_format}
+    ) as resp:
+        async for frame in stream(count_bytes(resp.content.iter_any()), "loopback"):
+            if isinstance(frame, ErrorFrame):
+                print(f"  [ERROR] {frame.error}")
+                return
+            if isinstance(frame, TTSAudioRawFrame):
+                if ttfa is None:
+                    ttfa = time.perf_counter() - t0
+                audio += len(frame.audio)
+                sizes.add(len(frame.audio))
+    secs = audio / (TTS_RATE * 2)
+    print(
+        f"  TTS {audio_format:>4}: {wire / 1024:8.1f} KB on the wire  "
+        f"{secs:5.2f}s audio  TTFA {ttfa * 1000:6.1f}ms  frame sizes {sorted(sizes)}"
+    )
+
+
+async def run_stt(codec: str, seconds: float) -> None:
+    stt = WhisperLiveKitSTT(url=f"ws://localhost:{WS_PORT}/asr", audio_codec=codec)
+    stt._sample_rate = stt._init_sample_rate
+    stt.ws = await websockets.connect(stt.url, max_size=None)
+    if codec == "opus":
+        stt._encoder = OggOpusEncoder(stt.sample_rate)
+
+    pcm = _tone(STT_RATE, seconds)
+    block = STT_RATE // 50 * 2  # 20ms, like transport input
+    for i in range(0, len(pcm), block):
+        async for _ in stt.run_stt(pcm[i:i + block]):
+            pass
+    await stt._flush()
+    stats = json.loads(await stt.ws.recv())
+    await stt.ws.close()
+    print(
+        f"  STT {codec:>4}: {stats['received'] / 1024:8.1f} KB on the wire  "
+        f"{stats['pcm_bytes'] / (STT_RATE * 2):5.2f}s audio decoded by server"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Opus transport loopback test")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS, help="Test audio length")
+    parser.add_argument("--chunk-bytes", type=int, default=DEFAULT_CHUNK_BYTES,
+                        help="HTTP chunk size used by the TTS stand-in")
+    parser.add_argument("--chunk-delay", type=float, default=DEFAULT_CHUNK_DELAY,
+                        help="Delay between TTS chunks (simulates generation)")
+    args = parser.parse_args()
+
+    runner = web.AppRunner(make_tts_app(args.seconds, args.chunk_bytes, args.chunk_delay))
+    await runner.setup()
+    await web.TCPSite(runner, "localhost", HTTP_PORT).start()
+    ws_server = await websockets.serve(stt_handler, "localhost", WS_PORT, max_size=None)
+
+    try:
+        print(f"Downlink (Chatterbox stand-in, {TTS_RATE} Hz):")
+        async with aiohttp.ClientSession() as session:
+            for fmt in ("wav", "opus"):
+                await run_tts(session, fmt)
+        print(f"Uplink (WhisperLiveKit stand-in, {STT_RATE} Hz):")
+        for codec in ("pcm", "opus"):
+            await run_stt(codec, args.seconds)
+    finally:
+        ws_server.close()
+        await ws_server.wait_closed()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Checks SpokenFormNormalizer on the inputs the LLM actually writes.
+
+Prices with comma-grouped thousands, currency prefixes, numbers glued to
+letters or underscores, phones, quantities before feminine nouns, and the
+same text split across streamed LLM chunks.
+
+Usage:
+    python test_spoken_form.py
+"""
+
+import sys
+from pathlib import Path
+
+# ── path setup ────────────────────────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src"))
+
+from helpers.spoken_form import SpokenFormNormalizer, normalize_spoken_form
+
+
+# (LLM text, what the TTS should receive)
+CASES = [
+    # Prices
+    ("$1.500", "mil quinientos pesos"),
+    ("$150,50", "ciento cincuenta pesos con cincuenta centavos"),
+    ("$1,500", "mil quinientos pesos"),
+    ("$12,990", "doce mil novecientos noventa pesos"),
+    ("$1,000,000", "un millón de pesos"),
+    ("$1,299.90", "mil doscientos noventa y nueve pesos con noventa centavos"),
+    ("1,500 pesos", "mil quinientos pesos"),
+    ("12.990 pesos", "doce mil novecientos noventa pesos"),
+    ("1,000,000 de visitas", "un millón de visitas"),
+    ("AR$ 2500", "dos mil quinientos pesos"),
+    ("US$ 20", "veinte dólares"),
+    # Decimals and percentages
+    ("1,5 kg", "uno coma cinco kg"),
+    ("20% off", "veinte por ciento off"),
+    # Numbers glued to words are left alone
+    ("x2", "x2"),
+    ("COL_001", "COL_001"),
+    ("modelo A4", "modelo A4"),
+    # Digit by digit
+    ("pedido 4242", "pedido cuatro dos cuatro dos"),
+    ("tel +54 11 1234-5678", "tel más cinco cuatro, uno uno, uno dos tres cuatro, cinco seis siete ocho"),
+    # Quantities, dates, times, symbols
+    ("1 par", "un par"),
+    ("31 zapatillas", "treinta y una zapatillas"),
+    ("15/03/2025", "quince de marzo de dos mil veinticinco"),
+    ("a las 21:00", "a las veintiuna"),
+    ("Nike & Adidas", "Nike y Adidas"),
+]
+
+# (streamed chunks, what the TTS should receive in total)
+STREAMED = [
+    (["Sale $1", ",500 en total."], "Sale mil quinientos pesos en total."),
+    (["Son 12,9", "90 pesos."], "Son doce mil novecientos noventa pesos."),
+    (["Cuesta AR", "$2500."], "Cuesta AR dos mil quinientos pesos."),
+    (["Llamá al +", "54 11 1234-5678"], "Llamá al más cinco cuatro, uno uno, uno dos tres cuatro, cinco seis siete ocho"),
+]
+
+
+def main() -> int:
+    failures = 0
+    for text, expected in CASES:
+        got = normalize_spoken_form(text)
+        ok = got == expected
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'}  {text!r} → {got!r}" + ("" if ok else f" (expected {expected!r})"))
+
+    for chunks, expected in STREAMED:
+        normalizer = SpokenFormNormalizer()
+        got = "".join(normalizer.feed(chunk) for chunk in chunks) + normalizer.flush()
+        ok = got == expected
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'}  {chunks!r} → {got!r}" + ("" if ok else f" (expected {expected!r})"))
+
+    print(f"\n{len(CASES) + len(STREAMED) - failures}/{len(CASES) + len(STREAMED)} passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
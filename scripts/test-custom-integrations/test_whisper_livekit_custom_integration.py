@@ -51,7 +51,7 @@ DEFAULT_BLOCK      = 1600    # samples per mic callback (100ms at 16kHz)
 class TestableSTT(WhisperLiveKitSTT):
     """
     WhisperLiveKitSTT with:
-    - Pipecat pipeline init bypassed (no FrameProcessor/STTService needed)
+    - Pipecat pipeline start bypassed (no StartFrame / running pipeline needed)
     - push_frame() replaced with an asyncio queue so frames can be consumed
       in the main task without a running pipeline
 
@@ -60,14 +60,9 @@ class TestableSTT(WhisperLiveKitSTT):
     """
 
     def __init__(self, url: str, sample_rate: int = 16000, show_raw: bool = False):
-        # Bypass Pipecat FrameProcessor.__init__ — only set what the parent
-        # methods actually use: url, ws, recv_task, closed, _lines_seen,
-        # and sample_rate (exposed via property below).
-        self.url = url
+        super().__init__(url=url, sample_rate=sample_rate)
+        # Normally populated from StartFrame during pipeline startup
         self._sample_rate = sample_rate
-        self.ws = None
-        self.recv_task = None
-        self.closed = False
         self._lines_seen = 0
         self._frame_queue: asyncio.Queue = asyncio.Queue()
         self._show_raw = show_raw
@@ -132,9 +127,8 @@ class TestableSTT(WhisperLiveKitSTT):
     # ── lifecycle (no StartFrame / FrameProcessor needed) ────────────────────
 
     async def connect(self) -> None:
-        self.ws = await websockets.connect(self.url, max_size=None)
         self.closed = False
-        self.recv_task = asyncio.create_task(self._recv_loop())
+        self._open_session(await websockets.connect(self.url, max_size=None))
         print(f"Connected → {self.url}")
 
     async def disconnect(self) -> None:
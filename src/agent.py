@@ -1,11 +1,13 @@
 """HTTP / WebRTC server — Nova Voice Agent"""
 import argparse
+import asyncio
 import os
+import secrets
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import BackgroundTasks, FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse
+from fastapi import BackgroundTasks, FastAPI, Header, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pipecat.transports.smallwebrtc.connection import IceServer, SmallWebRTCConnection
 from pipecat.transports.smallwebrtc.request_handler import (
@@ -14,23 +16,78 @@ from pipecat.transports.smallwebrtc.request_handler import (
     SmallWebRTCRequestHandler,
 )
 
-from helpers.config import ICE_SERVERS
-from pipelines import _debug, run_bot
+from helpers import (
+    LoopMonitor,
+    configure_logging,
+    create_llm_service,
+    create_tts_service,
+    get_timer,
+    keep_opening_fresh,
+    get_session_memory,
+    list_timers,
+    memory_report,
+    over_rss_cap,
+    prepare_fillers,
+    profile,
+    stt_stream_metrics,
+)
+from helpers.config import (
+    FILLERS_ENABLED,
+    ICE_SERVERS,
+    LOG_LEVEL,
+    LOOP_BLOCK_MS,
+    LOOP_LAG_INTERVAL_MS,
+    LOOP_LAG_WARN_MS,
+    OPENING_REFRESH_SECS,
+    OPENING_TURN_MODE,
+    PROCESS_MAX_RSS_BYTES,
+    PROFILER_TOKEN,
+)
+from pipelines import _debug, _session_pool, run_bot
 
 
 # ─── WebRTC handler ───────────────────────────────────────────────────────────
 
 _handler: SmallWebRTCRequestHandler = None
 
+# Logs through a queue so a slow stderr never stalls the shared event loop
+configure_logging(LOG_LEVEL)
+
+_loop_monitor = LoopMonitor(
+    interval_ms=LOOP_LAG_INTERVAL_MS,
+    warn_ms=LOOP_LAG_WARN_MS,
+    block_ms=LOOP_BLOCK_MS,
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global _handler
+    _loop_monitor.start()
     _handler = SmallWebRTCRequestHandler(
         ice_servers=[IceServer(urls=ICE_SERVERS)]
     )
+    # Filler clips are synthesized in the background; sessions that start
+    # before they are ready simply play no filler.
+    fillers_task = (
+        asyncio.create_task(prepare_fillers(create_tts_service)) if FILLERS_ENABLED else None
+    )
+    # Same for the canned greeting: until it is ready, sessions ask the LLM.
+    opening_task = (
+        asyncio.create_task(
+            keep_opening_fresh(create_llm_service, create_tts_service, OPENING_REFRESH_SECS)
+        )
+        if OPENING_TURN_MODE == "canned" else None
+    )
+    # Pre-assembled sessions so an offer doesn't wait for models and services
+    _session_pool.start()
     yield
+    for background in (fillers_task, opening_task):
+        if background:
+            background.cancel()
+    await _session_pool.close()
     await _handler.close()
+    _loop_monitor.stop()
 
 
 # ─── Routes ───────────────────────────────────────────────────────────────────
@@ -40,6 +97,10 @@ app = FastAPI(lifespan=lifespan)
 
 @app.post("/api/offer")
 async def offer(request: SmallWebRTCRequest, background_tasks: BackgroundTasks):
+    if over_rss_cap(PROCESS_MAX_RSS_BYTES):
+        # Shed new calls instead of degrading the ones in progress
+        raise HTTPException(status_code=503, detail="Server at memory capacity")
+
     async def on_connection(connection: SmallWebRTCConnection):
         background_tasks.add_task(run_bot, connection)
 
@@ -55,6 +116,92 @@ async def ice_candidate(request: SmallWebRTCPatchRequest):
     return {"status": "success"}
 
 
+@app.get("/api/metrics")
+async def service_metrics():
+    """Process-wide health: event loop lag/blocks, the session pool and STT streams."""
+    return {
+        "event_loop": _loop_monitor.stats(),
+        "session_pool": _session_pool.stats(),
+        "memory": {k: v for k, v in memory_report().items() if k != "sessions"},
+        "stt_streams": stt_stream_metrics(),
+    }
+
+
+@app.get("/api/memory")
+async def session_memory():
+    """Current and peak bytes per session, broken down by part."""
+    return memory_report()
+
+
+@app.get("/api/memory/{session_id}")
+async def session_memory_report(session_id: str):
+    memory = get_session_memory(session_id)
+    if not memory:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return memory.report()
+
+
+@app.get("/api/timing")
+async def timing_sessions():
+    """Sessions with per-processor timings (live and recently finished)."""
+    return list_timers()
+
+
+@app.get("/api/timing/{session_id}")
+async def timing_report(session_id: str, top: int = 10, sort: str = "total_ms"):
+    """Top-N slowest (processor, frame type) pairs of one session."""
+    timer = get_timer(session_id)
+    if not timer:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return timer.report(top=top, sort=sort)
+
+
+@app.post("/api/timing/{session_id}/{action}")
+async def timing_switch(session_id: str, action: str):
+    """Turns timing on or off for a single live session."""
+    timer = get_timer(session_id)
+    if not timer:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    if action not in ("enable", "disable"):
+        raise HTTPException(status_code=400, detail="Action must be enable or disable")
+    if action == "enable":
+        timer.enable()
+    else:
+        timer.disable()
+    return {"session_id": session_id, "enabled": timer.enabled}
+
+
+@app.get("/api/profile")
+async def sampling_profile(
+    seconds: float = 10.0,
+    interval_ms: float = 10.0,
+    format: str = "collapsed",
+    lines: bool = False,
+    authorization: str = Header(default=""),
+):
+    """Samples every thread's stack for `seconds` and returns collapsed stacks.
+
+    Safe during live calls: sampling runs in its own thread and its cost is
+    capped at ~2% of wall time. `format=json` adds sampler stats.
+    """
+    if not PROFILER_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiler disabled")
+    if not secrets.compare_digest(authorization, f"Bearer {PROFILER_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid token")
+    try:
+        sampler = await profile(
+            min(max(seconds, 0.1), 60.0), interval_ms=max(interval_ms, 1.0), lines=lines
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "json":
+        return JSONResponse({"stats": sampler.stats(), "stacks": dict(sampler.stacks.most_common())})
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={"Content-Disposition": "attachment; filename=profile.collapsed"},
+    )
+
+
 @app.websocket("/ws/debug")
 async def debug_ws(websocket: WebSocket):
     """Streams pipeline debug events (STT, LLM, TTS) to the frontend."""
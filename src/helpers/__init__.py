@@ -1,13 +1,49 @@
 """Paquete de helpers para el agente de voz"""
 from .config import SYSTEM_MESSAGE
-from .services import create_stt_service, create_tts_service, create_llm_service
+from .services import create_stt_service, create_tts_service, create_llm_service, create_fast_llm_service
 from .tools import tools_schema, tools_list
+from .conversation_state import ConversationPhaseTracker
+from .llm_router import LLMTierRouter
+from .fillers import FillerPlayer, prepare_fillers
+from .spoken_form import SpokenFormNormalizer
+from .session_pool import SessionPool
+from .profiler import StackSampler, profile
+from .loop_monitor import LoopMonitor, configure_logging
+from .session_memory import get_session_memory, memory_report, over_rss_cap, register_session_memory
+from .pipeline_timing import PipelineTimer, get_timer, list_timers, register_timer
+from .opening import OPENING_PROMPT, OpeningPlayer, OpeningTurnFrame, get_opening, keep_opening_fresh
+from .whisper_livekit_custom_integration import stt_stream_metrics
 
 __all__ = [
     'SYSTEM_MESSAGE',
     'tools_list',
     'tools_schema',
+    'ConversationPhaseTracker',
     'create_stt_service',
     'create_tts_service',
     'create_llm_service',
+    'create_fast_llm_service',
+    'LLMTierRouter',
+    'FillerPlayer',
+    'prepare_fillers',
+    'SpokenFormNormalizer',
+    'SessionPool',
+    'PipelineTimer',
+    'get_timer',
+    'list_timers',
+    'register_timer',
+    'StackSampler',
+    'profile',
+    'LoopMonitor',
+    'configure_logging',
+    'get_session_memory',
+    'memory_report',
+    'over_rss_cap',
+    'register_session_memory',
+    'OPENING_PROMPT',
+    'OpeningPlayer',
+    'OpeningTurnFrame',
+    'get_opening',
+    'keep_opening_fresh',
+    'stt_stream_metrics',
 ]
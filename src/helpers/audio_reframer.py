@@ -0,0 +1,155 @@
+"""Sample-aligned, fixed-size PCM reframing for streamed TTS audio.
+
+HTTP TTS servers hand us chunks of arbitrary size (whatever `iter_any()` read
+off the socket). The transport, on the other hand, writes audio in fixed
+blocks of `audio_out_10ms_chunks * 10ms`. `PCMReframer` sits in between and
+turns the former into the latter:
+
+- frames are always exactly `frame_bytes` long and never split a sample;
+- full frames that lie inside an incoming chunk are returned as `memoryview`
+  slices of that chunk (no copy);
+- only the bytes that straddle two chunks are copied, into a single
+  preallocated carry buffer of one frame.
+
+Yielded views are only valid until the generator is advanced. Callers that
+hand frames to another task (e.g. as a Pipecat frame) must materialize them
+with `take()`, which is counted as a copy in the stats.
+"""
+import struct
+from typing import Iterator, Optional
+
+SAMPLE_WIDTH = 2  # s16le
+
+
+def parse_wav_header(buf: bytes) -> Optional[tuple[int, int, int]]:
+    """Parse a RIFF/WAVE header.
+
+    Returns (sample_rate, num_channels, data_offset) once the `data` chunk
+    header is fully contained in `buf`, or None if more bytes are needed.
+    Raises ValueError if `buf` is not a PCM WAV stream.
+    """
+    if len(buf) < 12:
+        return None
+    if buf[0:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE stream")
+
+    sample_rate = num_channels = None
+    offset = 12
+    while offset + 8 <= len(buf):
+        chunk_id = buf[offset:offset + 4]
+        (chunk_len,) = struct.unpack_from("<I", buf, offset + 4)
+        body = offset + 8
+        if chunk_id == b"data":
+            if sample_rate is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            return sample_rate, num_channels, body
+        if body + chunk_len > len(buf):
+            return None
+        if chunk_id == b"fmt ":
+            fmt_tag, num_channels, sample_rate = struct.unpack_from("<HHI", buf, body)
+            (bits,) = struct.unpack_from("<H", buf, body + 14)
+            if fmt_tag not in (1, 0xFFFE) or bits != 16:
+                raise ValueError(f"unsupported WAV format tag={fmt_tag} bits={bits}")
+        # Chunks are word-aligned
+        offset = body + chunk_len + (chunk_len & 1)
+    return None
+
+
+class PCMReframer:
+    """Re-chunk a s16le byte stream into fixed-size frames.
+
+    `frame_bytes` is derived from the target sample rate, channel count and
+    frame duration so that it is always a whole number of samples.
+    """
+
+    def __init__(self, sample_rate: int, num_channels: int = 1, frame_ms: int = 40):
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.frame_ms = frame_ms
+        self.bytes_per_sample = SAMPLE_WIDTH * num_channels
+        self.frame_bytes = (sample_rate * frame_ms // 1000) * self.bytes_per_sample
+        if self.frame_bytes <= 0:
+            raise ValueError("frame size must be at least one sample")
+
+        self._carry = bytearray(self.frame_bytes)
+        self._carry_len = 0
+
+        self.allocations = 1  # the carry buffer
+        self.copies = 0
+        self.bytes_copied = 0
+        self.frames_out = 0
+        self.bytes_in = 0
+
+    def push(self, chunk) -> Iterator[memoryview]:
+        """Feed a chunk and yield every complete frame it makes available."""
+        view = memoryview(chunk).cast("B")
+        self.bytes_in += len(view)
+        pos = 0
+
+        # Complete a frame started by a previous chunk
+        if self._carry_len:
+            need = self.frame_bytes - self._carry_len
+            n = min(need, len(view))
+            self._carry[self._carry_len:self._carry_len + n] = view[:n]
+            self._count_copy(n)
+            self._carry_len += n
+            pos = n
+            if self._carry_len < self.frame_bytes:
+                return
+            self._carry_len = 0
+            self.frames_out += 1
+            yield memoryview(self._carry)
+
+        # Whole frames straight out of the incoming chunk
+        end = pos + (len(view) - pos) // self.frame_bytes * self.frame_bytes
+        while pos < end:
+            self.frames_out += 1
+            yield view[pos:pos + self.frame_bytes]
+            pos += self.frame_bytes
+
+        # Keep the tail for the next chunk
+        rest = len(view) - pos
+        if rest:
+            self._carry[:rest] = view[pos:]
+            self._count_copy(rest)
+            self._carry_len = rest
+
+    def flush(self) -> Iterator[memoryview]:
+        """Emit the buffered tail, zero-padded to a full frame (whole samples only)."""
+        if not self._carry_len:
+            return
+        # Drop a trailing partial sample rather than emitting half of it
+        aligned = self._carry_len - self._carry_len % self.bytes_per_sample
+        self._carry[aligned:] = bytes(self.frame_bytes - aligned)
+        self._carry_len = 0
+        if aligned:
+            self.frames_out += 1
+            yield memoryview(self._carry)
+
+    def reset(self):
+        self._carry_len = 0
+
+    def take(self, view: memoryview) -> bytes:
+        """Materialize a frame view so it can outlive the next push()."""
+        self.allocations += 1
+        self._count_copy(len(view))
+        return view.tobytes()
+
+    def _count_copy(self, n: int):
+        self.copies += 1
+        self.bytes_copied += n
+
+    def stats(self) -> dict:
+        """Allocation / copy counters, normalized per second of audio emitted."""
+        audio_secs = self.frames_out * self.frame_ms / 1000
+        per_sec = (lambda v: v / audio_secs) if audio_secs else (lambda v: 0.0)
+        return {
+            "audio_secs": audio_secs,
+            "frames_out": self.frames_out,
+            "allocations": self.allocations,
+            "copies": self.copies,
+            "bytes_copied": self.bytes_copied,
+            "allocations_per_sec": per_sec(self.allocations),
+            "copies_per_sec": per_sec(self.copies),
+            "bytes_copied_per_sec": per_sec(self.bytes_copied),
+        }
@@ -34,12 +34,22 @@ from pipecat.frames.frames import (
 )
 from pipecat.services.tts_service import TTSService
 
+from helpers.reframed_stream import ReframedWavStreamMixin
 
-class ChatterboxServerTTS(TTSService):
+
+class ChatterboxServerTTS(ReframedWavStreamMixin, TTSService):
     """TTS plugin for Chatterbox server's /tts endpoint.
 
     Streams the WAV response so audio starts playing as chunks arrive,
     rather than waiting for the full generation to finish.
+
+    With `sample_rate=None` the service adopts the pipeline's output rate and
+    asks the server to generate at that rate; the rate in the returned WAV
+    header is what frames are tagged with, so servers that ignore the request
+    still play correctly (the transport resamples them).
+
+    With `audio_format="opus"` the server is asked for Ogg/Opus instead of
+    WAV, which is decoded incrementally as chunks arrive.
     """
 
     def __init__(
@@ -55,12 +65,18 @@ class ChatterboxServerTTS(TTSService):
         speed_factor: float = 1.0,
         seed: Optional[int] = 1775,
         chunk_size: Optional[int] = None,
-        sample_rate: int = 24000,
+        sample_rate: Optional[int] = None,
+        frame_ms: int = 40,
+        audio_format: str = "wav",
         **kwargs,
     ):
+        if audio_format not in ("wav", "opus"):
+            raise ValueError(f"Unknown audio_format: {audio_format}")
         super().__init__(sample_rate=sample_rate, **kwargs)
         self._session = aiohttp_session
         self._base_url = base_url.rstrip("/")
+        self._frame_ms = frame_ms
+        self._audio_format = audio_format
         self._language = language
         self._temperature = temperature
         self._exaggeration = exaggeration
@@ -109,12 +125,13 @@ class ChatterboxServerTTS(TTSService):
             "text": text,
             "voice_mode": voice_mode,
             "predefined_voice_id": voice,
-            "output_format": "wav",
+            "output_format": self._audio_format,
             "language": self._language,
             "temperature": self._temperature,
             "exaggeration": self._exaggeration,
             "cfg_weight": self._cfg_weight,
-            "speed_factor": self._speed_factor
+            "speed_factor": self._speed_factor,
+            "sample_rate": self.sample_rate,
         }
 
         if voice_mode == "clone":
@@ -138,9 +155,12 @@ class ChatterboxServerTTS(TTSService):
                     return
 
                 yield TTSStartedFrame(context_id=context_id)
-                async for frame in self._stream_audio_frames_from_iterator(
-                    resp.content.iter_any(), strip_wav_header=True
-                ):
+                stream = (
+                    self._stream_decoded_opus
+                    if self._audio_format == "opus"
+                    else self._stream_reframed_wav
+                )
+                async for frame in stream(resp.content.iter_any(), context_id):
                     yield frame
                 yield TTSStoppedFrame(context_id=context_id)
         except Exception as e:
@@ -183,7 +203,7 @@ class ChatterboxServerTTSSentenceSplit(ChatterboxServerTTS):
         yield TTSStoppedFrame(context_id=context_id)
 
 
-class ChatterboxServerTTSOpenAI(TTSService):
+class ChatterboxServerTTSOpenAI(ReframedWavStreamMixin, TTSService):
     """TTS plugin for Chatterbox server's OpenAI-compatible /v1/audio/speech endpoint.
 
     Streams the WAV response so audio starts playing as chunks arrive.
@@ -197,11 +217,13 @@ class ChatterboxServerTTSOpenAI(TTSService):
         voice: str = "Emily.wav",
         model: str = "t3",
         sample_rate: int = 24000,
+        frame_ms: int = 40,
         **kwargs,
     ):
         super().__init__(sample_rate=sample_rate, **kwargs)
         self._session = aiohttp_session
         self._base_url = base_url.rstrip("/")
+        self._frame_ms = frame_ms
         self._model = model
         self.set_voice(voice)
         self.set_model_name(model)
@@ -228,9 +250,7 @@ class ChatterboxServerTTSOpenAI(TTSService):
                     return
 
                 yield TTSStartedFrame()
-                async for frame in self._stream_audio_frames_from_iterator(
-                    resp.content.iter_any(), strip_wav_header=True
-                ):
+                async for frame in self._stream_reframed_wav(resp.content.iter_any()):
                     yield frame
                 yield TTSStoppedFrame()
         except Exception as e:
@@ -8,12 +8,66 @@ load_dotenv(override=True)
 # Ejemplo con TURN: "stun:stun.l.google.com:19302,turn:turn.example.com:3478?transport=udp"
 ICE_SERVERS = os.getenv("ICE_SERVERS", "stun:stun.l.google.com:19302,stun:stun1.l.google.com:19302").split(",")
 
+# Tamaño de bloque de audio de salida del transporte, en múltiplos de 10ms.
+# Los servicios TTS que re-encuadran su audio emiten frames de exactamente este tamaño.
+AUDIO_OUT_10MS_CHUNKS = int(os.getenv("AUDIO_OUT_10MS_CHUNKS", "4"))
+
+# Exponer al LLM solo las tools de la fase actual de la conversación
+DYNAMIC_TOOLS = os.getenv("DYNAMIC_TOOLS", "true").lower() == "true"
+
+# Audio de relleno ("un momento") si la respuesta tarda más que el umbral
+FILLERS_ENABLED = os.getenv("FILLERS_ENABLED", "true").lower() == "true"
+FILLER_THRESHOLD_SECS = float(os.getenv("FILLER_THRESHOLD_SECS", "1.0"))
+
+# Saludo inicial: "canned" reproduce uno pre-generado, "llm" lo genera en cada conexión
+OPENING_TURN_MODE = os.getenv("OPENING_TURN_MODE", "canned").lower()
+OPENING_REFRESH_SECS = float(os.getenv("OPENING_REFRESH_SECS", "3600"))
+
+# Sesiones pre-armadas: el objetivo son las llamadas esperadas en el horizonte,
+# entre MIN y MAX según la tasa de llegadas reciente. MAX=0 desactiva el pool.
+SESSION_POOL_MIN = int(os.getenv("SESSION_POOL_MIN", "1"))
+SESSION_POOL_MAX = int(os.getenv("SESSION_POOL_MAX", "4"))
+SESSION_POOL_HORIZON_SECS = float(os.getenv("SESSION_POOL_HORIZON_SECS", "30"))
+
+# Tiempos por procesador desde el inicio de cada sesión (también se activan
+# por sesión vía POST /api/timing/{session_id}/enable)
+PIPELINE_TIMING = os.getenv("PIPELINE_TIMING", "false").lower() == "true"
+
+# Token para GET /api/profile (Authorization: Bearer <token>); sin token el endpoint no existe
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN", "")
+
+# Monitor del event loop: lag medido cada INTERVAL, aviso si pasa de WARN,
+# stack del hilo del loop si queda bloqueado más de BLOCK (0 desactiva el watchdog)
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+LOOP_LAG_WARN_MS = float(os.getenv("LOOP_LAG_WARN_MS", "100"))
+LOOP_BLOCK_MS = float(os.getenv("LOOP_BLOCK_MS", "250"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+
+# Memoria por sesión: medición cada INTERVAL; topes en bytes (0 desactiva cada uno).
+# CONTEXT recorta el historial del LLM, SESSION corta la llamada y con el RSS del
+# proceso sobre MAX_RSS no se aceptan llamadas nuevas.
+SESSION_MEMORY_INTERVAL_SECS = float(os.getenv("SESSION_MEMORY_INTERVAL_SECS", "10"))
+SESSION_CONTEXT_MAX_BYTES = int(os.getenv("SESSION_CONTEXT_MAX_BYTES", "262144"))
+SESSION_MEMORY_MAX_BYTES = int(os.getenv("SESSION_MEMORY_MAX_BYTES", "0"))
+PROCESS_MAX_RSS_BYTES = int(os.getenv("PROCESS_MAX_RSS_BYTES", "0"))
+
+# Convertir cifras y símbolos a palabras entre el LLM y el TTS (ver helpers/spoken_form.py)
+SPOKEN_FORM_NORMALIZER = os.getenv("SPOKEN_FORM_NORMALIZER", "true").lower() == "true"
+
+# Con el normalizador el LLM puede escribir cifras compactas; sin él, debe deletrearlas
+_NUMBERS_RULE = (
+    "Escribe precios, fechas y números con cifras (ejemplo: '$1.500', '15/03'). "
+    if SPOKEN_FORM_NORMALIZER else
+    "Escribe todas las cifras y símbolos con palabras (ejemplo: 'uno dos tres' en lugar de '123'). "
+)
+
 # Mensaje del sistema para el LLM
 SYSTEM_MESSAGE = (
     "Eres Nova, una especialista en deporte de la tienda Strata Sportiva. "
     "Utiliza las herramientas a tu disposición para ayudar al usuario a buscar productos, realizar compras y gestionar reclamos o devoluciones. "
-    "REGLAS DE VOZ: Mantén el texto natural, coloquial y claro. Escribe todas las cifras y símbolos con palabras "
-    "(ejemplo: 'uno dos tres' en lugar de '123'). Tus mensajes deben ser breves y directos. "
+    "REGLAS DE VOZ: Mantén el texto natural, coloquial y claro. "
+    + _NUMBERS_RULE +
+    "Tus mensajes deben ser breves y directos. "
     "No listes todos los productos de inmediato; pregunta primero preferencias. "
     "REGLAS DE FLUJO: No menciones que eres un modelo de IA. No puedes usar tags de pensamiento. "
     "Si el usuario menciona productos que no le funcionaron, reconoce la experiencia con empatía. "
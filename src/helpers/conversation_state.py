@@ -0,0 +1,102 @@
+"""Seguimiento de la fase de la conversación para exponer solo las tools relevantes.
+
+Cada turno envía las tools del contexto al LLM; mandar las ocho siempre
+infla el prompt. La conversación de Nova avanza por fases (identificar,
+explorar, carrito, pedido, encuesta) y cada fase solo necesita unas pocas
+tools. `ConversationPhaseTracker` avanza la fase según las tools que el LLM
+va llamando y devuelve el `ToolsSchema` correspondiente, que `run_bot`
+aplica con `LLMContext.set_tools()`.
+
+Cada fase incluye las tools que llevan a la siguiente (y las que el usuario
+puede pedir en cualquier momento) para no bloquear el flujo.
+`get_order_status` no cambia la fase: consultar un pedido anterior no
+termina la compra. Después de un pedido (ORDER, SURVEY) se puede volver a
+comprar: buscar o agregar al carrito vuelve a BROWSE o CART.
+"""
+from enum import Enum
+
+from loguru import logger
+from pipecat.adapters.schemas.tools_schema import ToolsSchema
+
+from .tools import (
+    add_to_cart,
+    apply_promo,
+    check_for_size,
+    final_survey,
+    get_order_status,
+    identify_user,
+    order_cart,
+    search_products,
+)
+
+
+class Phase(str, Enum):
+    IDENTIFY = "identify"
+    BROWSE = "browse"
+    CART = "cart"
+    ORDER = "order"
+    SURVEY = "survey"
+
+
+PHASE_TOOLS = {
+    Phase.IDENTIFY: [identify_user, search_products, get_order_status],
+    Phase.BROWSE: [
+        identify_user, search_products, check_for_size, add_to_cart, apply_promo, get_order_status,
+    ],
+    Phase.CART: [
+        identify_user, search_products, check_for_size, add_to_cart, apply_promo, order_cart,
+        get_order_status,
+    ],
+    Phase.ORDER: [get_order_status, search_products, check_for_size, add_to_cart, final_survey],
+    Phase.SURVEY: [final_survey, get_order_status, search_products, add_to_cart],
+}
+
+# Fase a la que lleva cada tool al ser llamada (get_order_status no mueve la fase)
+TOOL_TRANSITIONS = {
+    "identify_user": Phase.BROWSE,
+    "search_products": Phase.BROWSE,
+    "check_for_size": Phase.BROWSE,
+    "add_to_cart": Phase.CART,
+    "apply_promo": Phase.CART,
+    "order_cart": Phase.ORDER,
+    "final_survey": Phase.SURVEY,
+}
+
+_PHASE_ORDER = list(Phase)
+
+# Desde estas fases, volver a explorar o al carrito empieza otra compra
+_NEW_PURCHASE_FROM = {Phase.ORDER, Phase.SURVEY}
+_NEW_PURCHASE_TO = {Phase.BROWSE, Phase.CART}
+
+# Los schemas son inmutables: se construyen una sola vez y se comparten entre sesiones
+_PHASE_SCHEMAS = {
+    phase: ToolsSchema(standard_tools=tools) for phase, tools in PHASE_TOOLS.items()
+}
+
+
+class ConversationPhaseTracker:
+    """Fase actual de una sesión. Avanza, salvo para empezar otra compra después de un pedido."""
+
+    def __init__(self, phase: Phase = Phase.IDENTIFY):
+        self.phase = phase
+
+    @property
+    def tools_schema(self) -> ToolsSchema:
+        return _PHASE_SCHEMAS[self.phase]
+
+    def advance(self, function_names) -> bool:
+        """Actualiza la fase según las tools llamadas. Devuelve True si cambió."""
+        target = self.phase
+        for name in function_names:
+            nxt = TOOL_TRANSITIONS.get(name)
+            if not nxt:
+                continue
+            if target in _NEW_PURCHASE_FROM and nxt in _NEW_PURCHASE_TO:
+                target = nxt
+            elif _PHASE_ORDER.index(nxt) > _PHASE_ORDER.index(target):
+                target = nxt
+        if target == self.phase:
+            return False
+        logger.debug(f"Conversation phase: {self.phase.value} → {target.value}")
+        self.phase = target
+        return True
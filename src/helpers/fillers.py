@@ -0,0 +1,236 @@
+"""Audio de relleno ("un momento", "déjame revisar") para tapar la espera.
+
+Mientras el LLM tarda en dar el primer token o una tool como `order_cart`
+está en curso, el usuario solo escucha silencio. Este módulo:
+
+- sintetiza al arrancar el servidor unas frases cortas con el mismo TTS (y
+  voz) que usan las sesiones, y las guarda en memoria como PCM
+  (`prepare_fillers`);
+- ofrece `FillerPlayer`, un procesador que va entre el TTS y la salida del
+  transporte. Si desde el fin del turno del usuario (o desde que el bot dejó
+  de hablar con una tool pendiente) pasan más de `threshold_secs` sin audio
+  del TTS, reproduce un clip. En cuanto llega audio real lo corta con un
+  fade-out corto, sin clic.
+
+El clip se envía en bloques al ritmo de reproducción, así la salida nunca
+tiene más de un par de bloques encolados y el corte es inmediato.
+"""
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+import numpy as np
+from loguru import logger
+from pipecat.frames.frames import (
+    BotStoppedSpeakingFrame,
+    CancelFrame,
+    EndFrame,
+    Frame,
+    FunctionCallCancelFrame,
+    FunctionCallInProgressFrame,
+    FunctionCallResultFrame,
+    InterruptionFrame,
+    OutputAudioRawFrame,
+    TTSAudioRawFrame,
+    TTSSpeakFrame,
+    TTSStartedFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.task import PipelineParams, PipelineTask
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+FILLER_TEXTS = [
+    "Un momento.",
+    "Déjame revisar.",
+    "Dame un segundo.",
+    "Ya lo reviso.",
+]
+
+
+@dataclass
+class FillerClip:
+    text: str
+    audio: bytes
+    sample_rate: int
+    num_channels: int = 1
+
+
+# Clips compartidos por todas las sesiones del proceso
+_clips: list[FillerClip] = []
+
+
+def get_filler_clips() -> list[FillerClip]:
+    return list(_clips)
+
+
+class _AudioCollector(FrameProcessor):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.audio = bytearray()
+        self.sample_rate = None
+        self.num_channels = 1
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, TTSAudioRawFrame):
+            self.audio += frame.audio
+            self.sample_rate = frame.sample_rate
+            self.num_channels = frame.num_channels
+        await self.push_frame(frame, direction)
+
+
+async def synthesize_clip(tts, text: str, sample_rate: int = 24000) -> Optional[FillerClip]:
+    """Corre el TTS en un pipeline mínimo, con su ciclo de vida normal."""
+    collector = _AudioCollector()
+    task = PipelineTask(
+        Pipeline([tts, collector]),
+        params=PipelineParams(audio_out_sample_rate=sample_rate),
+        enable_rtvi=False,
+        cancel_on_idle_timeout=False,
+    )
+    await task.queue_frames([TTSSpeakFrame(text), EndFrame()])
+    await PipelineRunner(handle_sigint=False).run(task)
+    if not collector.audio:
+        return None
+    return FillerClip(text, bytes(collector.audio), collector.sample_rate, collector.num_channels)
+
+
+async def prepare_fillers(tts_factory, texts=FILLER_TEXTS, sample_rate: int = 24000):
+    """Sintetiza los clips de relleno con `tts_factory(session)` y los deja en memoria."""
+    clips = []
+    async with aiohttp.ClientSession() as session:
+        for text in texts:
+            try:
+                clip = await synthesize_clip(tts_factory(session), text, sample_rate)
+            except Exception as e:
+                logger.warning(f"Filler '{text}' could not be synthesized: {e}")
+                continue
+            if clip:
+                clips.append(clip)
+    _clips[:] = clips
+    logger.info(f"Prepared {len(clips)} filler clips")
+
+
+def _fade_out(audio: bytes, num_channels: int) -> bytes:
+    samples = np.frombuffer(audio, dtype=np.int16).reshape(-1, num_channels)
+    ramp = np.linspace(1.0, 0.0, len(samples))[:, None]
+    return (samples * ramp).astype(np.int16).tobytes()
+
+
+class FillerPlayer(FrameProcessor):
+    """Reproduce un clip de relleno si la respuesta tarda más de `threshold_secs`."""
+
+    def __init__(
+        self,
+        *,
+        clips: Optional[list[FillerClip]] = None,
+        threshold_secs: float = 1.0,
+        chunk_ms: int = 40,
+        fade_ms: int = 20,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        # Sin clips explícitos se leen los del proceso al usarlos: el procesador
+        # puede armarse (pool de sesiones) antes de que terminen de sintetizarse
+        self._fixed_clips = clips
+        self._threshold_secs = threshold_secs
+        self._chunk_ms = chunk_ms
+        self._fade_ms = fade_ms
+
+        self._timer_task: Optional[asyncio.Task] = None
+        self._play_task: Optional[asyncio.Task] = None
+        self._stop_playback = asyncio.Event()
+        self._tools_pending = 0
+        self._played_this_turn = False
+        self._last_clip: Optional[FillerClip] = None
+        self.fillers_played = 0
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, (TTSStartedFrame, TTSAudioRawFrame)):
+            # Llegó audio real: se corta el relleno antes de dejarlo pasar
+            await self._cancel_timer()
+            await self._stop()
+        elif isinstance(frame, UserStoppedSpeakingFrame):
+            self._played_this_turn = False
+            await self._arm()
+        elif isinstance(frame, (UserStartedSpeakingFrame, InterruptionFrame)):
+            self._tools_pending = 0
+            await self._cancel_timer()
+            await self._stop()
+        elif isinstance(frame, FunctionCallInProgressFrame) and direction == FrameDirection.DOWNSTREAM:
+            self._tools_pending += 1
+        elif isinstance(frame, (FunctionCallResultFrame, FunctionCallCancelFrame)):
+            if direction == FrameDirection.DOWNSTREAM:
+                self._tools_pending = max(0, self._tools_pending - 1)
+        elif isinstance(frame, BotStoppedSpeakingFrame) and self._tools_pending:
+            # El bot narró ("voy a revisar...") y la tool sigue corriendo
+            await self._arm()
+        elif isinstance(frame, (EndFrame, CancelFrame)):
+            await self._cancel_timer()
+            await self._stop()
+            logger.debug(f"{self}: played {self.fillers_played} fillers")
+
+        await self.push_frame(frame, direction)
+
+    async def _arm(self):
+        await self._cancel_timer()
+        if self._clips() and not self._played_this_turn:
+            self._timer_task = self.create_task(self._wait_and_play())
+
+    async def _cancel_timer(self):
+        if self._timer_task:
+            await self.cancel_task(self._timer_task)
+            self._timer_task = None
+
+    async def _wait_and_play(self):
+        await asyncio.sleep(self._threshold_secs)
+        self._played_this_turn = True
+        self.fillers_played += 1
+        self._stop_playback.clear()
+        self._play_task = self.create_task(self._play(self._pick()))
+
+    def _clips(self) -> list[FillerClip]:
+        return self._fixed_clips if self._fixed_clips is not None else get_filler_clips()
+
+    def _pick(self) -> FillerClip:
+        clips = self._clips()
+        options = [c for c in clips if c is not self._last_clip] or clips
+        self._last_clip = random.choice(options)
+        return self._last_clip
+
+    async def _play(self, clip: FillerClip):
+        bytes_per_ms = clip.sample_rate * clip.num_channels * 2 // 1000
+        chunk = bytes_per_ms * self._chunk_ms
+        fade = bytes_per_ms * self._fade_ms
+        pos = 0
+        while pos < len(clip.audio):
+            if self._stop_playback.is_set():
+                # Cierre limpio: un fade corto del audio que seguía
+                tail = clip.audio[pos:pos + fade]
+                if tail:
+                    await self._push_audio(_fade_out(tail, clip.num_channels), clip)
+                return
+            await self._push_audio(clip.audio[pos:pos + chunk], clip)
+            pos += chunk
+            # Un bloque de adelanto para que la salida no se quede sin audio
+            if pos > chunk:
+                try:
+                    await asyncio.wait_for(self._stop_playback.wait(), self._chunk_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _push_audio(self, audio: bytes, clip: FillerClip):
+        await self.push_frame(OutputAudioRawFrame(audio, clip.sample_rate, clip.num_channels))
+
+    async def _stop(self):
+        if self._play_task and not self._play_task.done():
+            self._stop_playback.set()
+            await self._play_task
+        self._play_task = None
@@ -0,0 +1,150 @@
+"""Enrutado por turno entre un LLM rápido y el principal.
+
+`LLMTierRouter` va delante de un `LLMSwitcher` (estrategia manual). Por cada
+`LLMContextFrame` que sale del agregador de usuario clasifica el turno con
+reglas baratas (largo de la transcripción, fase de la conversación y si es
+probable que haga falta una tool) y empuja un `ManuallySwitchServiceFrame`
+hacia el tier elegido antes del contexto. Los turnos triviales ("sí",
+"gracias") van al modelo rápido; el resto, al principal.
+
+`LLMTierRouter.probe()` devuelve un procesador que va detrás del switcher y
+mide el tiempo hasta el primer token (o llamada a tool) de cada tier. Las
+decisiones y latencias se acumulan en `stats()` y se loguean al terminar la
+sesión, para poder ajustar los umbrales.
+"""
+import re
+import time
+from collections import Counter, deque
+from typing import Optional
+
+from loguru import logger
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    Frame,
+    FunctionCallsStartedFrame,
+    LLMContextFrame,
+    LLMTextFrame,
+    ManuallySwitchServiceFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.services.llm_service import LLMService
+
+from .conversation_state import ConversationPhaseTracker, Phase
+
+FAST = "fast"
+MAIN = "main"
+
+# Palabras que suelen terminar en una tool (búsqueda, carrito, pedido, reclamo)
+_TOOL_HINT_RE = re.compile(
+    r"\d|compr|busc|talla|carrito|agreg|pedido|orden|promo|descuento|precio|"
+    r"zapatilla|remera|camiseta|ropa|envi|devol|reclam|tarjeta|direcci|document",
+    re.IGNORECASE,
+)
+
+
+def _last_user_text(context) -> Optional[str]:
+    """Texto del último mensaje si es del usuario; None si el turno no viene del usuario."""
+    messages = context.get_messages()
+    if not messages:
+        return None
+    last = messages[-1]
+    if not isinstance(last, dict) or last.get("role") != "user":
+        return None
+    content = last.get("content", "")
+    if isinstance(content, list):
+        content = " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return content
+
+
+class LLMTierRouter(FrameProcessor):
+    """Elige el LLM de cada turno; ver docstring del módulo."""
+
+    def __init__(
+        self,
+        *,
+        main_llm: LLMService,
+        fast_llm: LLMService,
+        phases: Optional[ConversationPhaseTracker] = None,
+        short_max_words: int = 4,
+        tool_heavy_phases: tuple = (Phase.CART,),
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._llms = {MAIN: main_llm, FAST: fast_llm}
+        self._phases = phases
+        self._short_max_words = short_max_words
+        self._tool_heavy_phases = tool_heavy_phases
+
+        self._current_tier = MAIN
+        self._pending: Optional[tuple[str, float]] = None
+        self.decisions: Counter = Counter()
+        self.latencies: dict[str, deque] = {MAIN: deque(maxlen=200), FAST: deque(maxlen=200)}
+
+    def classify(self, text: Optional[str]) -> tuple[str, str]:
+        """Devuelve (tier, motivo) para el texto del turno."""
+        if text is None:
+            return MAIN, "not_user_turn"
+        if _TOOL_HINT_RE.search(text):
+            return MAIN, "tool_likely"
+        if len(text.split()) > self._short_max_words:
+            return MAIN, "long"
+        if self._phases and self._phases.phase in self._tool_heavy_phases:
+            # Un "sí" en el carrito suele confirmar un pedido → order_cart
+            return MAIN, "tool_heavy_phase"
+        return FAST, "short"
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, LLMContextFrame) and direction == FrameDirection.DOWNSTREAM:
+            tier, reason = self.classify(_last_user_text(frame.context))
+            self.decisions[(tier, reason)] += 1
+            if tier != self._current_tier:
+                await self.push_frame(ManuallySwitchServiceFrame(service=self._llms[tier]))
+                self._current_tier = tier
+            self._pending = (tier, time.monotonic())
+            logger.debug(f"{self}: turn → {tier} ({reason})")
+        elif isinstance(frame, (EndFrame, CancelFrame)):
+            logger.info(f"{self}: routing stats {self.stats()}")
+
+        await self.push_frame(frame, direction)
+
+    def _on_first_output(self):
+        if not self._pending:
+            return
+        tier, t0 = self._pending
+        self._pending = None
+        self.latencies[tier].append(time.monotonic() - t0)
+
+    def probe(self) -> FrameProcessor:
+        """Procesador para poner detrás del switcher: mide latencia por tier."""
+        return _TierLatencyProbe(self)
+
+    def stats(self) -> dict:
+        def summary(values):
+            if not values:
+                return None
+            ordered = sorted(values)
+            return {
+                "n": len(ordered),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000),
+                "p90_ms": round(ordered[int(len(ordered) * 0.9)] * 1000),
+            }
+
+        return {
+            "decisions": {f"{tier}:{reason}": n for (tier, reason), n in self.decisions.items()},
+            "first_output_latency": {tier: summary(v) for tier, v in self.latencies.items()},
+        }
+
+
+class _TierLatencyProbe(FrameProcessor):
+    def __init__(self, router: LLMTierRouter, **kwargs):
+        super().__init__(**kwargs)
+        self._router = router
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, (LLMTextFrame, FunctionCallsStartedFrame)):
+            self._router._on_first_output()
+        await self.push_frame(frame, direction)
@@ -0,0 +1,127 @@
+"""Salud del event loop compartido por todas las sesiones.
+
+Todas las llamadas corren en un único loop de asyncio: cualquier trabajo
+síncrono (inferencia de VAD/SmartTurn, `json.dumps`, un `print` a una
+terminal lenta) frena a todas a la vez. `LoopMonitor` mide eso de dos formas:
+
+- **Lag**: una task se despierta cada `interval_ms` y registra cuánto tarde
+  llegó respecto de lo pedido en un `LatencyHistogram`. Si el lag pasa de
+  `warn_ms` se loggea un aviso (como mucho uno cada `alert_every_secs`).
+- **Bloqueos**: un hilo watchdog mira el último latido de esa task; si el
+  loop lleva más de `block_ms` sin latir, toma el stack del hilo del loop con
+  `sys._current_frames()` *mientras sigue bloqueado* y lo loggea. Así se ve
+  qué callback bloqueó, no solo que algo bloqueó.
+
+`configure_logging()` manda los logs de loguru por una cola (`enqueue=True`):
+el loop solo encola el mensaje y un hilo aparte lo escribe.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Optional
+
+from loguru import logger
+
+from .pipeline_timing import LatencyHistogram
+
+
+def configure_logging(level: str = "DEBUG"):
+    """Reemplaza el sink por defecto de loguru por uno no bloqueante."""
+    logger.remove()
+    logger.add(sys.stderr, level=level, enqueue=True, backtrace=False, diagnose=False)
+
+
+class LoopMonitor:
+    """Lag y bloqueos del event loop; ver docstring del módulo."""
+
+    def __init__(
+        self,
+        *,
+        interval_ms: float = 100.0,
+        warn_ms: float = 100.0,
+        block_ms: float = 250.0,
+        alert_every_secs: float = 10.0,
+        max_blocks: int = 20,
+    ):
+        self._interval = interval_ms / 1000
+        self._warn = warn_ms / 1000
+        self._block = block_ms / 1000
+        self._alert_every = alert_every_secs
+
+        self.lag = LatencyHistogram()
+        self.alerts = 0
+        self.blocks: deque[dict] = deque(maxlen=max_blocks)
+        self._last_alert = 0.0
+        self._beat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+
+    def start(self):
+        if self._task:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._sample_loop())
+        if self._block > 0:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample_loop(self):
+        while True:
+            expected = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = max(0.0, now - expected)
+            self.lag.add(lag)
+            if lag >= self._warn:
+                self.alerts += 1
+                if now - self._last_alert >= self._alert_every:
+                    self._last_alert = now
+                    logger.warning(
+                        f"Event loop lag {lag * 1000:.0f}ms "
+                        f"(p99 {self.lag.percentile(0.99) * 1000:.0f}ms, {self.alerts} alerts)"
+                    )
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self._block / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            # Un reporte por bloqueo: el siguiente recién cuando el loop vuelva a latir
+            if stalled < self._block or beat == reported_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            reported_beat = beat
+            stack = "".join(traceback.format_stack(frame))
+            self.blocks.append({
+                "at": time.time(),
+                "stalled_ms": round(stalled * 1000),
+                "stack": stack,
+            })
+            logger.warning(f"Event loop blocked for over {stalled * 1000:.0f}ms, loop thread stack:\n{stack}")
+
+    def stats(self) -> dict:
+        return {
+            "interval_ms": self._interval * 1000,
+            "lag": self.lag.summary(),
+            "alerts": self.alerts,
+            "blocks": len(self.blocks),
+            "last_block": self.blocks[-1] if self.blocks else None,
+        }
@@ -0,0 +1,155 @@
+"""Incremental Ogg/Opus encoding and decoding for the remote STT/TTS links.
+
+Both directions work on arbitrary-sized byte chunks as they flow, so neither
+side has to wait for a complete file:
+
+- `OggOpusEncoder` turns s16le PCM into Ogg pages (PyAV's muxer, with a short
+  page duration so pages leave as soon as a packet or two is ready).
+- `OggOpusDecoder` splits an Ogg byte stream into packets itself (PyAV's
+  demuxer wants a complete, readable file) and decodes them with PyAV's opus
+  codec, resampling to the caller's rate.
+
+PyAV comes in with aiortc, which the SmallWebRTC transport already requires.
+"""
+import struct
+
+import av
+import numpy as np
+
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+class _ByteSink:
+    """Write-only file object that collects what the muxer writes."""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def write(self, data) -> int:
+        self._buf += data
+        return len(data)
+
+    def drain(self) -> bytes:
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+
+class OggOpusEncoder:
+    """s16le mono PCM in, Ogg/Opus bytes out."""
+
+    def __init__(self, sample_rate: int = 16000, bitrate: int = 24000, page_ms: int = 20):
+        if sample_rate not in OPUS_RATES:
+            raise ValueError(f"Opus does not accept {sample_rate} Hz input")
+        self.sample_rate = sample_rate
+        self._sink = _ByteSink()
+        self._container = av.open(
+            self._sink, mode="w", format="ogg",
+            options={"page_duration": str(page_ms * 1000)},
+        )
+        self._stream = self._container.add_stream("libopus", rate=sample_rate, layout="mono")
+        self._stream.bit_rate = bitrate
+        self._stream.codec_context.options = {"application": "voip"}
+        self._pts = 0
+        self._closed = False
+
+    def encode(self, pcm: bytes) -> bytes:
+        """Encode a PCM chunk; returns whatever Ogg bytes are ready (may be empty)."""
+        samples = np.frombuffer(pcm, dtype=np.int16).reshape(1, -1)
+        if not samples.size:
+            return b""
+        frame = av.AudioFrame.from_ndarray(samples, format="s16", layout="mono")
+        frame.sample_rate = self.sample_rate
+        frame.pts = self._pts
+        self._pts += samples.shape[1]
+        for packet in self._stream.encode(frame):
+            self._container.mux(packet)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """Flush the encoder and write the final page."""
+        if self._closed:
+            return b""
+        self._closed = True
+        for packet in self._stream.encode(None):
+            self._container.mux(packet)
+        self._container.close()
+        return self._sink.drain()
+
+
+class _OggPacketReader:
+    """Reassembles Ogg packets from a byte stream fed in arbitrary chunks."""
+
+    _HEADER = struct.Struct("<4sBBqIIIB")
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._packet = bytearray()
+
+    def feed(self, data: bytes) -> list[bytes]:
+        self._buf += data
+        packets = []
+        while True:
+            if len(self._buf) < self._HEADER.size:
+                break
+            magic, _, _, _, _, _, _, nsegs = self._HEADER.unpack_from(self._buf)
+            if magic != b"OggS":
+                raise ValueError("lost Ogg page sync")
+            seg_start = self._HEADER.size
+            if len(self._buf) < seg_start + nsegs:
+                break
+            lacing = self._buf[seg_start:seg_start + nsegs]
+            body = seg_start + nsegs
+            if len(self._buf) < body + sum(lacing):
+                break
+            for n in lacing:
+                self._packet += self._buf[body:body + n]
+                body += n
+                # A lacing value below 255 terminates the packet; 255 means it
+                # continues in the next segment, possibly on the next page.
+                if n < 255:
+                    packets.append(bytes(self._packet))
+                    self._packet.clear()
+            del self._buf[:body]
+        return packets
+
+
+class OggOpusDecoder:
+    """Ogg/Opus bytes in, s16le mono PCM at `sample_rate` out."""
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self._reader = _OggPacketReader()
+        self._codec = None
+        self._resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+        self._skip_bytes = 0
+
+    def decode(self, data: bytes) -> bytes:
+        """Decode a chunk of the stream; returns the PCM it completes (may be empty)."""
+        out = bytearray()
+        for packet in self._reader.feed(data):
+            if packet.startswith(b"OpusHead"):
+                # Pre-skip is expressed in 48 kHz samples
+                (pre_skip,) = struct.unpack_from("<H", packet, 10)
+                self._skip_bytes = round(pre_skip * self.sample_rate / 48000) * 2
+                self._codec = av.CodecContext.create("opus", "r")
+                self._codec.extradata = packet
+                continue
+            if packet.startswith(b"OpusTags") or self._codec is None:
+                continue
+            for frame in self._codec.decode(av.Packet(packet)):
+                out += self._to_pcm(self._resampler.resample(frame))
+        return self._skip(out)
+
+    def flush(self) -> bytes:
+        return self._skip(bytearray(self._to_pcm(self._resampler.resample(None))))
+
+    def _to_pcm(self, frames) -> bytes:
+        return b"".join(f.to_ndarray().tobytes() for f in frames)
+
+    def _skip(self, out: bytearray) -> bytes:
+        if self._skip_bytes and out:
+            n = min(self._skip_bytes, len(out))
+            del out[:n]
+            self._skip_bytes -= n
+        return bytes(out)
@@ -0,0 +1,119 @@
+"""Saludo inicial pre-generado para no esperar a Bedrock al conectar.
+
+Con el modo `llm`, cada conexión agrega "Presentate brevemente al usuario." y
+corre una inferencia completa más la síntesis del TTS antes de que el usuario
+escuche algo, y el saludo es casi siempre el mismo. En modo `canned`:
+
+- `keep_opening_fresh` genera al arrancar el servidor el texto del saludo con
+  el mismo prompt y LLM, lo sintetiza con el TTS de las sesiones y lo guarda
+  en memoria; cada `refresh_secs` lo vuelve a generar para que no sea siempre
+  idéntico ni quede viejo si cambia el prompt o la voz;
+- al conectar, `run_bot` agrega el texto como mensaje del asistente al
+  `LLMContext` y encola un `OpeningTurnFrame`; `OpeningPlayer`, que va justo
+  después del TTS, lo convierte en los mismos frames que emitiría el TTS.
+
+Si el saludo todavía no está listo (o falló la generación), la sesión usa el
+camino de siempre con `LLMRunFrame`.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+from loguru import logger
+from pipecat.frames.frames import (
+    DataFrame,
+    Frame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+)
+from pipecat.processors.aggregators.llm_context import LLMContext
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from .config import SPOKEN_FORM_NORMALIZER, SYSTEM_MESSAGE
+from .fillers import FillerClip, synthesize_clip
+from .spoken_form import normalize_spoken_form
+
+OPENING_PROMPT = "Presentate brevemente al usuario."
+
+# Saludo compartido por todas las sesiones del proceso
+_opening: Optional[FillerClip] = None
+
+
+def get_opening() -> Optional[FillerClip]:
+    return _opening
+
+
+@dataclass
+class OpeningTurnFrame(DataFrame):
+    """Pide a `OpeningPlayer` que reproduzca el saludo pre-generado."""
+
+    clip: FillerClip
+
+
+async def generate_opening(llm_factory, tts_factory, sample_rate: int = 24000) -> Optional[FillerClip]:
+    """Genera texto y audio del saludo con los mismos servicios que una sesión."""
+    llm = llm_factory()
+    context = LLMContext([
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "system", "content": OPENING_PROMPT},
+    ])
+    text = (await llm.run_inference(context) or "").strip()
+    if not text:
+        return None
+    spoken = normalize_spoken_form(text) if SPOKEN_FORM_NORMALIZER else text
+    async with aiohttp.ClientSession() as session:
+        clip = await synthesize_clip(tts_factory(session), spoken, sample_rate)
+    if clip:
+        # Al contexto va el texto tal como lo escribió el LLM
+        clip.text = text
+    return clip
+
+
+async def keep_opening_fresh(llm_factory, tts_factory, refresh_secs: float = 3600.0):
+    """Mantiene el saludo en memoria y lo regenera cada `refresh_secs`."""
+    global _opening
+    while True:
+        try:
+            clip = await generate_opening(llm_factory, tts_factory)
+        except Exception as e:
+            logger.warning(f"Opening turn could not be generated: {e}")
+            clip = None
+        if clip:
+            # Se reemplaza de una vez: una sesión nunca ve texto y audio mezclados
+            _opening = clip
+            logger.info(f"Opening turn ready ({len(clip.audio)} bytes): {clip.text!r}")
+        await asyncio.sleep(refresh_secs)
+
+
+class OpeningPlayer(FrameProcessor):
+    """Convierte un `OpeningTurnFrame` en frames de audio del TTS.
+
+    Va justo después del TTS, así el resto del pipeline (relleno, debug,
+    salida, agregador del asistente) ve el saludo como una respuesta normal y
+    una interrupción del usuario lo corta igual que a cualquier otra.
+    """
+
+    def __init__(self, *, chunk_ms: int = 40, **kwargs):
+        super().__init__(**kwargs)
+        self._chunk_ms = chunk_ms
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, OpeningTurnFrame):
+            await self._play(frame.clip)
+            return
+
+        await self.push_frame(frame, direction)
+
+    async def _play(self, clip: FillerClip):
+        chunk = clip.sample_rate * clip.num_channels * 2 * self._chunk_ms // 1000
+        await self.push_frame(TTSStartedFrame())
+        # La salida del transporte ya reproduce a tiempo real; no hace falta pausar
+        for pos in range(0, len(clip.audio), chunk):
+            await self.push_frame(
+                TTSAudioRawFrame(clip.audio[pos:pos + chunk], clip.sample_rate, clip.num_channels)
+            )
+        await self.push_frame(TTSStoppedFrame())
@@ -0,0 +1,209 @@
+"""Tiempos por procesador del pipeline, activables por sesión.
+
+`PipelineTimer` se engancha a los eventos síncronos que Pipecat dispara en
+cada procesador (`on_before/after_process_frame`, `on_before_push_frame`) y
+acumula, por (procesador, tipo de frame):
+
+- tiempo dentro de `process_frame`;
+- tiempo en cola: desde que el procesador anterior empujó el frame hasta que
+  este empieza a procesarlo;
+- frames por segundo.
+
+Los tiempos van a histogramas de buckets logarítmicos fijos (un incremento
+de entero por muestra), así se puede dejar encendido en producción para una
+llamada puntual. Con el timer apagado no queda ningún handler registrado.
+
+Los timers de las sesiones viven en un registro del proceso (`get_timer`,
+`list_timers`) que `agent.py` expone por HTTP con una vista top-N. El mismo
+registro dice a qué sesión pertenece cada procesador (`session_for_processor`).
+"""
+import bisect
+import time
+from collections import OrderedDict, defaultdict
+from typing import Optional
+
+from pipecat.frames.frames import Frame
+from pipecat.processors.frame_processor import FrameProcessor
+
+# Límites de bucket en segundos: 16µs, 32µs, ... ~8.4s
+_BOUNDS = [16e-6 * 2 ** i for i in range(20)]
+
+
+class LatencyHistogram:
+    """Histograma de buckets logarítmicos; percentiles aproximados al límite del bucket."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, secs: float):
+        self.counts[bisect.bisect_left(_BOUNDS, secs)] += 1
+        self.count += 1
+        self.total += secs
+        if secs > self.max:
+            self.max = secs
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(_BOUNDS[i], self.max) if i < len(_BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "n": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "total_ms": round(self.total * 1000, 1),
+        }
+
+
+def _leaf_processors(processors) -> list[FrameProcessor]:
+    leaves = []
+    for p in processors:
+        if p.processors:
+            leaves.extend(_leaf_processors(p.processors))
+        else:
+            leaves.append(p)
+    return leaves
+
+
+class PipelineTimer:
+    """Tiempos por procesador de una sesión; ver docstring del módulo."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.enabled = False
+        self._processors: list[FrameProcessor] = []
+        self._process: dict[tuple[str, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._queue: dict[tuple[str, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._frames: dict[str, int] = defaultdict(int)
+        self._started: dict[tuple[int, int], float] = {}
+        self._pushed: dict[int, float] = {}
+        self._enabled_at: Optional[float] = None
+        self._enabled_secs = 0.0
+
+    def attach(self, pipeline: FrameProcessor):
+        self._processors = _leaf_processors(pipeline.processors)
+        for p in self._processors:
+            _processor_sessions[p.name] = self.session_id
+
+    def enable(self):
+        if self.enabled:
+            return
+        for p in self._processors:
+            p.add_event_handler("on_before_process_frame", self._on_before_process)
+            p.add_event_handler("on_after_process_frame", self._on_after_process)
+            p.add_event_handler("on_before_push_frame", self._on_before_push)
+        self.enabled = True
+        self._enabled_at = time.perf_counter()
+
+    def disable(self):
+        if not self.enabled:
+            return
+        # BaseObject no tiene API para quitar handlers; se sacan de su lista
+        for p in self._processors:
+            for name, fn in (
+                ("on_before_process_frame", self._on_before_process),
+                ("on_after_process_frame", self._on_after_process),
+                ("on_before_push_frame", self._on_before_push),
+            ):
+                handlers = p._event_handlers[name].handlers
+                if fn in handlers:
+                    handlers.remove(fn)
+        self.enabled = False
+        self._enabled_secs += time.perf_counter() - self._enabled_at
+        self._started.clear()
+        self._pushed.clear()
+
+    async def _on_before_push(self, processor: FrameProcessor, frame: Frame):
+        if len(self._pushed) > 10_000:
+            # Frames que salen del pipeline nunca se procesan: no dejar crecer el dict
+            self._pushed.clear()
+        self._pushed[frame.id] = time.perf_counter()
+
+    async def _on_before_process(self, processor: FrameProcessor, frame: Frame):
+        now = time.perf_counter()
+        pushed = self._pushed.pop(frame.id, None)
+        if pushed is not None:
+            self._queue[(processor.name, type(frame).__name__)].add(now - pushed)
+        self._started[(processor.id, frame.id)] = now
+
+    async def _on_after_process(self, processor: FrameProcessor, frame: Frame):
+        started = self._started.pop((processor.id, frame.id), None)
+        if started is None:
+            return
+        self._process[(processor.name, type(frame).__name__)].add(time.perf_counter() - started)
+        self._frames[processor.name] += 1
+
+    def _elapsed(self) -> float:
+        running = time.perf_counter() - self._enabled_at if self.enabled else 0.0
+        return self._enabled_secs + running
+
+    def report(self, top: int = 10, sort: str = "total_ms") -> dict:
+        """Vista top-N: las combinaciones (procesador, frame) más lentas según `sort`."""
+        elapsed = self._elapsed()
+        rows = []
+        for (proc, frame_type), hist in self._process.items():
+            queue = self._queue.get((proc, frame_type))
+            rows.append({
+                "processor": proc,
+                "frame": frame_type,
+                "process": hist.summary(),
+                "queue": queue.summary() if queue else None,
+            })
+        rows.sort(key=lambda r: r["process"].get(sort, 0), reverse=True)
+        return {
+            "session_id": self.session_id,
+            "enabled": self.enabled,
+            "observed_secs": round(elapsed, 1),
+            "fps": {
+                proc: round(n / elapsed, 1) if elapsed else 0.0
+                for proc, n in sorted(self._frames.items(), key=lambda kv: -kv[1])
+            },
+            "slowest": rows[:top],
+        }
+
+
+# Registro de timers del proceso; se conservan las últimas sesiones terminadas
+_timers: "OrderedDict[str, PipelineTimer]" = OrderedDict()
+_MAX_TIMERS = 50
+
+# Nombre de procesador → sesión, para etiquetar muestras del profiler
+_processor_sessions: dict[str, str] = {}
+
+
+def register_timer(session_id: str) -> PipelineTimer:
+    timer = PipelineTimer(session_id)
+    _timers[session_id] = timer
+    while len(_timers) > _MAX_TIMERS:
+        _, old = _timers.popitem(last=False)
+        for p in old._processors:
+            _processor_sessions.pop(p.name, None)
+    return timer
+
+
+def session_for_processor(name: str) -> Optional[str]:
+    return _processor_sessions.get(name)
+
+
+def get_timer(session_id: str) -> Optional[PipelineTimer]:
+    return _timers.get(session_id)
+
+
+def list_timers() -> list[dict]:
+    return [
+        {"session_id": sid, "enabled": t.enabled, "observed_secs": round(t._elapsed(), 1)}
+        for sid, t in _timers.items()
+    ]
@@ -0,0 +1,179 @@
+"""Piper TTS: HTTP client for the (pooled) Piper server and in-process service.
+
+- `PiperServerTTS` posts to `scripts/piper` (either `piper.http_server` or
+  `piper_pool_server.py`) and streams the WAV body as transport-sized frames,
+  so sentences the pool finishes early start playing right away.
+- `PiperLocalTTS` skips HTTP entirely: the ONNX voice is loaded once per
+  process and shared by every session, and synthesis runs sentence by
+  sentence on a dedicated thread pool (onnxruntime releases the GIL), so
+  concurrent sessions use several cores instead of queueing on one.
+"""
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncGenerator, Optional
+
+import aiohttp
+import onnxruntime
+from loguru import logger
+from piper import PiperVoice
+from piper.config import PiperConfig
+from pipecat.frames.frames import (
+    ErrorFrame,
+    Frame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+)
+from pipecat.services.tts_service import TTSService
+
+from helpers.audio_reframer import PCMReframer
+from helpers.reframed_stream import ReframedWavStreamMixin
+
+
+class PiperServerTTS(ReframedWavStreamMixin, TTSService):
+    """TTS plugin for the Piper HTTP server in `scripts/piper`.
+
+    Frames are tagged with the rate in the returned WAV header (the voice's
+    native rate), so the transport resamples them when it differs from the
+    pipeline's output rate.
+    """
+
+    def __init__(
+        self,
+        *,
+        aiohttp_session: aiohttp.ClientSession,
+        base_url: str,
+        frame_ms: int = 40,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._session = aiohttp_session
+        self._base_url = base_url.rstrip("/")
+        self._frame_ms = frame_ms
+
+    def can_generate_metrics(self) -> bool:
+        return True
+
+    async def run_tts(self, text: str, context_id: str) -> AsyncGenerator[Frame, None]:
+        try:
+            await self.start_ttfb_metrics()
+            async with self._session.post(
+                f"{self._base_url}/synthesize", json={"text": text}
+            ) as resp:
+                if resp.status != 200:
+                    body = await resp.text()
+                    logger.error(f"Piper /synthesize error {resp.status}: {body[:200]}")
+                    yield ErrorFrame(error=f"Piper /synthesize error {resp.status}: {body[:200]}")
+                    return
+
+                await self.start_tts_usage_metrics(text)
+                yield TTSStartedFrame(context_id=context_id)
+                async for frame in self._stream_reframed_wav(resp.content.iter_any(), context_id):
+                    await self.stop_ttfb_metrics()
+                    yield frame
+                yield TTSStoppedFrame(context_id=context_id)
+        except Exception as e:
+            logger.error(f"{self} exception: {e}")
+            yield ErrorFrame(error=f"Piper request failed: {e}")
+        finally:
+            await self.stop_ttfb_metrics()
+
+
+def load_piper_voice(model_path, intra_op_threads: int = 1) -> PiperVoice:
+    """Loads a voice with an ONNX session limited to `intra_op_threads` threads.
+
+    The config is `<model>.json` next to the model, as Piper itself expects
+    (`scripts/piper/piper_pool_server.py` uses the same default).
+    """
+    config_path = Path(f"{model_path}.json")
+    if not config_path.is_file():
+        raise FileNotFoundError(f"Piper voice config not found: {config_path} (expected next to the model)")
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = PiperConfig.from_dict(json.load(f))
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = 1
+    session = onnxruntime.InferenceSession(
+        str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+    )
+    return PiperVoice(config=config, session=session)
+
+
+# Voices and executor shared by every session of the process
+_voices: dict[tuple[str, int], PiperVoice] = {}
+_voices_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_voice(model_path: str, intra_op_threads: int) -> PiperVoice:
+    key = (str(Path(model_path).resolve()), intra_op_threads)
+    with _voices_lock:
+        if key not in _voices:
+            logger.info(f"Loading Piper voice {key[0]} ({intra_op_threads} intra-op threads)")
+            _voices[key] = load_piper_voice(key[0], intra_op_threads)
+        return _voices[key]
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="piper")
+    return _executor
+
+
+def _next_sentence(chunks) -> Optional[bytes]:
+    chunk = next(chunks, None)
+    return chunk.audio_int16_bytes if chunk is not None else None
+
+
+class PiperLocalTTS(TTSService):
+    """In-process Piper TTS. See module docstring.
+
+    `executor_threads` sizes the process-wide synthesis pool (it is created
+    by the first session); `intra_op_threads` is how many threads a single
+    inference may use. For many concurrent sessions, 1 intra-op thread and
+    one executor thread per core gives the best throughput.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_path: str,
+        executor_threads: int = 4,
+        intra_op_threads: int = 1,
+        frame_ms: int = 40,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._voice = _get_voice(model_path, intra_op_threads)
+        self._executor = _get_executor(executor_threads)
+        self._frame_ms = frame_ms
+
+    def can_generate_metrics(self) -> bool:
+        return True
+
+    async def run_tts(self, text: str, context_id: str) -> AsyncGenerator[Frame, None]:
+        loop = asyncio.get_running_loop()
+        sample_rate = self._voice.config.sample_rate
+        reframer = PCMReframer(sample_rate, 1, self._frame_ms)
+        # One sentence per executor hop, so the first one plays while the rest synthesize
+        chunks = iter(self._voice.synthesize(text))
+        try:
+            await self.start_ttfb_metrics()
+            await self.start_tts_usage_metrics(text)
+            yield TTSStartedFrame(context_id=context_id)
+            while (audio := await loop.run_in_executor(self._executor, _next_sentence, chunks)) is not None:
+                await self.stop_ttfb_metrics()
+                for view in reframer.push(audio):
+                    yield TTSAudioRawFrame(reframer.take(view), sample_rate, 1, context_id=context_id)
+            for view in reframer.flush():
+                yield TTSAudioRawFrame(reframer.take(view), sample_rate, 1, context_id=context_id)
+            yield TTSStoppedFrame(context_id=context_id)
+        except Exception as e:
+            logger.error(f"{self} exception: {e}")
+            yield ErrorFrame(error=f"Piper synthesis failed: {e}")
+        finally:
+            await self.stop_ttfb_metrics()
@@ -0,0 +1,121 @@
+"""Profiler de muestreo de stacks para producción.
+
+`StackSampler` corre en un hilo propio y cada `interval_ms` toma los stacks
+de todos los hilos con `sys._current_frames()`. Devuelve stacks colapsados
+(`hilo;sesión;f1;f2;... N`), el formato que leen flamegraph.pl y speedscope.
+
+- Las muestras del hilo del event loop se etiquetan con la sesión dueña de
+  la task que estaba corriendo: las tasks de Pipecat se llaman
+  `<Procesador#N>::<corrutina>` y cada sesión registra sus procesadores en
+  `pipeline_timing`.
+- El costo está acotado: tomar una muestra retiene el GIL, así que tras cada
+  muestra se espera lo necesario para que el tiempo de muestreo no pase de
+  `max_overhead` del tiempo total (por defecto 2%). Con muchos hilos o
+  stacks profundos el intervalo efectivo simplemente se alarga.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from .pipeline_timing import session_for_processor
+
+
+def _frame_label(code, lines: bool, lineno: int) -> str:
+    label = f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+    return f"{label}:{lineno}" if lines else label
+
+
+class StackSampler:
+    """Muestrea stacks de todos los hilos; ver docstring del módulo."""
+
+    def __init__(
+        self,
+        *,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        loop_thread_id: Optional[int] = None,
+        interval_ms: float = 10.0,
+        max_overhead: float = 0.02,
+        max_depth: int = 128,
+        lines: bool = False,
+    ):
+        self._loop = loop
+        self._loop_thread_id = loop_thread_id
+        self._interval = interval_ms / 1000
+        self._max_overhead = max_overhead
+        self._max_depth = max_depth
+        self._lines = lines
+
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.sampling_secs = 0.0
+        self.wall_secs = 0.0
+
+    def _session_tag(self) -> Optional[str]:
+        current = getattr(asyncio.tasks, "_current_tasks", {}).get(self._loop)
+        if current is None:
+            return None
+        name = current.get_name()
+        session = session_for_processor(name.split("::", 1)[0])
+        return f"session:{session}" if session else f"task:{name.split('::', 1)[-1]}"
+
+    def sample_once(self):
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self._max_depth:
+                stack.append(_frame_label(frame.f_code, self._lines, frame.f_lineno))
+                frame = frame.f_back
+            root = [names.get(thread_id, str(thread_id))]
+            if thread_id == self._loop_thread_id:
+                tag = self._session_tag()
+                if tag:
+                    root.append(tag)
+            self.stacks[";".join(root + stack[::-1])] += 1
+        self.samples += 1
+
+    def run(self, seconds: float):
+        """Muestrea durante `seconds`; bloquea el hilo que lo llama."""
+        start = time.perf_counter()
+        deadline = start + seconds
+        while (now := time.perf_counter()) < deadline:
+            self.sample_once()
+            cost = time.perf_counter() - now
+            self.sampling_secs += cost
+            # cost / (cost + pausa) <= max_overhead
+            pause = max(self._interval, cost * (1 / self._max_overhead - 1))
+            time.sleep(min(pause, max(0.0, deadline - time.perf_counter())))
+        self.wall_secs = time.perf_counter() - start
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def stats(self) -> dict:
+        return {
+            "samples": self.samples,
+            "wall_secs": round(self.wall_secs, 2),
+            "overhead_pct": round(self.sampling_secs / self.wall_secs * 100, 2) if self.wall_secs else 0.0,
+            "effective_interval_ms": round(self.wall_secs / self.samples * 1000, 1) if self.samples else None,
+            "unique_stacks": len(self.stacks),
+        }
+
+
+_profile_lock = asyncio.Lock()
+
+
+async def profile(seconds: float, **kwargs) -> StackSampler:
+    """Corre un `StackSampler` en un hilo aparte desde el event loop. Uno a la vez."""
+    if _profile_lock.locked():
+        raise RuntimeError("A profile is already running")
+    async with _profile_lock:
+        sampler = StackSampler(
+            loop=asyncio.get_running_loop(), loop_thread_id=threading.get_ident(), **kwargs
+        )
+        await asyncio.to_thread(sampler.run, seconds)
+        return sampler
@@ -0,0 +1,83 @@
+"""Streamed TTS response bodies (WAV or Ogg/Opus) as transport-sized audio frames.
+
+Shared by the HTTP TTS clients (Chatterbox, Piper): they pass the response
+body iterator and get `TTSAudioRawFrame`s cut by `PCMReframer`.
+"""
+from typing import AsyncGenerator, AsyncIterator, Optional
+
+from loguru import logger
+from pipecat.frames.frames import Frame, TTSAudioRawFrame
+
+from helpers.audio_reframer import PCMReframer, parse_wav_header
+from helpers.ogg_opus import OggOpusDecoder
+
+
+class ReframedWavStreamMixin:
+    """Turns a streamed WAV body into transport-sized TTSAudioRawFrames.
+
+    Replaces `_stream_audio_frames_from_iterator(..., strip_wav_header=True)`,
+    which assumes a 44-byte header, forwards chunks of whatever size the socket
+    produced and labels them with our configured rate. Here the header is
+    parsed, so frames carry the rate the server actually generated (if it
+    matches the transport's, the output skips resampling) and every frame is
+    exactly `frame_ms` long.
+    """
+
+    _frame_ms: int = 40
+
+    async def _stream_reframed_wav(
+        self, iterator: AsyncIterator[bytes], context_id: Optional[str] = None
+    ) -> AsyncGenerator[Frame, None]:
+        header = bytearray()
+        reframer: Optional[PCMReframer] = None
+        num_channels = 1
+
+        async for chunk in iterator:
+            if reframer is None:
+                header.extend(chunk)
+                parsed = parse_wav_header(header)
+                if parsed is None:
+                    continue
+                sample_rate, num_channels, data_offset = parsed
+                if sample_rate != self.sample_rate:
+                    logger.debug(
+                        f"{self}: server sent {sample_rate} Hz, output is {self.sample_rate} Hz"
+                    )
+                reframer = PCMReframer(sample_rate, num_channels, self._frame_ms)
+                chunk = bytes(header[data_offset:])
+                header = None
+
+            for view in reframer.push(chunk):
+                yield TTSAudioRawFrame(
+                    reframer.take(view), reframer.sample_rate, num_channels, context_id=context_id
+                )
+
+        if reframer is None:
+            return
+        for view in reframer.flush():
+            yield TTSAudioRawFrame(
+                reframer.take(view), reframer.sample_rate, num_channels, context_id=context_id
+            )
+        logger.debug(f"{self}: reframer stats {reframer.stats()}")
+
+    async def _stream_decoded_opus(
+        self, iterator: AsyncIterator[bytes], context_id: Optional[str] = None
+    ) -> AsyncGenerator[Frame, None]:
+        """Same as `_stream_reframed_wav` for an Ogg/Opus body.
+
+        Pages are decoded as they arrive and resampled straight to the
+        output rate, so frames never need resampling downstream.
+        """
+        decoder = OggOpusDecoder(self.sample_rate)
+        reframer = PCMReframer(self.sample_rate, 1, self._frame_ms)
+        async for chunk in iterator:
+            for view in reframer.push(decoder.decode(chunk)):
+                yield TTSAudioRawFrame(
+                    reframer.take(view), self.sample_rate, 1, context_id=context_id
+                )
+        for frames in (reframer.push(decoder.flush()), reframer.flush()):
+            for view in frames:
+                yield TTSAudioRawFrame(
+                    reframer.take(view), self.sample_rate, 1, context_id=context_id
+                )
+        logger.debug(f"{self}: reframer stats {reframer.stats()}")
@@ -7,11 +7,12 @@ from pipecat.services.whisper.stt import WhisperSTTService
 from pipecat.services.deepgram.stt import DeepgramSTTService
 from pipecat.services.aws.llm import AWSBedrockLLMService
 from pipecat.services.aws.tts import AWSPollyTTSService
-from pipecat.services.piper.tts import PiperTTSService
 from pipecat.services.elevenlabs.tts import ElevenLabsTTSService
 
+from helpers.config import AUDIO_OUT_10MS_CHUNKS
 from helpers.whisper_livekit_custom_integration import WhisperLiveKitSTT
 from helpers.chatterbox_custom_integration import ChatterboxServerTTS, ChatterboxServerTTSOpenAI
+from helpers.piper_custom_integration import PiperLocalTTS, PiperServerTTS
 
 
 def create_stt_service():
@@ -30,6 +31,10 @@ def create_stt_service():
             raise ValueError("Must set EC2_HOST or EC2_HOST_WHISPER_STREAM")
         return WhisperLiveKitSTT(
             url=f"ws://{ec2_host}:{os.getenv('EC2_WHISPER_PORT', 8000)}/asr",
+            vad_gating=os.getenv("WHISPER_STREAM_VAD_GATING", "false").lower() == "true",
+            pre_roll_secs=float(os.getenv("WHISPER_STREAM_PRE_ROLL_SECS", 0.5)),
+            hangover_secs=float(os.getenv("WHISPER_STREAM_HANGOVER_SECS", 0.3)),
+            audio_codec=os.getenv("WHISPER_STREAM_CODEC", "pcm").lower(),
         )
     elif stt_service_provider == "DEEPGRAM":
         live_options = LiveOptions(
@@ -58,6 +63,8 @@ def create_tts_service(session: aiohttp.ClientSession):
             aiohttp_session=session,
             base_url=f"http://{ec2_host}:{os.getenv('EC2_CHATTERBOX_PORT', 8004)}",
             voice="Elena.wav",
+            frame_ms=AUDIO_OUT_10MS_CHUNKS * 10,
+            audio_format=os.getenv("CHATTERBOX_AUDIO_FORMAT", "wav").lower(),
         )
     elif tts_service_provider == "CHATTERBOX_SERVER_OPENAI":
         ec2_host = os.getenv('EC2_HOST_CHATTERBOX', os.getenv('EC2_HOST'))
@@ -67,14 +74,26 @@ def create_tts_service(session: aiohttp.ClientSession):
             aiohttp_session=session,
             base_url=f"http://{ec2_host}:{os.getenv('EC2_CHATTERBOX_PORT', 8004)}",
             voice="Emily.wav",
+            frame_ms=AUDIO_OUT_10MS_CHUNKS * 10,
         )
     elif tts_service_provider == "PIPER":
         ec2_host = os.getenv('EC2_HOST_PIPER', os.getenv('EC2_HOST'))
         if not ec2_host:
             raise ValueError("Must set EC2_HOST or EC2_HOST_PIPER")
-        return PiperTTSService(
+        return PiperServerTTS(
             base_url=f"http://{ec2_host}:{os.getenv('EC2_PIPER_PORT', 5002)}",
             aiohttp_session=session,
+            frame_ms=AUDIO_OUT_10MS_CHUNKS * 10,
+        )
+    elif tts_service_provider == "PIPER_LOCAL":
+        model_path = os.getenv("PIPER_MODEL_PATH")
+        if not model_path:
+            raise ValueError("Must set PIPER_MODEL_PATH")
+        return PiperLocalTTS(
+            model_path=model_path,
+            executor_threads=int(os.getenv("PIPER_LOCAL_THREADS", os.cpu_count() or 1)),
+            intra_op_threads=int(os.getenv("PIPER_INTRA_OP_THREADS", "1")),
+            frame_ms=AUDIO_OUT_10MS_CHUNKS * 10,
         )
     elif tts_service_provider == "POLLY":
         return AWSPollyTTSService(
@@ -94,12 +113,20 @@ def create_tts_service(session: aiohttp.ClientSession):
         raise ValueError(f"Unknown TTS_SERVICE_PROVIDER: {tts_service_provider}")
 
 
-def create_llm_service():
+def create_llm_service(model: str = "us.anthropic.claude-haiku-4-5-20251001-v1:0"):
     """Crea y configura el servicio de LLM (AWS Bedrock)"""
     return AWSBedrockLLMService(
         aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", os.getenv("aws_access_key_id")),
         aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", os.getenv("aws_secret_access_key")),
         aws_session_token=os.getenv("AWS_SESSION_TOKEN", os.getenv("aws_session_token")),
         region=os.getenv("AWS_DEFAULT_REGION", os.getenv("aws_default_region", "us-east-1")),
-        model="us.anthropic.claude-haiku-4-5-20251001-v1:0",
+        model=model,
     )
+
+
+def create_fast_llm_service():
+    """Crea el LLM rápido para turnos simples, o None si LLM_FAST_MODEL no está configurado"""
+    model = os.getenv("LLM_FAST_MODEL")
+    if not model:
+        return None
+    return create_llm_service(model=model)
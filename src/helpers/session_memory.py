@@ -0,0 +1,283 @@
+"""Memoria por sesión: medición, picos y topes.
+
+Python no sabe a qué sesión pertenece cada objeto, así que `SessionMemory`
+mide por partes: cada sesión registra sus raíces (VAD, detector de fin de
+turno, contexto del LLM, entrada y salida de audio, resto de procesadores)
+y cada `interval_secs` se recorre el grafo de objetos de cada raíz sumando
+`sys.getsizeof` (y `nbytes` de los arrays de numpy). El recorrido:
+
+- no cruza a otros procesadores del pipeline, ni a loops, tasks, módulos,
+  clases o funciones, así cada parte cuenta solo lo suyo;
+- tiene un presupuesto de objetos y corre en un hilo aparte, para no frenar
+  el event loop compartido;
+- no ve memoria nativa (pesos ONNX, buffers de aiortc). El costo nativo de
+  los modelos de una sesión se estima una vez, con la diferencia de RSS al
+  cargarlos (`record_model_bytes`).
+
+Topes (0 desactiva cada uno):
+
+- `context_max_bytes`: el historial del LLM se recorta desde los turnos más
+  viejos, conservando los mensajes de sistema del inicio;
+- `session_max_bytes`: si la sesión entera lo supera se llama `on_over_cap`
+  (en `nova.py`, cortar la llamada);
+- `over_rss_cap()`: con el RSS del proceso sobre el tope no se aceptan
+  sesiones nuevas.
+"""
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+from loguru import logger
+from pipecat.processors.aggregators.llm_context import LLMContext
+from pipecat.processors.frame_processor import FrameProcessor
+
+# Objetos que no pertenecen a una sesión en particular: el recorrido no entra
+_STOP_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.CoroutineType,
+    types.AsyncGeneratorType,
+    asyncio.AbstractEventLoop,
+    asyncio.Future,
+    threading.Thread,
+)
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_rss_bytes() -> int:
+    """RSS actual del proceso (Linux); fuera de Linux, el pico de RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def deep_sizeof(*roots, seen: Optional[set] = None, max_objects: int = 200_000) -> int:
+    """Bytes alcanzables desde `roots` sin cruzar a otros procesadores ni a objetos del proceso.
+
+    Con un mismo `seen` en varias llamadas, cada objeto se cuenta una sola vez.
+    """
+    seen = set() if seen is None else seen
+    root_ids = {id(r) for r in roots}
+    stack = list(roots)
+    total = 0
+    budget = len(seen) + max_objects
+    while stack and len(seen) < budget:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _STOP_TYPES):
+            continue
+        if isinstance(obj, FrameProcessor) and id(obj) not in root_ids:
+            continue
+        seen.add(id(obj))
+        try:
+            total += sys.getsizeof(obj)
+            if isinstance(obj, np.ndarray):
+                if obj.base is None:
+                    total += obj.nbytes
+                continue
+            if isinstance(obj, (str, bytes, bytearray, memoryview, int, float, bool)) or obj is None:
+                continue
+            if isinstance(obj, dict):
+                # list() copia de una vez: el loop puede modificarlo mientras tanto
+                items = list(obj.items())
+                stack.extend(k for k, _ in items)
+                stack.extend(v for _, v in items)
+            elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+                stack.extend(list(obj))
+            else:
+                attrs = getattr(obj, "__dict__", None)
+                if attrs is not None:
+                    stack.append(attrs)
+                for slot in _slots(type(obj)):
+                    value = getattr(obj, slot, None)
+                    if value is not None:
+                        stack.append(value)
+        except (RuntimeError, ReferenceError):
+            # Cambió de tamaño mientras se recorría; se cuenta en la próxima medición
+            continue
+    return total
+
+
+def _slots(cls) -> list[str]:
+    slots = []
+    for klass in inspect.getmro(cls):
+        names = klass.__dict__.get("__slots__", ())
+        slots.extend([names] if isinstance(names, str) else names)
+    return [s for s in slots if s not in ("__dict__", "__weakref__")]
+
+
+def trim_context(context: LLMContext, max_bytes: int) -> int:
+    """Recorta turnos viejos hasta que el historial entre en `max_bytes`.
+
+    Se conservan los mensajes de sistema del inicio y el historial siempre
+    arranca en un mensaje de usuario, para no dejar resultados de tools sin
+    su llamada. Si ni el último turno entra, se queda desde el último mensaje
+    de usuario (el resto lo resuelve el tope de la sesión). Devuelve cuántos
+    mensajes se quitaron.
+    """
+    messages = context.messages
+    head = 0
+    while head < len(messages) and messages[head].get("role") == "system":
+        head += 1
+    sizes = [deep_sizeof(m) for m in messages]
+    total = sum(sizes)
+    if total <= max_bytes:
+        return 0
+    # Solo se puede cortar justo antes de un mensaje de usuario
+    starts = [i for i in range(head + 1, len(messages)) if messages[i].get("role") == "user"]
+    if not starts:
+        return 0
+    cut = starts[-1]
+    dropped = head
+    for start in starts:
+        total -= sum(sizes[dropped:start])
+        dropped = start
+        if total <= max_bytes:
+            cut = start
+            break
+    context.set_messages(messages[:head] + messages[cut:])
+    return cut - head
+
+
+class SessionMemory:
+    """Memoria medida de una sesión; ver docstring del módulo."""
+
+    def __init__(self, session_id: str, parts: dict, *, context: Optional[LLMContext] = None):
+        self.session_id = session_id
+        self.parts = parts
+        self.context = context
+        self.current: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+        self.peak_total = 0
+        self.trimmed_messages = 0
+        self.shed = False
+        self.measured_at: Optional[float] = None
+        self.measure_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def total(self) -> int:
+        return sum(self.current.values())
+
+    def _measure(self) -> dict[str, int]:
+        # Un objeto alcanzable desde varias partes se atribuye a la primera
+        seen = set()
+        return {
+            name: deep_sizeof(*(roots if isinstance(roots, list) else [roots]), seen=seen)
+            for name, roots in self.parts.items()
+        }
+
+    async def measure(self):
+        t0 = time.perf_counter()
+        self.current = await asyncio.to_thread(self._measure)
+        self.measure_ms = (time.perf_counter() - t0) * 1000
+        self.measured_at = time.time()
+        for name, size in self.current.items():
+            self.peak[name] = max(size, self.peak.get(name, 0))
+        self.peak_total = max(self.peak_total, self.total)
+
+    def start(
+        self,
+        *,
+        interval_secs: float,
+        context_max_bytes: int = 0,
+        session_max_bytes: int = 0,
+        on_over_cap: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        self._task = asyncio.create_task(
+            self._watch(interval_secs, context_max_bytes, session_max_bytes, on_over_cap)
+        )
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        # Última medición: el pico de la sesión queda en el registro, sin retener sus objetos
+        await self.measure()
+        self.parts = {}
+        self.context = None
+
+    async def _watch(self, interval_secs, context_max_bytes, session_max_bytes, on_over_cap):
+        while True:
+            await asyncio.sleep(interval_secs)
+            await self.measure()
+            if context_max_bytes and self.context and self.current.get("context", 0) > context_max_bytes:
+                removed = trim_context(self.context, context_max_bytes)
+                if removed:
+                    self.trimmed_messages += removed
+                    logger.info(f"Session {self.session_id}: trimmed {removed} old context messages")
+            if session_max_bytes and self.total > session_max_bytes and not self.shed:
+                self.shed = True
+                logger.warning(
+                    f"Session {self.session_id}: {self.total / 1e6:.1f}MB over the "
+                    f"{session_max_bytes / 1e6:.1f}MB cap, shedding"
+                )
+                if on_over_cap:
+                    await on_over_cap()
+
+    def report(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "live": self._task is not None,
+            "current_bytes": self.total,
+            "peak_bytes": self.peak_total,
+            "parts": {
+                name: {"current_bytes": size, "peak_bytes": self.peak.get(name, size)}
+                for name, size in self.current.items()
+            },
+            "trimmed_messages": self.trimmed_messages,
+            "shed": self.shed,
+            "measure_ms": round(self.measure_ms, 1),
+        }
+
+
+# Registro de sesiones del proceso; se conservan las últimas terminadas
+_sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+_MAX_SESSIONS = 50
+_model_bytes: Optional[int] = None
+
+
+def register_session_memory(session_id: str, parts: dict, *, context=None) -> SessionMemory:
+    memory = SessionMemory(session_id, parts, context=context)
+    _sessions[session_id] = memory
+    while len(_sessions) > _MAX_SESSIONS:
+        _sessions.popitem(last=False)
+    return memory
+
+
+def record_model_bytes(rss_delta: int):
+    """Costo nativo estimado de los modelos de una sesión (solo la primera carga)."""
+    global _model_bytes
+    if _model_bytes is None and rss_delta > 0:
+        _model_bytes = rss_delta
+
+
+def over_rss_cap(max_rss_bytes: int) -> bool:
+    return bool(max_rss_bytes) and process_rss_bytes() > max_rss_bytes
+
+
+def get_session_memory(session_id: str) -> Optional[SessionMemory]:
+    return _sessions.get(session_id)
+
+
+def memory_report() -> dict:
+    live = [m for m in _sessions.values() if m._task is not None]
+    return {
+        "process_rss_bytes": process_rss_bytes(),
+        "model_bytes_per_session": _model_bytes,
+        "live_sessions": len(live),
+        "live_python_bytes": sum(m.total for m in live),
+        "sessions": [m.report() for m in _sessions.values()],
+    }
@@ -0,0 +1,124 @@
+"""Pool de componentes de sesión pre-armados.
+
+Armar una sesión (modelos de VAD y de fin de turno, servicios, tools,
+contexto, agregadores) lleva tiempo y queda en el camino hacia el primer
+audio. `SessionPool` mantiene unas cuantas sesiones armadas y sin arrancar,
+listas para conectarse a una `SmallWebRTCConnection` nueva.
+
+El tamaño objetivo sigue a la tasa de llegadas reciente: las llamadas
+esperadas en los próximos `horizon_secs`, entre `min_size` y `max_size`. Una
+tarea de fondo rellena el pool después de cada `acquire()` y descarta las
+sobrantes cuando la tasa baja. Si el pool está vacío se arma en el momento.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class SessionPool(Generic[T]):
+    """Componentes pre-armados por `build()`; cada uno debe tener `async close()`."""
+
+    def __init__(
+        self,
+        build: Callable[[], Awaitable[T]],
+        *,
+        min_size: int = 1,
+        max_size: int = 4,
+        horizon_secs: float = 30.0,
+        window_secs: float = 300.0,
+    ):
+        self._build = build
+        self._min_size = min_size
+        self._max_size = max_size
+        self._horizon_secs = horizon_secs
+        self._window_secs = window_secs
+
+        self._ready: deque[T] = deque()
+        self._arrivals: deque[float] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._build_times: deque[float] = deque(maxlen=20)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_size > 0
+
+    def start(self):
+        if self.enabled and not self._task:
+            self._task = asyncio.create_task(self._refill_loop())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        while self._ready:
+            await self._ready.popleft().close()
+
+    async def acquire(self) -> T:
+        now = time.monotonic()
+        self._arrivals.append(now)
+        self._wakeup.set()
+        if self._ready:
+            self.hits += 1
+            return self._ready.popleft()
+        self.misses += 1
+        return await self._timed_build()
+
+    def arrival_rate(self) -> float:
+        """Llegadas por segundo en la ventana reciente."""
+        cutoff = time.monotonic() - self._window_secs
+        while self._arrivals and self._arrivals[0] < cutoff:
+            self._arrivals.popleft()
+        return len(self._arrivals) / self._window_secs
+
+    def target_size(self) -> int:
+        expected = math.ceil(self.arrival_rate() * self._horizon_secs)
+        return max(self._min_size, min(self._max_size, expected))
+
+    def stats(self) -> dict:
+        return {
+            "ready": len(self._ready),
+            "target": self.target_size(),
+            "arrivals_per_min": round(self.arrival_rate() * 60, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "build_ms": round(sum(self._build_times) / len(self._build_times) * 1000)
+            if self._build_times else None,
+        }
+
+    async def _timed_build(self) -> T:
+        t0 = time.monotonic()
+        item = await self._build()
+        self._build_times.append(time.monotonic() - t0)
+        return item
+
+    async def _refill_loop(self):
+        failures = 0
+        while True:
+            target = self.target_size()
+            if len(self._ready) < target:
+                try:
+                    self._ready.append(await self._timed_build())
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    logger.warning(f"Session pool: build failed ({e}), retrying")
+                    await asyncio.sleep(min(30.0, 2 ** failures))
+                continue
+            while len(self._ready) > target:
+                await self._ready.popleft().close()
+            logger.debug(f"Session pool: {self.stats()}")
+            self._wakeup.clear()
+            try:
+                # Se reevalúa cada tanto: la tasa baja aunque no lleguen llamadas
+                await asyncio.wait_for(self._wakeup.wait(), self._window_secs / 10)
+            except asyncio.TimeoutError:
+                pass
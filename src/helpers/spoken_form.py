@@ -0,0 +1,317 @@
+"""Normalización determinista a forma hablada (español) antes del TTS.
+
+En lugar de pedirle al LLM que escriba "ciento cincuenta pesos" o "uno dos
+tres", el LLM emite cifras compactas y `SpokenFormNormalizer`, entre el LLM
+y el TTS, las convierte a palabras:
+
+- precios: "$1.500" → "mil quinientos pesos", "$150,50" → "... con cincuenta centavos";
+  en precios la coma seguida de tres dígitos es de miles ("$12,990", "1,500 pesos");
+- tarjetas, pedidos, documentos y números largos: dígito a dígito
+  ("terminada en 4242" → "cuatro dos cuatro dos");
+- teléfonos ("+54 11 1234-5678", o después de "tel"/"whatsapp"): dígito a
+  dígito, con una pausa entre grupos;
+- cantidades: "1 par" → "un par", "31 zapatillas" → "treinta y una zapatillas";
+- fechas y horas: "15/03/2025" → "quince de marzo de dos mil veinticinco";
+- porcentajes y símbolos: "20%" → "veinte por ciento", "&" → "y".
+
+Trabaja sobre los `LLMTextFrame` a medida que llegan: el texto sin cifras
+pasa tal cual y solo se retiene la cola de un frame si termina en algo que
+puede seguir siendo un número ("1" + ".500"), hasta el frame siguiente.
+"""
+import re
+from typing import Optional
+
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    Frame,
+    InterruptionFrame,
+    LLMFullResponseEndFrame,
+    LLMTextFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+_UNITS = (
+    "cero uno dos tres cuatro cinco seis siete ocho nueve diez once doce trece catorce "
+    "quince dieciséis diecisiete dieciocho diecinueve veinte veintiuno veintidós "
+    "veintitrés veinticuatro veinticinco veintiséis veintisiete veintiocho veintinueve"
+).split()
+_TENS = {3: "treinta", 4: "cuarenta", 5: "cincuenta", 6: "sesenta", 7: "setenta", 8: "ochenta", 9: "noventa"}
+_HUNDREDS = {
+    1: "ciento", 2: "doscientos", 3: "trescientos", 4: "cuatrocientos", 5: "quinientos",
+    6: "seiscientos", 7: "setecientos", 8: "ochocientos", 9: "novecientos",
+}
+_MONTHS = (
+    "enero febrero marzo abril mayo junio julio agosto septiembre octubre noviembre diciembre"
+).split()
+_SYMBOLS = {"&": "y", "+": "más", "@": "arroba", "%": "por ciento", "°": "grados", "*": ""}
+
+# Palabras tras las que un número se lee dígito a dígito
+_DIGIT_CONTEXT_RE = re.compile(
+    r"(tarjeta|terminad[ao] en|finalizad[ao] en|dígitos|pedido|orden|seguimiento|\bid\b|"
+    r"código|documento|dni|teléfono|celular|\btel\b|whatsapp|\+\d+)\W*(\w+\W+){0,2}$",
+    re.IGNORECASE,
+)
+
+# Palabras tras las que "uno" no se apocopa ("1 de ellos", "1 y 2")
+_NO_APOCOPE_NEXT = {"y", "o", "u", "e", "de", "a", "en", "por", "para", "con", "que", "más", "menos"}
+
+# Sustantivos en -a que son masculinos ("21 días" → "veintiún días")
+_MASCULINE_IN_A = {"día", "mapa", "problema", "sistema", "programa", "idioma", "tema", "clima", "planeta"}
+_FEMININE_END_RE = re.compile(r"(?:as?|dad(?:es)?|ción|ciones|sión|siones)$")
+
+# Miles con punto ("1.500,50") o con coma ("1,000,000", "12,990"; ver _split_number)
+_NUMBER = r"\d{1,3}(?:\.\d{3})+(?!\d)(?:,\d+)?|\d{1,3}(?:,\d{3})+(?!\d)(?:\.\d+)?|\d+(?:[.,]\d+)?"
+# Un número no empieza pegado a una letra, "_" o "$" ("x2", "COL_001")
+_START = r"(?<![\w$])"
+# "+54 11 1234-5678", o grupos de dígitos después de tel/teléfono/celular/whatsapp
+_PHONE_GROUPS = r"\d(?:\d|[\s-](?=\d))*\d"
+_TOKEN_RE = re.compile(
+    rf"(?P<phone>\+\s?{_PHONE_GROUPS})"
+    rf"|(?P<phone_label>\b(?:tel\.?|teléfono|celular|whatsapp)\s*:?\s*)(?P<phone_number>{_PHONE_GROUPS})"
+    r"|(?P<date>\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b)"
+    r"|(?P<time>\b\d{1,2}:\d{2}\b)"
+    rf"|(?P<currency>\b[A-Z]{{1,3}}(?=\$))?\$\s?(?P<money>{_NUMBER})(?:\s+pesos\b)?"
+    rf"|{_START}(?P<pesos>{_NUMBER})\s+pesos\b"
+    rf"|{_START}(?P<percent>{_NUMBER})\s?%"
+    r"|#(?P<hash>\d+)"
+    rf"|{_START}(?P<number>{_NUMBER})"
+    r"|(?P<symbol>[&+@%°*])"
+)
+
+# Cola que puede continuar en el próximo frame ("$", "1", "1.", "15/0", "$5 pe", "+54 11 12")
+_INCOMPLETE_TAIL_RE = re.compile(
+    r"\+\s?\d[\d\s-]*$|[$#+]?\s?\d[\d.,:/]*(?:\s+p(?:e(?:s(?:os?)?)?)?)?\s*$|[$#+]\s*$"
+)
+
+
+def _below_thousand(n: int) -> str:
+    if n < 30:
+        return _UNITS[n]
+    if n < 100:
+        tens, unit = divmod(n, 10)
+        return _TENS[tens] + (f" y {_UNITS[unit]}" if unit else "")
+    if n == 100:
+        return "cien"
+    hundreds, rest = divmod(n, 100)
+    return _HUNDREDS[hundreds] + (f" {_below_thousand(rest)}" if rest else "")
+
+
+def _apocope(words: str) -> str:
+    """"uno" → "un" delante de un sustantivo o de "mil"/"millones"."""
+    if words.endswith("veintiuno"):
+        return words[:-len("veintiuno")] + "veintiún"
+    if words.endswith("uno"):
+        return words[:-1]
+    return words
+
+
+def _feminine(words: str) -> str:
+    """"treinta y uno" → "treinta y una", "doscientos" → "doscientas" (delante de un sustantivo femenino)."""
+    words = words.replace("ientos", "ientas")
+    if words.endswith("uno"):
+        return words[:-1] + "a"
+    return words
+
+
+def _is_feminine(noun: str) -> bool:
+    noun = noun.lower()
+    singular = noun[:-1] if noun.endswith("s") and noun[:-1] in _MASCULINE_IN_A else noun
+    return singular not in _MASCULINE_IN_A and bool(_FEMININE_END_RE.search(noun))
+
+
+def number_to_words(n: int) -> str:
+    """Cardinal en español: 1500 → "mil quinientos"."""
+    if n < 1000:
+        return _below_thousand(n)
+    if n < 1_000_000:
+        thousands, rest = divmod(n, 1000)
+        head = "mil" if thousands == 1 else f"{_apocope(_below_thousand(thousands))} mil"
+        return head + (f" {_below_thousand(rest)}" if rest else "")
+    millions, rest = divmod(n, 1_000_000)
+    head = "un millón" if millions == 1 else f"{_apocope(number_to_words(millions))} millones"
+    return head + (f" {number_to_words(rest)}" if rest else "")
+
+
+def digits_to_words(digits: str) -> str:
+    return " ".join(_UNITS[int(d)] for d in digits if d.isdigit())
+
+
+def _split_number(raw: str, money: bool = False) -> tuple[int, Optional[str]]:
+    """"1.500,50" → (1500, "50"); "4.5" → (4, "5"). El punto con tres dígitos es de miles.
+
+    La coma es de miles si hay más de un grupo ("1,000,000") o, en precios
+    (`money`), si la siguen tres dígitos ("$12,990"); si no, es decimal ("1,5").
+    """
+    if re.fullmatch(r"\d{1,3}(?:\.\d{3})+(?:,\d+)?", raw):
+        integer, _, decimals = raw.replace(".", "").partition(",")
+        return int(integer), decimals or None
+    if re.fullmatch(r"\d{1,3}(?:,\d{3}){2,}(?:\.\d+)?", raw) or (
+        money and re.fullmatch(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?", raw)
+    ):
+        integer, _, decimals = raw.replace(",", "").partition(".")
+        return int(integer), decimals or None
+    integer, _, decimals = raw.replace(",", ".").partition(".")
+    return int(integer), decimals or None
+
+
+def _cardinal(raw: str) -> str:
+    integer, decimals = _split_number(raw)
+    words = number_to_words(integer)
+    if decimals and int(decimals):
+        spoken = digits_to_words(decimals) if decimals.startswith("0") else number_to_words(int(decimals))
+        words += f" coma {spoken}"
+    return words
+
+
+def _money(raw: str, currency: Optional[str] = None) -> str:
+    integer, decimals = _split_number(raw, money=True)
+    words = _apocope(number_to_words(integer))
+    if currency in ("US", "U"):
+        unit = "dólar" if integer == 1 else "dólares"
+    else:
+        unit = "peso" if integer == 1 else "pesos"
+    if integer and integer % 1_000_000 == 0:
+        unit = f"de {unit}"
+    words = f"{words} {unit}"
+    if decimals and int(decimals[:2].ljust(2, "0")):
+        cents = int(decimals[:2].ljust(2, "0"))
+        words += f" con {_apocope(number_to_words(cents))} {'centavo' if cents == 1 else 'centavos'}"
+    return words
+
+
+def _date(raw: str) -> str:
+    parts = [int(p) for p in raw.split("/")]
+    day, month = parts[0], parts[1]
+    if not (1 <= day <= 31 and 1 <= month <= 12):
+        return " ".join(number_to_words(p) for p in parts)
+    words = f"{'primero' if day == 1 else number_to_words(day)} de {_MONTHS[month - 1]}"
+    if len(parts) == 3:
+        year = parts[2] + 2000 if parts[2] < 100 else parts[2]
+        words += f" de {number_to_words(year)}"
+    return words
+
+
+def _phone(raw: str) -> str:
+    """"+54 11 1234-5678" → "más cinco cuatro, uno uno, ..." (una pausa por grupo)."""
+    groups = ", ".join(digits_to_words(group) for group in re.findall(r"\d+", raw))
+    return f"más {groups}" if raw.startswith("+") else groups
+
+
+def _time(raw: str) -> str:
+    hours, minutes = (int(p) for p in raw.split(":"))
+    # "la una", "las veintiuna"
+    words = _feminine(number_to_words(hours))
+    return words + (f" y {number_to_words(minutes)}" if minutes else "")
+
+
+def normalize_spoken_form(text: str, lookback: str = "") -> str:
+    """Convierte cifras y símbolos de `text` a palabras.
+
+    `lookback` es el texto que precede a `text` (ya emitido), para decidir si
+    un número va dígito a dígito ("tarjeta terminada en 4242").
+    """
+    out = []
+    last = 0
+    for m in _TOKEN_RE.finditer(text):
+        out.append(text[last:m.start()])
+        last = m.end()
+        kind = m.lastgroup
+        raw = m.group(kind)
+        if kind == "phone_number":
+            out.append(m.group("phone_label") + _phone(raw))
+        elif kind == "phone":
+            out.append(_phone(raw))
+        elif kind == "date":
+            out.append(_date(raw))
+        elif kind == "time":
+            out.append(_time(raw))
+        elif kind == "money":
+            # "AR$" se lee como pesos, "US$" como dólares
+            currency = m.group("currency")
+            spoken = _money(raw, currency)
+            before = (lookback + text[:m.start()])[-1:]
+            if not currency and (before.isalnum() or before == "_"):
+                # El prefijo ya salió en el frame anterior: que no quede pegado
+                spoken = f" {spoken}"
+            out.append(spoken)
+        elif kind == "pesos":
+            out.append(_money(raw))
+        elif kind == "percent":
+            out.append(f"{_cardinal(raw)} por ciento")
+        elif kind == "hash":
+            out.append(digits_to_words(raw))
+        elif kind == "symbol":
+            word = _SYMBOLS[raw]
+            if word:
+                # "a&b" → "a y b": separado de lo que tenga pegado
+                before = (lookback + text[:m.start()])[-1:]
+                after = text[m.end():m.end() + 1]
+                word = (" " if before and not before.isspace() else "") + word
+                word += " " if after and not after.isspace() and after not in ".,;:!?)" else ""
+            out.append(word)
+        else:
+            before = (lookback + text[:m.start()])[-40:]
+            plain = raw.isdigit()
+            if plain and (len(raw) >= 7 or raw.startswith("0") or _DIGIT_CONTEXT_RE.search(before)):
+                out.append(digits_to_words(raw))
+            else:
+                words = _cardinal(raw)
+                # "1 par" → "un par", "31 zapatillas" → "treinta y una"; al final de la frase queda "uno"
+                nxt = re.match(r"\s+([^\W\d]+)", text[m.end():])
+                if nxt and nxt.group(1).lower() not in _NO_APOCOPE_NEXT and "coma" not in words:
+                    words = _feminine(words) if _is_feminine(nxt.group(1)) else _apocope(words)
+                out.append(words)
+    out.append(text[last:])
+    return "".join(out)
+
+
+class SpokenFormNormalizer(FrameProcessor):
+    """Normaliza el texto del LLM a forma hablada; ver docstring del módulo."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._pending = ""
+        self._lookback = ""
+
+    def feed(self, text: str) -> str:
+        """Normaliza lo que ya es seguro emitir y retiene una posible cifra incompleta."""
+        buffer = self._pending + text
+        m = _INCOMPLETE_TAIL_RE.search(buffer)
+        cut = m.start() if m else len(buffer)
+        self._pending = buffer[cut:]
+        return self._emit(buffer[:cut])
+
+    def flush(self) -> str:
+        text, self._pending = self._pending, ""
+        return self._emit(text)
+
+    def _emit(self, text: str) -> str:
+        if not text:
+            return ""
+        spoken = normalize_spoken_form(text, self._lookback)
+        self._lookback = (self._lookback + text)[-40:]
+        return spoken
+
+    def _reset(self):
+        self._pending = ""
+        self._lookback = ""
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, LLMTextFrame):
+            frame.text = self.feed(frame.text)
+            if frame.text:
+                await self.push_frame(frame, direction)
+            return
+
+        if isinstance(frame, (LLMFullResponseEndFrame, EndFrame)):
+            tail = self.flush()
+            if tail:
+                await self.push_frame(LLMTextFrame(tail))
+            self._lookback = ""
+        elif isinstance(frame, (InterruptionFrame, CancelFrame)):
+            self._reset()
+
+        await self.push_frame(frame, direction)
@@ -1,6 +1,13 @@
 import asyncio
 import json
+import random
+import re
+import time
+import weakref
+from collections import deque
+
 import websockets
+from loguru import logger
 from typing import AsyncGenerator
 
 from pipecat.services.stt_service import STTService
@@ -11,25 +18,122 @@ from pipecat.frames.frames import (
     StartFrame,
     EndFrame,
     CancelFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
 )
+from pipecat.processors.frame_processor import FrameDirection
 from pipecat.utils.time import time_now_iso8601
 
+from helpers.ogg_opus import OggOpusEncoder
+
+
+# Streams of live calls, plus the totals of the ones already closed, for /api/metrics
+_live_streams: "weakref.WeakSet[WhisperLiveKitSTT]" = weakref.WeakSet()
+_closed_totals = {"streams": 0, "reconnects": 0, "reconnect_secs_total": 0.0,
+                  "audio_replayed_secs": 0.0, "audio_lost_secs": 0.0}
+
+
+def stt_stream_metrics() -> dict:
+    """Reconnect metrics of every live WhisperLiveKit stream, and totals since start."""
+    live = [{"stream": str(stream), **stream.metrics()} for stream in list(_live_streams)]
+    totals = {"streams": _closed_totals["streams"] + len(live)}
+    for key in ("reconnects", "reconnect_secs_total", "audio_replayed_secs", "audio_lost_secs"):
+        totals[key] = round(_closed_totals[key] + sum(m[key] for m in live), 3)
+    return {"live": live, "totals": totals}
+
 
 class WhisperLiveKitSTT(STTService):
-    def __init__(self, url: str, sample_rate: int = 16000, **kwargs):
+    """Streaming STT over a WhisperLiveKit `/asr` WebSocket (`--pcm-input`).
+
+    With `vad_gating=True` only speech is sent upstream, using the
+    transport's VAD decisions: audio is held in a `pre_roll_secs` ring while
+    the user is silent (so the onset the VAD needed to trigger is not lost),
+    forwarded while speaking, kept flowing for `hangover_secs` after the VAD
+    stops, and then closed with `eos_silence_secs` of silence so the server
+    commits the line. Everything else is dropped locally.
+
+    With `audio_codec="opus"` audio is encoded to Ogg/Opus on the fly instead
+    of being sent as raw PCM; the server must then run without `--pcm-input`
+    so it decodes the stream with ffmpeg.
+
+    If the socket drops mid-call the service reconnects with jittered
+    exponential backoff and replays up to `replay_secs` of audio the server
+    had not transcribed yet (plus whatever arrived while disconnected). The
+    new server session re-transcribes that audio from scratch, so its text is
+    trimmed against the tail of what was already emitted before being pushed.
+    `metrics()` reports reconnects, time spent reconnecting and audio lost;
+    `stt_stream_metrics()` gathers it for every live stream (`/api/metrics`).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        sample_rate: int = 16000,
+        *,
+        vad_gating: bool = False,
+        pre_roll_secs: float = 0.5,
+        hangover_secs: float = 0.3,
+        eos_silence_secs: float = 0.3,
+        audio_codec: str = "pcm",
+        opus_bitrate: int = 24000,
+        replay_secs: float = 5.0,
+        backoff_base_secs: float = 0.2,
+        backoff_max_secs: float = 5.0,
+        **kwargs,
+    ):
+        if audio_codec not in ("pcm", "opus"):
+            raise ValueError(f"Unknown audio_codec: {audio_codec}")
         super().__init__(sample_rate=sample_rate, **kwargs)
         self.url = url
         self.ws = None
         self.recv_task = None
         self.closed = False
         self._last_lines_text = ""
+        self._audio_codec = audio_codec
+        self._opus_bitrate = opus_bitrate
+        self._encoder = None
+
+        self._vad_gating = vad_gating
+        self._pre_roll_secs = pre_roll_secs
+        self._hangover_secs = hangover_secs
+        self._eos_silence_secs = eos_silence_secs
+        self._pre_roll: deque[bytes] = deque()
+        self._pre_roll_bytes = 0
+        self._speaking = False
+        self._hangover_left = 0  # bytes of post-speech audio still to send
+        self.audio_bytes_sent = 0  # PCM forwarded, before encoding
+        self.bytes_sent = 0  # what actually went over the socket
+        self.bytes_suppressed = 0
+
+        # Reconnect / replay
+        self._replay_secs = replay_secs
+        self._backoff_base_secs = backoff_base_secs
+        self._backoff_max_secs = backoff_max_secs
+        self._replay: deque[bytes] = deque()
+        self._replay_bytes = 0
+        self._send_lock = asyncio.Lock()
+        self._reconnect_task = None
+        self._emitted_before_reconnect = ""
+        self.reconnects = 0
+        self.reconnect_secs_total = 0.0
+        self.last_reconnect_secs = 0.0
+        self.audio_replayed_bytes = 0
+        self.audio_lost_bytes = 0
 
     # ---------- lifecycle ----------
 
     async def start(self, frame: StartFrame):
         await super().start(frame)
-        self.ws = await websockets.connect(self.url, max_size=None)
         self.closed = False
+        self._open_session(await websockets.connect(self.url, max_size=None))
+        _live_streams.add(self)
+
+    def _open_session(self, ws):
+        """Attach a freshly connected socket (each one is a new server session)."""
+        if self._audio_codec == "opus":
+            # A new session needs a new Ogg stream, headers included
+            self._encoder = OggOpusEncoder(self.sample_rate, bitrate=self._opus_bitrate)
+        self.ws = ws
         self.recv_task = asyncio.create_task(self._recv_loop())
 
     async def stop(self, frame: EndFrame):
@@ -45,6 +149,21 @@ class WhisperLiveKitSTT(STTService):
         if self.closed:
             return
         self.closed = True
+        total = self.audio_bytes_sent + self.bytes_suppressed
+        logger.info(
+            f"{self}: forwarded {self.audio_bytes_sent} of {total} PCM bytes, "
+            f"{self.bytes_sent} bytes on the wire ({self._audio_codec})"
+        )
+        metrics = self.metrics()
+        if self.reconnects:
+            logger.info(f"{self}: stream metrics {metrics}")
+        if self in _live_streams:
+            _live_streams.discard(self)
+            _closed_totals["streams"] += 1
+            for key in ("reconnects", "reconnect_secs_total", "audio_replayed_secs", "audio_lost_secs"):
+                _closed_totals[key] += metrics[key]
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
         if self.recv_task:
             self.recv_task.cancel()
         if self.ws:
@@ -52,9 +171,116 @@ class WhisperLiveKitSTT(STTService):
             self.ws = None
 
     async def _flush(self):
-        if self.ws:
-            # empty frame = end of speech
-            await self.ws.send(b"")
+        async with self._send_lock:
+            ws = self.ws
+            if ws is None:
+                return
+            try:
+                if self._encoder:
+                    tail = self._encoder.close()
+                    if tail:
+                        await ws.send(tail)
+                        self.bytes_sent += len(tail)
+                # empty frame = end of speech
+                await ws.send(b"")
+            except websockets.ConnectionClosed:
+                pass
+
+    # ---------- reconnect ----------
+
+    def metrics(self) -> dict:
+        bytes_per_sec = self._secs_to_bytes(1)
+        return {
+            "reconnects": self.reconnects,
+            "reconnect_secs_total": round(self.reconnect_secs_total, 3),
+            "last_reconnect_secs": round(self.last_reconnect_secs, 3),
+            "audio_replayed_secs": round(self.audio_replayed_bytes / bytes_per_sec, 3),
+            "audio_lost_secs": round(self.audio_lost_bytes / bytes_per_sec, 3),
+        }
+
+    def _schedule_reconnect(self):
+        if self.closed or (self._reconnect_task and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        t0 = time.monotonic()
+        # Under the lock, so a write in progress finishes (or fails) on the old socket first
+        async with self._send_lock:
+            old_ws, self.ws = self.ws, None
+        if old_ws:
+            try:
+                await old_ws.close()
+            except Exception:
+                pass
+
+        attempt = 0
+        while not self.closed:
+            # Full jitter, so sessions sharing a restarted server don't reconnect in lockstep
+            cap = min(self._backoff_max_secs, self._backoff_base_secs * 2 ** attempt)
+            await asyncio.sleep(random.uniform(0, cap))
+            try:
+                ws = await websockets.connect(self.url, max_size=None)
+                break
+            except Exception as e:
+                attempt += 1
+                logger.warning(f"{self}: reconnect attempt {attempt} failed: {e}")
+        else:
+            return
+
+        async with self._send_lock:
+            # The new session starts with no transcript; remember what we
+            # already emitted so re-transcribed audio isn't pushed twice.
+            self._emitted_before_reconnect = self._last_lines_text
+            self._last_lines_text = ""
+            self._open_session(ws)
+            replay = b"".join(self._replay)
+            try:
+                await self._write(replay)
+            except websockets.ConnectionClosed:
+                self._schedule_reconnect()
+                return
+            self.audio_replayed_bytes += len(replay)
+
+        self.reconnects += 1
+        self.last_reconnect_secs = time.monotonic() - t0
+        self.reconnect_secs_total += self.last_reconnect_secs
+        logger.info(
+            f"{self}: reconnected in {self.last_reconnect_secs:.2f}s, "
+            f"replayed {len(replay) / self._secs_to_bytes(1):.2f}s of audio"
+        )
+
+    def _remember(self, audio: bytes):
+        """Keep recent audio in the replay ring, bounded to `replay_secs`."""
+        self._replay.append(audio)
+        self._replay_bytes += len(audio)
+        limit = self._secs_to_bytes(self._replay_secs)
+        while self._replay_bytes > limit and len(self._replay) > 1:
+            dropped = self._replay.popleft()
+            self._replay_bytes -= len(dropped)
+            if self.ws is None:
+                # Fell out of the ring before it could ever be sent
+                self.audio_lost_bytes += len(dropped)
+
+    def _mark_transcribed(self):
+        self._replay.clear()
+        self._replay_bytes = 0
+
+    @staticmethod
+    def _words(text: str) -> list:
+        return [re.sub(r"[^\w]", "", w).lower() for w in text.split()]
+
+    def _trim_replayed(self, text: str) -> str:
+        """Drop the leading words of `text` that repeat the tail of the previous session."""
+        prev = self._words(self._emitted_before_reconnect)
+        if not prev:
+            return text
+        cur_raw = text.split()
+        cur = self._words(text)
+        for k in range(min(len(prev), len(cur)), 0, -1):
+            if prev[-k:] == cur[:k]:
+                return " ".join(cur_raw[k:])
+        return text
 
     # ---------- receive side ----------
 
@@ -89,6 +315,11 @@ class WhisperLiveKitSTT(STTService):
                     current_text = " ".join(
                         l.get("text", "") for l in lines if l.get("text")
                     ).strip()
+                    current_text = self._trim_replayed(current_text)
+                    if not interim:
+                        # Nothing pending server-side: the audio sent so far
+                        # is in `lines` and no longer needs replaying.
+                        self._mark_transcribed()
 
                     if current_text and current_text != self._last_lines_text:
                         if (
@@ -117,21 +348,105 @@ class WhisperLiveKitSTT(STTService):
                             )
                         self._last_lines_text = current_text
         except asyncio.CancelledError:
-            pass
+            return
         except Exception as e:
-            print(f"WhisperLiveKit recv loop error: {e}")
+            logger.warning(f"WhisperLiveKit recv loop error: {e}")
+        # The server went away (error or close) while the call is still live
+        self._schedule_reconnect()
 
     # ---------- send side ----------
 
-    async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
-        if not self.ws:
+    def _secs_to_bytes(self, secs: float) -> int:
+        return int(self.sample_rate * secs) * 2  # s16le
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        if self._vad_gating:
+            if isinstance(frame, VADUserStartedSpeakingFrame):
+                self._speaking = True
+                self._hangover_left = 0
+                await self._send_pre_roll()
+            elif isinstance(frame, VADUserStoppedSpeakingFrame):
+                self._speaking = False
+                self._hangover_left = self._secs_to_bytes(self._hangover_secs)
+        await super().process_frame(frame, direction)
+
+    async def _send_pre_roll(self):
+        audio = b"".join(self._pre_roll)
+        self._pre_roll.clear()
+        self._pre_roll_bytes = 0
+        if audio:
+            await self._send_audio(audio)
+
+    async def _send_eos_marker(self):
+        # WhisperLiveKit treats an empty message as end-of-stream and stops the
+        # session, so end-of-speech is marked with a short run of silence
+        # instead, which is what its own VAC needs to commit the current line.
+        await self._send_audio(bytes(self._secs_to_bytes(self._eos_silence_secs)))
+
+    async def _send_audio(self, audio: bytes):
+        self.audio_bytes_sent += len(audio)
+        async with self._send_lock:
+            self._remember(audio)
+            if self.ws is None:
+                # Reconnecting: the ring is replayed onto the new socket
+                return
+            try:
+                await self._write(audio)
+            except websockets.ConnectionClosed:
+                self._schedule_reconnect()
+
+    async def _write(self, audio: bytes):
+        # Bound once: `_close` may clear `self.ws` while this yields between chunks,
+        # and a dead socket raises ConnectionClosed, which the callers handle
+        ws = self.ws
+        if ws is None:
+            return
+        if self._encoder:
+            # Ogg pages come out as the encoder completes them
+            data = self._encoder.encode(audio)
+            if data:
+                await ws.send(data)
+                self.bytes_sent += len(data)
             return
 
         # send audio in 100ms chunks
-        chunk_size = int(self.sample_rate * 0.1) * 2  # s16le
+        chunk_size = self._secs_to_bytes(0.1)
         for i in range(0, len(audio), chunk_size):
-            await self.ws.send(audio[i : i + chunk_size])
+            await ws.send(audio[i : i + chunk_size])
             await asyncio.sleep(0)
+        self.bytes_sent += len(audio)
+
+    async def _gate_audio(self, audio: bytes):
+        if self._speaking:
+            await self._send_audio(audio)
+            return
+
+        if self._hangover_left > 0:
+            sent = audio[: self._hangover_left]
+            self._hangover_left -= len(sent)
+            await self._send_audio(sent)
+            if self._hangover_left <= 0:
+                await self._send_eos_marker()
+            audio = audio[len(sent):]
+            if not audio:
+                return
+
+        self._pre_roll.append(audio)
+        self._pre_roll_bytes += len(audio)
+        limit = self._secs_to_bytes(self._pre_roll_secs)
+        while self._pre_roll_bytes > limit and len(self._pre_roll) > 1:
+            dropped = self._pre_roll.popleft()
+            self._pre_roll_bytes -= len(dropped)
+            self.bytes_suppressed += len(dropped)
+
+    async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
+        if self.closed:
+            return
+
+        if self._vad_gating:
+            await self._gate_audio(audio)
+        else:
+            await self._send_audio(audio)
 
         # Deepgram style: transcripts arrive via recv loop
         yield None
@@ -1 +1 @@
-from .nova import run_bot, _debug
+from .nova import run_bot, _debug, _session_pool
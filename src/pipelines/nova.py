@@ -1,9 +1,11 @@
 """Pipeline de voz: STT → LLM → TTS con debug broadcast."""
 import asyncio
 import json
+from dataclasses import dataclass
 
 import aiohttp
 from fastapi import WebSocket
+from loguru import logger
 from pipecat.audio.turn.smart_turn.local_smart_turn_v3 import LocalSmartTurnAnalyzerV3
 from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.audio.vad.vad_analyzer import VADParams
@@ -20,8 +22,10 @@ from pipecat.frames.frames import (
     TranscriptionFrame,
 )
 from pipecat.observers.loggers.metrics_log_observer import MetricsLogObserver
+from pipecat.pipeline.llm_switcher import LLMSwitcher
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.service_switcher import ServiceSwitcherStrategyManual
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.llm_context import LLMContext
 from pipecat.processors.aggregators.llm_response_universal import (
@@ -37,12 +41,40 @@ from pipecat.turns.user_turn_strategies import UserTurnStrategies
 
 from helpers import (
     SYSTEM_MESSAGE,
+    ConversationPhaseTracker,
+    OPENING_PROMPT,
+    FillerPlayer,
+    LLMTierRouter,
+    OpeningPlayer,
+    OpeningTurnFrame,
+    SessionPool,
+    SpokenFormNormalizer,
+    create_fast_llm_service,
     create_llm_service,
     create_stt_service,
     create_tts_service,
+    get_opening,
+    register_session_memory,
+    register_timer,
     tools_list,
     tools_schema,
 )
+from helpers.config import (
+    AUDIO_OUT_10MS_CHUNKS,
+    DYNAMIC_TOOLS,
+    FILLER_THRESHOLD_SECS,
+    FILLERS_ENABLED,
+    OPENING_TURN_MODE,
+    PIPELINE_TIMING,
+    SESSION_CONTEXT_MAX_BYTES,
+    SESSION_MEMORY_INTERVAL_SECS,
+    SESSION_MEMORY_MAX_BYTES,
+    SESSION_POOL_HORIZON_SECS,
+    SESSION_POOL_MAX,
+    SESSION_POOL_MIN,
+    SPOKEN_FORM_NORMALIZER,
+)
+from helpers.session_memory import process_rss_bytes, record_model_bytes
 
 
 # ─── Debug broadcaster ────────────────────────────────────────────────────────
@@ -110,80 +142,206 @@ class DebugFrameCapture(FrameProcessor):
         await self.push_frame(frame, direction)
 
 
+# ─── Session components ───────────────────────────────────────────────────────
+
+@dataclass
+class SessionComponents:
+    """Everything a session needs that does not depend on the WebRTC connection."""
+
+    http_session: aiohttp.ClientSession
+    vad_analyzer: SileroVADAnalyzer
+    turn_analyzer: LocalSmartTurnAnalyzerV3
+    messages: list
+    context: LLMContext
+    processors: list            # pipeline between transport.input() and transport.output()
+    assistant_aggregator: FrameProcessor
+
+    async def close(self):
+        await self.http_session.close()
+
+
+def _load_analyzers():
+    # Both load ONNX models; run in a thread so the event loop keeps serving calls
+    return SileroVADAnalyzer(params=VADParams(stop_secs=0.2)), LocalSmartTurnAnalyzerV3()
+
+
+async def build_session_components() -> SessionComponents:
+    """Assembles services, context, aggregators and processors of one session."""
+    rss_before = process_rss_bytes()
+    vad_analyzer, turn_analyzer = await asyncio.to_thread(_load_analyzers)
+    # Native model memory is invisible to per-session accounting; estimate it once
+    record_model_bytes(process_rss_bytes() - rss_before)
+    session = aiohttp.ClientSession()
+
+    stt = create_stt_service()
+    tts = create_tts_service(session)
+    llm = create_llm_service()
+    fast_llm = create_fast_llm_service()
+    llms = [llm, fast_llm] if fast_llm else [llm]
+
+    for service in llms:
+        for tool in tools_list:
+            service.register_direct_function(handler=tool, cancel_on_interruption=True)
+    messages = [{"role": "system", "content": SYSTEM_MESSAGE}]
+    phases = ConversationPhaseTracker() if DYNAMIC_TOOLS else None
+    context = LLMContext(messages, tools=phases.tools_schema if phases else tools_schema)
+
+    if phases:
+        async def on_function_calls_started(service, function_calls):
+            # Tools change before the results trigger the next inference
+            if phases.advance(fc.function_name for fc in function_calls):
+                context.set_tools(phases.tools_schema)
+
+        for service in llms:
+            service.add_event_handler("on_function_calls_started", on_function_calls_started)
+
+    if fast_llm:
+        # Simple turns go to the fast model, the rest to the main one
+        router = LLMTierRouter(main_llm=llm, fast_llm=fast_llm, phases=phases)
+        llm_stage = [
+            router,
+            LLMSwitcher(llms=llms, strategy_type=ServiceSwitcherStrategyManual),
+            router.probe(),
+        ]
+    else:
+        llm_stage = [llm]
+
+    # Digits and symbols are spelled out here instead of by the LLM
+    normalizer_stage = [SpokenFormNormalizer()] if SPOKEN_FORM_NORMALIZER else []
+
+    filler_stage = (
+        [FillerPlayer(threshold_secs=FILLER_THRESHOLD_SECS)] if FILLERS_ENABLED else []
+    )
+
+    user_aggregator, assistant_aggregator = LLMContextAggregatorPair(
+        context,
+        user_params=LLMUserAggregatorParams(
+            user_turn_strategies=UserTurnStrategies(
+                stop=[TurnAnalyzerUserTurnStopStrategy(turn_analyzer=turn_analyzer)]
+            )
+        ),
+    )
+
+    processors = [
+        stt,
+        DebugFrameCapture(),       # captures STT transcription frames
+        user_aggregator,
+        *llm_stage,
+        DebugFrameCapture(),       # captures LLM text + LLM start/end frames
+        *normalizer_stage,         # "$1.500" → "mil quinientos pesos"
+        tts,
+        OpeningPlayer(chunk_ms=AUDIO_OUT_10MS_CHUNKS * 10),  # plays the canned greeting
+        *filler_stage,             # masks dead air until real TTS audio arrives
+        DebugFrameCapture(),       # captures TTS start/stop frames
+    ]
+
+    return SessionComponents(
+        http_session=session,
+        vad_analyzer=vad_analyzer,
+        turn_analyzer=turn_analyzer,
+        messages=messages,
+        context=context,
+        processors=processors,
+        assistant_aggregator=assistant_aggregator,
+    )
+
+
+# Pre-assembled sessions, refilled in the background (see helpers/session_pool.py)
+_session_pool = SessionPool(
+    build_session_components,
+    min_size=SESSION_POOL_MIN,
+    max_size=SESSION_POOL_MAX,
+    horizon_secs=SESSION_POOL_HORIZON_SECS,
+)
+
+
 # ─── Pipeline ─────────────────────────────────────────────────────────────────
 
 async def run_bot(webrtc_connection: SmallWebRTCConnection):
     """Configura y ejecuta el bot de voz para una conexión WebRTC."""
-    print("Starting bot")
+    logger.info("Starting bot")
+
+    components = await _session_pool.acquire()
+    context = components.context
 
     transport = SmallWebRTCTransport(
         webrtc_connection=webrtc_connection,
         params=TransportParams(
             audio_in_enabled=True,
             audio_out_enabled=True,
-            vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.2)),
+            audio_out_10ms_chunks=AUDIO_OUT_10MS_CHUNKS,
+            vad_analyzer=components.vad_analyzer,
         ),
     )
 
-    async with aiohttp.ClientSession() as session:
-        stt = create_stt_service()
-        tts = create_tts_service(session)
-        llm = create_llm_service()
+    pipeline = Pipeline([
+        transport.input(),
+        *components.processors,
+        transport.output(),
+        components.assistant_aggregator,
+    ])
 
-        for tool in tools_list:
-            llm.register_direct_function(handler=tool, cancel_on_interruption=True)
-        messages = [{"role": "system", "content": SYSTEM_MESSAGE}]
-        context = LLMContext(messages, tools=tools_schema)
-
-        user_aggregator, assistant_aggregator = LLMContextAggregatorPair(
-            context,
-            user_params=LLMUserAggregatorParams(
-                user_turn_strategies=UserTurnStrategies(
-                    stop=[
-                        TurnAnalyzerUserTurnStopStrategy(
-                            turn_analyzer=LocalSmartTurnAnalyzerV3()
-                        )
-                    ]
-                )
-            ),
-        )
-
-        pipeline = Pipeline([
-            transport.input(),
-            stt,
-            DebugFrameCapture(),       # captures STT transcription frames
-            user_aggregator,
-            llm,
-            DebugFrameCapture(),       # captures LLM text + LLM start/end frames
-            tts,
-            DebugFrameCapture(),       # captures TTS start/stop frames
-            transport.output(),
-            assistant_aggregator,
-        ])
-
-        task = PipelineTask(
-            pipeline,
-            params=PipelineParams(
-                enable_metrics=True,
-                enable_usage_metrics=True,
-            ),
-            observers=[MetricsLogObserver()],
-            enable_turn_tracking=True,
-            idle_timeout_secs=300,
-        )
-
-        @transport.event_handler("on_client_connected")
-        async def on_client_connected(transport, client):
-            print("Client connected")
-            messages.append(
-                {"role": "system", "content": "Presentate brevemente al usuario."}
-            )
-            await task.queue_frames([LLMRunFrame()])
+    # Per-processor timings, also switchable at runtime via /api/timing
+    timer = register_timer(webrtc_connection.pc_id)
+    timer.attach(pipeline)
+    if PIPELINE_TIMING:
+        timer.enable()
+
+    task = PipelineTask(
+        pipeline,
+        params=PipelineParams(
+            enable_metrics=True,
+            enable_usage_metrics=True,
+        ),
+        observers=[MetricsLogObserver()],
+        enable_turn_tracking=True,
+        idle_timeout_secs=300,
+    )
+
+    # Per-session memory, by part; caps trim the context or end the call
+    memory = register_session_memory(
+        webrtc_connection.pc_id,
+        {
+            "vad": components.vad_analyzer,
+            "turn": components.turn_analyzer,
+            "context": context,
+            "audio_in": transport.input(),
+            "audio_out": transport.output(),
+            "processors": [*components.processors, components.assistant_aggregator],
+        },
+        context=context,
+    )
+    memory.start(
+        interval_secs=SESSION_MEMORY_INTERVAL_SECS,
+        context_max_bytes=SESSION_CONTEXT_MAX_BYTES,
+        session_max_bytes=SESSION_MEMORY_MAX_BYTES,
+        on_over_cap=task.cancel,
+    )
+
+    @transport.event_handler("on_client_connected")
+    async def on_client_connected(transport, client):
+        logger.info("Client connected")
+        opening = get_opening() if OPENING_TURN_MODE == "canned" else None
+        if opening:
+            # Bedrock Converse needs a user turn first: the opening prompt becomes that
+            # turn, and the greeting goes in as if the LLM had answered it
+            context.add_message({"role": "system", "content": OPENING_PROMPT})
+            context.add_message({"role": "assistant", "content": opening.text})
+            asyncio.create_task(_debug.send("llm_text", opening.text))
+            await task.queue_frames([OpeningTurnFrame(clip=opening)])
+            return
+        components.messages.append({"role": "system", "content": OPENING_PROMPT})
+        await task.queue_frames([LLMRunFrame()])
 
-        @transport.event_handler("on_client_disconnected")
-        async def on_client_disconnected(transport, client):
-            print("Client disconnected")
-            await task.cancel()
+    @transport.event_handler("on_client_disconnected")
+    async def on_client_disconnected(transport, client):
+        logger.info("Client disconnected")
+        await task.cancel()
 
+    try:
         runner = PipelineRunner(handle_sigint=False)
         await runner.run(task)
+    finally:
+        timer.disable()
+        await memory.stop()
+        await components.close()